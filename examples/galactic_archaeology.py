@@ -9,6 +9,7 @@ from astro_virtual_lab.prompts import (
     PRINCIPAL_INVESTIGATOR,
     STELLAR_EVOLUTION_EXPERT,
 )
+from astro_virtual_lab.routing import ModelRouter
 from astro_virtual_lab.run_meeting import run_meeting
 
 # Load configuration
@@ -64,9 +65,15 @@ summary = run_meeting(
     agenda_questions=agenda_questions,
     agenda_rules=agenda_rules,
     num_rounds=3,  # More rounds for complex chemical evolution discussion
+    early_exit=True,  # Skip the remaining rounds once the experts converge
     use_astronomy_tools=True,  # Enable ADS and SIMBAD searches
     return_summary=True,
-    model="deepseek-reasoner",  # Use DeepSeek's reasoner model
+    model="deepseek-chat",  # Cheap model for the experts' turns
+    # Strong model for the syntheses and the summary, with a fallback when it is overloaded
+    routing=ModelRouter(
+        phases={"synthesis": "deepseek-reasoner", "summary": "deepseek-reasoner"},
+        fallbacks={"deepseek-reasoner": ("deepseek-chat",)},
+    ),
 )
 
 print("\nGalactic Archaeology Meeting Summary:")
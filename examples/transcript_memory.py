@@ -0,0 +1,121 @@
+"""Benchmark of the memory held by a large archive of transcripts.
+
+Writes a synthetic archive of team meetings with `save_meeting`, then loads all of it
+as the dicts of `load_meeting` and as compact `Transcript`s, and reports the memory
+each representation holds (measured with tracemalloc, in a separate pass so that
+tracing does not slow the timed loads), the time to load the archive and the time to
+read every message once.
+
+    python examples/transcript_memory.py --meetings 10000
+"""
+
+import gc
+import random
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Any, Callable, List, Optional
+
+from tap import Tap
+
+from astro_virtual_lab.transcript import Transcript, load_transcript
+from astro_virtual_lab.utils import load_meeting, save_meeting, saved_meetings
+
+SPEAKERS = (
+    "Principal Investigator",
+    "Galactic Evolution Expert",
+    "Stellar Evolution Expert",
+    "Machine Learning Expert",
+)
+
+WORDS = (
+    "alpha abundance metallicity thick disk APOGEE GALAH Gaia kinematics age radial "
+    "migration accretion halo gradient calibration survey sample selection bias model"
+).split()
+
+
+class BenchmarkArgs(Tap):
+    meetings: int = 10_000  # Number of meetings in the archive
+    rounds: int = 2  # Discussion rounds per meeting
+    words: int = 300  # Words per agent reply
+    archive_dir: Optional[Path] = None  # Reuse or create the archive here (default: temp)
+
+
+def write_archive(save_dir: Path, meetings: int, rounds: int, words: int) -> None:
+    """Save synthetic team meetings whose structure follows `run_meeting`."""
+    rng = random.Random(0)
+    lead, *members = SPEAKERS
+    for meeting in range(meetings):
+        discussion = [{"agent": "User", "message": f"Start of meeting {meeting}."}]
+        speakers = [lead] + (members + [lead]) * rounds
+        for speaker in speakers:
+            reply = " ".join(rng.choice(WORDS) for _ in range(words))
+            discussion.append({"agent": "User", "message": f"{speaker}, your turn."})
+            discussion.append({"agent": speaker, "message": reply})
+        save_meeting(save_dir, f"meeting_{meeting:06d}", discussion)
+
+
+def measure(
+    label: str, load: Callable[[], List[Any]], read: Callable[[List[Any]], int]
+) -> None:
+    """Load the archive, report the memory held and the time to load and read it."""
+    gc.collect()
+    start = time.perf_counter()
+    loaded = load()
+    load_time = time.perf_counter() - start
+    start = time.perf_counter()
+    chars = read(loaded)
+    read_time = time.perf_counter() - start
+    del loaded
+
+    gc.collect()
+    tracemalloc.start()
+    loaded = load()
+    held, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(
+        f"{label:<22} {held / 2**20:>10.1f} MiB {load_time:>9.2f} s {read_time:>9.2f} s"
+        f" {chars:>14,d}"
+    )
+    del loaded
+
+
+def main(args: BenchmarkArgs) -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        save_dir = args.archive_dir or Path(tmp)
+        names = saved_meetings(save_dir)
+        if len(names) < args.meetings:
+            print(f"Writing {args.meetings} meetings to {save_dir}...")
+            write_archive(save_dir, args.meetings, args.rounds, args.words)
+            names = saved_meetings(save_dir)
+        names = names[: args.meetings]
+        size = sum((save_dir / f"{name}.json").stat().st_size for name in names)
+        print(f"{len(names)} meetings, {size / 2**20:.1f} MiB of JSON\n")
+
+        print(
+            f"{'representation':<22} {'held':>14} {'load':>11} {'read all':>11}"
+            f" {'characters':>14}"
+        )
+        measure(
+            "dicts (load_meeting)",
+            lambda: [load_meeting(save_dir, name) for name in names],
+            lambda meetings: sum(len(t["message"]) for m in meetings for t in m),
+        )
+        measure(
+            "Transcript (lazy)",
+            lambda: [load_transcript(save_dir, name) for name in names],
+            lambda meetings: sum(len(text) for m in meetings for text in m.messages()),
+        )
+        measure(
+            "Transcript (in memory)",
+            lambda: [
+                Transcript.from_turns(load_meeting(save_dir, name), name=name)
+                for name in names
+            ],
+            lambda meetings: sum(len(text) for m in meetings for text in m.messages()),
+        )
+
+
+if __name__ == "__main__":
+    main(BenchmarkArgs().parse_args())
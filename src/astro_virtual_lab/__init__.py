@@ -10,15 +10,20 @@ Exposed top-level symbols:
 - __version__      : The version of the astro_virtual_lab package
 - Agent            : The base agent class
 - run_meeting      : Main function to orchestrate a meeting with one or more agents
+- iter_meeting     : Runs a meeting and yields its events as they happen
+- aiter_meeting    : Asynchronous twin of iter_meeting
 """
 
 from astro_virtual_lab.__about__ import __version__
 from astro_virtual_lab.agent import Agent
 from astro_virtual_lab.run_meeting import run_meeting
+from astro_virtual_lab.streaming import aiter_meeting, iter_meeting
 
 
 __all__ = [
     "__version__",
     "Agent",
     "run_meeting",
+    "iter_meeting",
+    "aiter_meeting",
 ]
@@ -0,0 +1,292 @@
+"""
+Thread-safe NASA ADS API client with a pool of rotating API tokens.
+
+Each request carries its own credentials in the Authorization header, so concurrent
+searches from threads, event loops and meetings never share mutable client state.
+ADS limits the number of queries per token and per day; the limit, the remaining
+quota and its reset time are read from the rate-limit headers of every response.
+A pool of tokens multiplies the daily volume: each request uses the token with the
+most remaining quota, so the tokens are drawn down evenly, and a token that is
+refused for exceeding its limit is set aside until its quota resets while the
+request is retried with another one.
+
+The tokens are read from `api_keys.nasa_ads` in config.yml (or the NASA_ADS_KEY
+environment variable), either as a single token, a list, or a comma-separated string:
+
+    api_keys:
+      nasa_ads: ["first-token", "second-token"]
+
+Example:
+    from astro_virtual_lab.ads import get_ads_client
+
+    client = get_ads_client()
+    docs = client.search("thick disk alpha abundances", rows=3, fields=("title",))
+    print(client.pool.report())
+"""
+
+import functools
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, List, Mapping, Optional, Sequence, Tuple, Union
+
+import requests
+
+from astro_virtual_lab.clients import get_async_http_client
+from astro_virtual_lab.concurrency import throttle, throttle_async
+from astro_virtual_lab.config import load_config
+from astro_virtual_lab.constants import (
+    ADS_API_URL,
+    ADS_DAILY_QUERY_LIMIT,
+    ADS_REQUEST_TIMEOUT,
+)
+
+# Seconds a refused token is set aside when ADS does not say when its quota resets
+_DEFAULT_RESET_DELAY = 24 * 3600.0
+
+
+class ADSQuotaExceededError(RuntimeError):
+    """Raised when every ADS token of the pool has used up its query quota."""
+
+
+@dataclass
+class TokenQuota:
+    """Query quota of one ADS token, as last reported by ADS."""
+
+    token: str
+    limit: int = ADS_DAILY_QUERY_LIMIT
+    remaining: int = ADS_DAILY_QUERY_LIMIT
+    reset: Optional[float] = None
+    requests: int = 0
+    rate_limited: int = 0
+
+    @property
+    def label(self) -> str:
+        """Masked form of the token, safe to print."""
+        return f"...{self.token[-4:]}"
+
+
+class ADSTokenPool:
+    """Thread-safe pool of ADS tokens with per-token quota tracking."""
+
+    def __init__(self, tokens: Sequence[str]) -> None:
+        """
+        :param tokens: ADS API tokens (duplicates are ignored).
+        """
+        tokens = list(dict.fromkeys(token for token in tokens if token))
+        if not tokens:
+            raise ValueError("No NASA ADS token configured (api_keys.nasa_ads).")
+        self._quotas = [TokenQuota(token) for token in tokens]
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_config(cls) -> "ADSTokenPool":
+        """Build the pool from `api_keys.nasa_ads` in config.yml."""
+        return cls(parse_tokens(load_config()["api_keys"]["nasa_ads"]))
+
+    def __len__(self) -> int:
+        return len(self._quotas)
+
+    def quotas(self) -> List[TokenQuota]:
+        """Return the quota entries of the tokens, in configuration order."""
+        return list(self._quotas)
+
+    def _refresh(self, now: float) -> None:
+        """Restore the quota of tokens whose reset time has passed."""
+        for quota in self._quotas:
+            if quota.reset is not None and now >= quota.reset:
+                quota.remaining = quota.limit
+                quota.reset = None
+
+    def acquire(self) -> TokenQuota:
+        """
+        Pick the token for one request and count the request against its quota.
+
+        :return: The quota entry of the token with the most remaining queries.
+        :raises ADSQuotaExceededError: If no token has any quota left.
+        """
+        with self._lock:
+            self._refresh(time.time())
+            quota = max(self._quotas, key=lambda quota: quota.remaining)
+            if quota.remaining <= 0:
+                resets = [q.reset for q in self._quotas if q.reset is not None]
+                wait = f" for {min(resets) - time.time():.0f} s" if resets else ""
+                raise ADSQuotaExceededError(
+                    f"All {len(self._quotas)} ADS token(s) are out of quota{wait}."
+                )
+            # Counted up front, so that concurrent requests spread over the tokens
+            quota.remaining -= 1
+            quota.requests += 1
+            return quota
+
+    def update(self, quota: TokenQuota, headers: Mapping[str, str]) -> None:
+        """Record the quota reported in the rate-limit headers of an ADS response."""
+        limit = _int_header(headers, "X-RateLimit-Limit")
+        remaining = _int_header(headers, "X-RateLimit-Remaining")
+        reset = _int_header(headers, "X-RateLimit-Reset")
+        with self._lock:
+            if limit is not None:
+                quota.limit = limit
+            if remaining is not None:
+                quota.remaining = remaining
+            if reset is not None:
+                quota.reset = float(reset)
+
+    def mark_exhausted(self, quota: TokenQuota, headers: Mapping[str, str]) -> None:
+        """Set a token aside until its quota resets, after ADS refused a request."""
+        reset = _int_header(headers, "X-RateLimit-Reset")
+        with self._lock:
+            quota.remaining = 0
+            quota.rate_limited += 1
+            quota.reset = (
+                float(reset) if reset is not None else time.time() + _DEFAULT_RESET_DELAY
+            )
+
+    def report(self) -> List[Dict[str, Any]]:
+        """
+        Return the remaining quota of each token.
+
+        :return: Per token: masked token, daily limit, remaining queries, seconds until
+            the quota resets (None if unknown), requests sent by this process and
+            requests refused for exceeding the limit.
+        """
+        now = time.time()
+        with self._lock:
+            self._refresh(now)
+            return [
+                {
+                    "token": quota.label,
+                    "limit": quota.limit,
+                    "remaining": quota.remaining,
+                    "resets_in": (
+                        max(0.0, quota.reset - now) if quota.reset is not None else None
+                    ),
+                    "requests": quota.requests,
+                    "rate_limited": quota.rate_limited,
+                }
+                for quota in self._quotas
+            ]
+
+
+def parse_tokens(value: Union[str, Sequence[str]]) -> List[str]:
+    """Turn the configured token(s) into a list: a list, or a comma-separated string."""
+    if isinstance(value, str):
+        return [token.strip() for token in value.split(",") if token.strip()]
+    return [str(token).strip() for token in value]
+
+
+def _int_header(headers: Mapping[str, str], name: str) -> Optional[int]:
+    value = headers.get(name)
+    try:
+        return int(value) if value is not None else None
+    except ValueError:
+        return None
+
+
+class ADSClient:
+    """ADS search client sending each request with a token drawn from a pool."""
+
+    def __init__(
+        self,
+        pool: ADSTokenPool,
+        url: str = ADS_API_URL,
+        timeout: float = ADS_REQUEST_TIMEOUT,
+    ) -> None:
+        """
+        :param pool: Tokens used for the requests.
+        :param url: ADS search endpoint.
+        :param timeout: Seconds after which a blocking request is abandoned.
+        """
+        self.pool = pool
+        self.url = url
+        self.timeout = timeout
+        # requests.Session is not documented as thread-safe, so each thread has its own
+        self._local = threading.local()
+
+    def _session(self) -> requests.Session:
+        session = getattr(self._local, "session", None)
+        if session is None:
+            session = self._local.session = requests.Session()
+        return session
+
+    @staticmethod
+    def _params(query: str, rows: int, fields: Tuple[str, ...]) -> Dict[str, Any]:
+        return {"q": query, "rows": rows, "fl": ",".join(fields)}
+
+    def search(self, query: str, rows: int, fields: Tuple[str, ...]) -> List[Dict[str, Any]]:
+        """
+        Run one blocking ADS search, retrying with another token when one is refused.
+
+        :param query: ADS query string.
+        :param rows: Maximum number of documents returned.
+        :param fields: ADS API field names to return.
+        :return: The raw result documents.
+        :raises ADSQuotaExceededError: If every token is out of quota.
+        """
+        for _ in range(len(self.pool)):
+            throttle("ads")
+            quota = self.pool.acquire()
+            response = self._session().get(
+                self.url,
+                params=self._params(query, rows, fields),
+                headers={"Authorization": f"Bearer {quota.token}"},
+                timeout=self.timeout,
+            )
+            if response.status_code == 429:
+                self.pool.mark_exhausted(quota, response.headers)
+                continue
+            self.pool.update(quota, response.headers)
+            response.raise_for_status()
+            return response.json()["response"]["docs"]
+        raise ADSQuotaExceededError("Every ADS token was refused for exceeding its quota.")
+
+    async def asearch(
+        self, query: str, rows: int, fields: Tuple[str, ...]
+    ) -> List[Dict[str, Any]]:
+        """Asyncio-native version of `search`, using the pooled asyncio HTTP client."""
+        for _ in range(len(self.pool)):
+            await throttle_async("ads")
+            quota = self.pool.acquire()
+            response = await get_async_http_client().get(
+                self.url,
+                params=self._params(query, rows, fields),
+                headers={"Authorization": f"Bearer {quota.token}"},
+            )
+            if response.status_code == 429:
+                self.pool.mark_exhausted(quota, response.headers)
+                continue
+            self.pool.update(quota, response.headers)
+            response.raise_for_status()
+            return response.json()["response"]["docs"]
+        raise ADSQuotaExceededError("Every ADS token was refused for exceeding its quota.")
+
+    def probe(self) -> List[Dict[str, Any]]:
+        """
+        Refresh the quota of every token with a minimal query (one query per token).
+
+        :return: The pool's quota report (see `ADSTokenPool.report`).
+        """
+        for quota in self.pool.quotas():
+            response = self._session().get(
+                self.url,
+                params=self._params("*:*", 0, ("bibcode",)),
+                headers={"Authorization": f"Bearer {quota.token}"},
+                timeout=self.timeout,
+            )
+            if response.status_code == 429:
+                self.pool.mark_exhausted(quota, response.headers)
+            else:
+                response.raise_for_status()
+                self.pool.update(quota, response.headers)
+        return self.pool.report()
+
+
+@functools.lru_cache(maxsize=None)
+def get_ads_client() -> ADSClient:
+    """
+    Return the process-wide ADS client, built from config.yml on first use.
+
+    Quotas are tracked per process. Call `get_ads_client.cache_clear()` after
+    changing the configured tokens.
+    """
+    return ADSClient(ADSTokenPool.from_config())
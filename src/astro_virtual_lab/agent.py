@@ -11,42 +11,65 @@ Example:
         title="Spectroscopy Specialist",
         expertise="stellar spectroscopy and chemical abundance analysis",
         goal="examine high-resolution spectra of metal-poor stars",
-        role="analyze survey data for accurate alpha-element abundances"
+        role="analyze survey data for accurate alpha-element abundances",
+        tools=("run_ads_search", "query_simbad"),
     )
 """
 
+import hashlib
+import json
+from dataclasses import dataclass, field
+from typing import Optional
 
-class Agent:
-    """A Large Language Model (LLM) agent with a defined role, expertise, and goal."""
-
-    def __init__(self, title: str, expertise: str, goal: str, role: str) -> None:
-        """
-        Initialize the agent with a descriptive title, an area of expertise,
-        a concrete goal, and a short role statement.
 
-        :param title: A short descriptive name (e.g., "Galactic Structure Expert").
-        :param expertise: A phrase describing the agent's domain knowledge.
-        :param goal: The agent's overall purpose in the project.
-        :param role: The agent's function, typically describing what tasks it handles.
-        """
-        self.title = title
-        self.expertise = expertise
-        self.goal = goal
-        self.role = role
+@dataclass(frozen=True, slots=True, eq=False)
+class Agent:
+    """
+    A Large Language Model (LLM) agent with a defined role, expertise, and goal.
+
+    Agents are immutable values: the system prompt is rendered once, when the agent
+    is created, and `content_hash` identifies the agent's definition. Two agents
+    with the same fields are equal and interchangeable, so an agent can be used as
+    a key of the completion and prompt caches.
+
+    :param title: A short descriptive name (e.g., "Galactic Structure Expert").
+    :param expertise: A phrase describing the agent's domain knowledge.
+    :param goal: The agent's overall purpose in the project.
+    :param role: The agent's function, typically describing what tasks it handles.
+    :param tools: Names of the registered tools the agent may call (None allows all).
+        Offering fewer tools keeps the agent's prompt small.
+    """
 
-    @property
-    def prompt(self) -> str:
-        """
-        Construct a 'system' style prompt to prime the LLM. This ensures the
-        LLM knows its identity, domain knowledge, and function.
+    title: str
+    expertise: str
+    goal: str
+    role: str
+    tools: Optional[tuple[str, ...]] = None
+    prompt: str = field(init=False, repr=False)
+    content_hash: str = field(init=False, repr=False)
+
+    def __post_init__(self) -> None:
+        """Normalize the tools, then render the prompt and the content hash once."""
+        tools = tuple(self.tools) if self.tools is not None else None
+        object.__setattr__(self, "tools", tools)
+
+        # 'system' style prompt so the LLM knows its identity, domain knowledge and function
+        object.__setattr__(
+            self,
+            "prompt",
+            (
+                f"You are a {self.title}. "
+                f"Your expertise is in {self.expertise}. "
+                f"Your goal is to {self.goal}. "
+                f"Your role is to {self.role}."
+            ),
+        )
 
-        :return: A single string used as the system prompt for the LLM.
-        """
-        return (
-            f"You are a {self.title}. "
-            f"Your expertise is in {self.expertise}. "
-            f"Your goal is to {self.goal}. "
-            f"Your role is to {self.role}."
+        definition = json.dumps(
+            [self.title, self.expertise, self.goal, self.role, tools]
+        )
+        object.__setattr__(
+            self, "content_hash", hashlib.sha256(definition.encode()).hexdigest()
         )
 
     @property
@@ -62,16 +85,16 @@ class Agent:
         }
 
     def __hash__(self) -> int:
-        """Hash the agent by its title (unique enough for typical usage)."""
-        return hash(self.title)
+        """Hash the agent by its content hash."""
+        return hash(self.content_hash)
 
     def __eq__(self, other: object) -> bool:
         """
-        Agents are equal if they share the same title.
+        Agents are equal if they share the same definition.
         """
         if not isinstance(other, Agent):
-            return False
-        return self.title == other.title
+            return NotImplemented
+        return self.content_hash == other.content_hash
 
     def __str__(self) -> str:
         """
@@ -89,10 +112,13 @@ class LiteratureSearchAgent(Agent):
     and summarize it for the team.
     """
 
+    __slots__ = ()
+
     def __init__(self) -> None:
         super().__init__(
             title="Literature Search Expert",
             expertise="performing ADS queries, retrieving abstracts, summarizing relevant astrophysical literature",
             goal="retrieve, parse, and summarize relevant research papers from NASA ADS and gather object data from SIMBAD",
             role="enhance the research agenda with the latest published findings and observational details",
+            tools=("run_ads_search", "query_simbad"),
         )
@@ -0,0 +1,383 @@
+"""
+Batch API execution of many meetings for astro_virtual_lab.
+
+For large offline sweeps, latency does not matter but throughput and cost do. In batch
+mode every meeting still runs the regular `run_meeting` logic in its own thread, but
+its completions go to a shared `BatchBroker` instead of the synchronous API. Once every
+unfinished meeting is waiting for a completion, the broker submits all of their
+requests as one OpenAI-style Batch API job (JSONL upload, poll, download) and hands the
+responses back. The meetings therefore advance in lock-step by phase: all lead
+openings, then all first member turns of round 1, and so on, with tool calls and
+cache hits simply taking part in the next step.
+
+Providers without a Batch API (and tests) use `LocalBatchClient`, a local stand-in
+that implements the same endpoints by running the requests through a synchronous
+chat completions client or any responder function.
+
+Example:
+    from astro_virtual_lab.batch import BatchBroker
+
+    broker = BatchBroker(participants=len(specs))
+    # run every spec in its own thread with run_meeting(**spec, batch=broker),
+    # calling broker.leave() when it ends (see cli.run_specs)
+"""
+
+import io
+import json
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Mapping, Optional, Tuple
+
+from openai.types.chat import ChatCompletion
+
+from astro_virtual_lab.clients import init_openai_client, model_provider
+from astro_virtual_lab.constants import (
+    BATCH_COMPLETION_WINDOW,
+    BATCH_POLL_INTERVAL,
+    LOCAL_BATCH_WORKERS,
+)
+from astro_virtual_lab.providers import get_provider_by_name
+
+BATCH_ENDPOINT = "/v1/chat/completions"
+_FINAL_BATCH_STATUSES = frozenset({"completed", "failed", "expired", "cancelled"})
+
+
+class BatchRequestError(RuntimeError):
+    """Raised in a meeting whose request failed inside a batch job."""
+
+
+###############################################################################
+# Local stand-in batch endpoint
+###############################################################################
+
+
+@dataclass
+class _LocalFile:
+    id: str
+    text: str
+
+
+@dataclass
+class LocalBatch:
+    """Status of a batch job of the local stand-in endpoint."""
+
+    id: str
+    input_file_id: str
+    status: str = "in_progress"
+    output_file_id: Optional[str] = None
+    error_file_id: Optional[str] = None
+
+
+class LocalBatchClient:
+    """
+    In-process stand-in for the Batch API endpoints of an OpenAI client.
+
+    Implements `files.create`, `files.content`, `batches.create` and
+    `batches.retrieve`. Jobs run in a background thread, each request through
+    `responder`, so the broker's upload/poll/download cycle is exercised exactly as
+    with a real provider.
+    """
+
+    def __init__(
+        self,
+        completion_client: Any = None,
+        responder: Optional[Callable[[Dict[str, Any]], Dict[str, Any]]] = None,
+        max_workers: int = LOCAL_BATCH_WORKERS,
+    ) -> None:
+        """
+        :param completion_client: OpenAI-compatible client whose synchronous chat
+            completions API serves the requests.
+        :param responder: Function mapping a request body to a chat completion dict,
+            used instead of `completion_client` (e.g. a deterministic fake in tests).
+        :param max_workers: Number of requests of a job run at the same time.
+        """
+        if responder is None:
+            if completion_client is None:
+                raise ValueError("LocalBatchClient needs a completion_client or a responder.")
+
+            def responder(body: Dict[str, Any]) -> Dict[str, Any]:
+                completion = completion_client.chat.completions.create(**body)
+                return completion.model_dump(mode="json")
+
+        self.responder = responder
+        self.max_workers = max_workers
+        self._files: Dict[str, _LocalFile] = {}
+        self._batches: Dict[str, LocalBatch] = {}
+        self._lock = threading.Lock()
+        # The endpoints, under the same attribute names as on the OpenAI client
+        self.files = _LocalFiles(self)
+        self.batches = _LocalBatches(self)
+
+    def _store_locked(self, text: str) -> _LocalFile:
+        local_file = _LocalFile(id=f"file-{uuid.uuid4().hex}", text=text)
+        self._files[local_file.id] = local_file
+        return local_file
+
+    def _run(self, batch: LocalBatch) -> None:
+        """Answer every request of a job and write its output and error files."""
+        text = self.files.content(batch.input_file_id).text
+        lines = [json.loads(line) for line in text.splitlines() if line.strip()]
+
+        def answer(line: Dict[str, Any]) -> Tuple[bool, Dict[str, Any]]:
+            try:
+                body = self.responder(line["body"])
+            except Exception as e:
+                return False, {
+                    "custom_id": line["custom_id"],
+                    "response": None,
+                    "error": {"code": type(e).__name__, "message": str(e)},
+                }
+            return True, {
+                "custom_id": line["custom_id"],
+                "response": {"status_code": 200, "body": body},
+                "error": None,
+            }
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            results = list(executor.map(answer, lines))
+
+        outputs = [json.dumps(result) for ok, result in results if ok]
+        errors = [json.dumps(result) for ok, result in results if not ok]
+        with self._lock:
+            if outputs:
+                batch.output_file_id = self._store_locked("\n".join(outputs)).id
+            if errors:
+                batch.error_file_id = self._store_locked("\n".join(errors)).id
+            batch.status = "completed"
+
+
+class _LocalFiles:
+    """The `files` endpoints of `LocalBatchClient`."""
+
+    def __init__(self, client: LocalBatchClient) -> None:
+        self._client = client
+
+    def create(self, file: Any, purpose: str = "batch") -> _LocalFile:
+        """Upload a file, given as bytes, a file object or a (name, content) tuple."""
+        if isinstance(file, tuple):
+            file = file[1]
+        if hasattr(file, "read"):
+            file = file.read()
+        if isinstance(file, bytes):
+            file = file.decode("utf-8")
+        with self._client._lock:
+            return self._client._store_locked(file)
+
+    def content(self, file_id: str) -> _LocalFile:
+        """Return an uploaded or generated file (its contents are in `.text`)."""
+        with self._client._lock:
+            return self._client._files[file_id]
+
+
+class _LocalBatches:
+    """The `batches` endpoints of `LocalBatchClient`."""
+
+    def __init__(self, client: LocalBatchClient) -> None:
+        self._client = client
+
+    def create(
+        self, input_file_id: str, endpoint: str, completion_window: str, **kwargs: Any
+    ) -> LocalBatch:
+        """Start a job over the requests of an uploaded JSONL file."""
+        if endpoint != BATCH_ENDPOINT:
+            raise ValueError(f"Unsupported batch endpoint: {endpoint}")
+        batch = LocalBatch(id=f"batch-{uuid.uuid4().hex}", input_file_id=input_file_id)
+        with self._client._lock:
+            self._client._batches[batch.id] = batch
+        threading.Thread(target=self._client._run, args=(batch,), daemon=True).start()
+        return batch
+
+    def retrieve(self, batch_id: str) -> LocalBatch:
+        """Return the current status of a job."""
+        with self._client._lock:
+            return self._client._batches[batch_id]
+
+
+###############################################################################
+# Broker
+###############################################################################
+
+
+class _PendingRequest:
+    """A completion request waiting for the next batch job."""
+
+    def __init__(self, body: Dict[str, Any]) -> None:
+        self.body = body
+        self.done = threading.Event()
+        self.response: Optional[ChatCompletion] = None
+        self.error: Optional[BaseException] = None
+
+    def resolve(
+        self, response: Optional[ChatCompletion] = None, error: Optional[BaseException] = None
+    ) -> None:
+        self.response, self.error = response, error
+        self.done.set()
+
+
+def default_batch_client(provider: str) -> Any:
+    """
+    Return the client that runs batch jobs for a provider.
+
+    Providers configured with `batch_api` (such as OpenAI) run the jobs themselves;
+    the others are served by the local stand-in, which sends the requests to their
+    synchronous API within the provider's concurrency limit.
+
+    :param provider: Provider returned by `clients.model_provider`.
+    :return: An OpenAI client or a `LocalBatchClient`.
+    """
+    settings = get_provider_by_name(provider)
+    if settings.batch_api:
+        return init_openai_client(provider)
+    return LocalBatchClient(
+        init_openai_client(provider),
+        max_workers=settings.max_concurrency or LOCAL_BATCH_WORKERS,
+    )
+
+
+class BatchBroker:
+    """
+    Collects the completion requests of concurrently running meetings into batch jobs.
+
+    A step is submitted when every participant that has not left yet is waiting on a
+    request, so each job holds at most one request per meeting.
+    """
+
+    def __init__(
+        self,
+        participants: int,
+        clients: Optional[Mapping[str, Any]] = None,
+        poll_interval: float = BATCH_POLL_INTERVAL,
+        completion_window: str = BATCH_COMPLETION_WINDOW,
+    ) -> None:
+        """
+        :param participants: Number of meetings sharing the broker. Each must call
+            `leave` when it ends, successfully or not.
+        :param clients: Batch client per provider (defaults to `default_batch_client`).
+        :param poll_interval: Seconds between status checks of a submitted job.
+        :param completion_window: Completion window requested for each job.
+        """
+        self.poll_interval = poll_interval
+        self.completion_window = completion_window
+        self._clients: Dict[str, Any] = dict(clients or {})
+        self._participants = participants
+        self._pending: List[_PendingRequest] = []
+        self._lock = threading.Lock()
+        self.jobs_submitted = 0
+
+    def _take_step_locked(self) -> List[_PendingRequest]:
+        """Return the pending requests if every remaining participant is waiting."""
+        if self._pending and len(self._pending) >= self._participants:
+            step, self._pending = self._pending, []
+            return step
+        return []
+
+    def complete(self, body: Dict[str, Any]) -> ChatCompletion:
+        """
+        Get a chat completion through the next batch job (blocks until it is done).
+
+        :param body: Keyword arguments of `chat.completions.create`.
+        :return: The completion.
+        :raises BatchRequestError: If the request failed in the batch job.
+        """
+        request = _PendingRequest(body)
+        with self._lock:
+            self._pending.append(request)
+            step = self._take_step_locked()
+        if step:
+            self._run_step(step)
+        request.done.wait()
+        if request.error is not None:
+            raise request.error
+        return request.response
+
+    def leave(self) -> None:
+        """Remove a finished meeting, submitting the step the others are waiting on."""
+        with self._lock:
+            self._participants -= 1
+            step = self._take_step_locked()
+        if step:
+            self._run_step(step)
+
+    def _client(self, provider: str) -> Any:
+        with self._lock:
+            if provider not in self._clients:
+                self._clients[provider] = default_batch_client(provider)
+            return self._clients[provider]
+
+    def _run_step(self, step: List[_PendingRequest]) -> None:
+        """Submit one job per provider for a step and resolve its requests."""
+        by_provider: Dict[str, List[_PendingRequest]] = {}
+        for request in step:
+            by_provider.setdefault(model_provider(request.body["model"]), []).append(request)
+
+        submitted = []
+        for provider, requests in by_provider.items():
+            try:
+                client = self._client(provider)
+                submitted.append((client, self._submit(client, requests), requests))
+            except Exception as e:
+                for request in requests:
+                    request.resolve(error=e)
+
+        for client, batch_id, requests in submitted:
+            try:
+                self._collect(client, batch_id, requests)
+            except Exception as e:
+                for request in requests:
+                    if not request.done.is_set():
+                        request.resolve(error=e)
+
+    def _submit(self, client: Any, requests: List[_PendingRequest]) -> str:
+        """Upload the requests as JSONL and create the batch job."""
+        lines = [
+            json.dumps(
+                {
+                    "custom_id": f"request-{idx}",
+                    "method": "POST",
+                    "url": BATCH_ENDPOINT,
+                    "body": request.body,
+                }
+            )
+            for idx, request in enumerate(requests)
+        ]
+        input_file = client.files.create(
+            file=("batch.jsonl", io.BytesIO("\n".join(lines).encode("utf-8"))),
+            purpose="batch",
+        )
+        batch = client.batches.create(
+            input_file_id=input_file.id,
+            endpoint=BATCH_ENDPOINT,
+            completion_window=self.completion_window,
+        )
+        with self._lock:
+            self.jobs_submitted += 1
+        return batch.id
+
+    def _collect(self, client: Any, batch_id: str, requests: List[_PendingRequest]) -> None:
+        """Poll a job until it ends, then hand each request its response or error."""
+        batch = client.batches.retrieve(batch_id)
+        while batch.status not in _FINAL_BATCH_STATUSES:
+            time.sleep(self.poll_interval)
+            batch = client.batches.retrieve(batch_id)
+
+        results: Dict[str, Dict[str, Any]] = {}
+        for file_id in (batch.output_file_id, batch.error_file_id):
+            if file_id:
+                for line in client.files.content(file_id).text.splitlines():
+                    if line.strip():
+                        result = json.loads(line)
+                        results[result["custom_id"]] = result
+
+        for idx, request in enumerate(requests):
+            result = results.get(f"request-{idx}")
+            if result is None:
+                error = f"Batch {batch_id} ended as {batch.status} without a result."
+                request.resolve(error=BatchRequestError(error))
+            elif result.get("error") or (result["response"] or {}).get("status_code") != 200:
+                error = f"Batch {batch_id} request failed: {result.get('error') or result['response']}"
+                request.resolve(error=BatchRequestError(error))
+            else:
+                request.resolve(ChatCompletion.model_validate(result["response"]["body"]))
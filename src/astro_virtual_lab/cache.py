@@ -0,0 +1,97 @@
+"""
+On-disk cache of LLM completions for astro_virtual_lab.
+
+Each agent turn is keyed by everything that determines the request: the model, the
+temperature, the agent's system prompt, the conversation so far and the tools offered.
+A meeting re-run with the same cache directory therefore replays every turn that
+already completed and only calls the API from the first missing turn onwards, which
+is how interrupted batches are resumed.
+
+Entries are small JSON files written with `atomic_writer`, so concurrent meetings can
+share one cache directory.
+
+Example:
+    from astro_virtual_lab.cache import CompletionCache
+
+    cache = CompletionCache(Path(".avl_cache"))
+    run_meeting(..., cache=cache)
+"""
+
+import hashlib
+import json
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from astro_virtual_lab.utils import atomic_writer
+
+
+class CompletionCache:
+    """Content-addressed store of completion texts under a cache directory."""
+
+    def __init__(self, cache_dir: Path) -> None:
+        """
+        :param cache_dir: Directory holding the cache entries (created if missing).
+        """
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+
+    @staticmethod
+    def make_key(
+        model: str,
+        temperature: float,
+        system_prompt: str,
+        conversation: List[Dict[str, str]],
+        tool_names: Optional[tuple[str, ...]] = None,
+        max_tokens: Optional[int] = None,
+    ) -> str:
+        """
+        Hash the inputs of one agent turn.
+
+        :param model: Model name.
+        :param temperature: Sampling temperature.
+        :param system_prompt: The agent's system prompt.
+        :param conversation: The discussion so far (list of dicts with 'agent','message').
+        :param tool_names: Tools offered to the agent (None when tools are disabled).
+        :param max_tokens: Completion token budget of the turn (None when uncapped).
+        :return: Hex digest identifying the turn.
+        """
+        fields = [model, temperature, system_prompt, conversation, tool_names]
+        # Only capped turns hash the budget, so the keys of uncapped turns (the
+        # default) are those of entries written before budgets existed
+        if max_tokens is not None:
+            fields.append(max_tokens)
+        payload = json.dumps(fields, separators=(",", ":"))
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def _path(self, key: str) -> Path:
+        """Shard entries by the first two hex digits to keep directories small."""
+        return self.cache_dir / key[:2] / f"{key}.json"
+
+    def get(self, key: str) -> Optional[str]:
+        """Return the cached completion for `key`, or None."""
+        try:
+            with self._path(key).open("r", encoding="utf-8") as f:
+                return json.load(f)["content"]
+        except (FileNotFoundError, json.JSONDecodeError, KeyError):
+            return None
+
+    def put(self, key: str, content: str, **metadata: Any) -> None:
+        """
+        Store a completion.
+
+        :param key: Key returned by `make_key`.
+        :param content: Completion text.
+        :param metadata: Extra JSON-serializable fields kept with the entry (e.g. model).
+        """
+        path = self._path(key)
+        path.parent.mkdir(exist_ok=True)
+        with atomic_writer(path) as f:
+            json.dump({"content": content, **metadata}, f)
+
+    def stats(self) -> Dict[str, int]:
+        """Return the number of entries and their total size in bytes."""
+        entries = list(self.cache_dir.glob("??/*.json"))
+        return {
+            "entries": len(entries),
+            "bytes": sum(entry.stat().st_size for entry in entries),
+        }
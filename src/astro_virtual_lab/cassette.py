@@ -0,0 +1,256 @@
+"""
+Deterministic record/replay of provider traffic for astro_virtual_lab.
+
+A `Cassette` captures every request/response pair sent to the providers of a meeting:
+LLM completions, and the ADS and SIMBAD calls made through `utils` (blocking and
+asyncio-native). In record mode the calls go to the network and their responses and
+latencies are kept; in replay mode the same requests are answered from the cassette,
+without network access or API keys, either instantly or at (a multiple of) their
+original latency. Orchestration overhead, concurrency modes and caches can then be
+benchmarked against realistic traffic, and behavior changes compared run to run.
+
+Requests are matched by a hash of their content. A request made several times is
+answered with its recordings in order, and with the last one once they run out, so a
+recorded meeting can be replayed any number of times (e.g. concurrently, for load
+tests). Failed calls are not recorded.
+
+Streamed completions are recorded whole. When a meeting streaming its events is
+replayed, each replayed reply is emitted as a single `TokenDelta` holding its full
+text, after the recorded latency, rather than as the original fragments.
+
+Cassettes are gzip-compressed JSON Lines files holding only request hashes, responses
+and latencies.
+
+Example:
+    from astro_virtual_lab.cassette import Cassette
+
+    with Cassette(Path("meeting.cassette.gz"), mode="record"):
+        run_meeting(...)
+
+    with Cassette(Path("meeting.cassette.gz"), mode="replay", latency_scale=1.0):
+        run_meeting(...)  # same traffic, original timing, no network
+"""
+
+import asyncio
+import gzip
+import hashlib
+import json
+import threading
+import time
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, List, Literal, Optional
+
+CASSETTE_VERSION = 1
+
+CassetteMode = Literal["record", "replay"]
+
+_ACTIVE: Optional["Cassette"] = None
+_ACTIVE_LOCK = threading.Lock()
+
+
+class CassetteMissError(LookupError):
+    """Raised in replay mode for a request that the cassette did not record."""
+
+
+def _identity(value: Any) -> Any:
+    return value
+
+
+class Cassette:
+    """Recorded provider traffic, activated for the whole process with `with`."""
+
+    def __init__(
+        self, path: Path, mode: CassetteMode = "replay", latency_scale: float = 0.0
+    ) -> None:
+        """
+        :param path: Cassette file (written on exit in record mode).
+        :param mode: "record" to capture live traffic, "replay" to serve it.
+        :param latency_scale: In replay mode, multiple of the recorded latency to wait
+            before answering (0 answers instantly, 1 reproduces the original timing).
+        """
+        if mode not in ("record", "replay"):
+            raise ValueError(f"Invalid cassette mode: {mode}. Must be 'record' or 'replay'.")
+        self.path = Path(path)
+        self.mode = mode
+        self.latency_scale = latency_scale
+        self._entries: Dict[str, List[Dict[str, Any]]] = {}
+        self._replayed: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        if mode == "replay":
+            self.load()
+
+    ###########################################################################
+    # Persistence
+    ###########################################################################
+
+    def load(self) -> None:
+        """Read the recorded entries from `path`."""
+        entries: Dict[str, List[Dict[str, Any]]] = {}
+        with gzip.open(self.path, "rt", encoding="utf-8") as f:
+            header = json.loads(f.readline())
+            if header.get("version") != CASSETTE_VERSION:
+                raise ValueError(
+                    f"Unsupported cassette version {header.get('version')} in {self.path}"
+                )
+            for line in f:
+                entry = json.loads(line)
+                entries.setdefault(entry["key"], []).append(entry)
+        with self._lock:
+            self._entries = entries
+            self._replayed = {}
+
+    def save(self) -> None:
+        """Write the recorded entries to `path`, replacing the file atomically."""
+        # Imported here because utils records its ADS and SIMBAD calls through this module
+        from astro_virtual_lab.utils import atomic_writer
+
+        with self._lock:
+            entries = [entry for recorded in self._entries.values() for entry in recorded]
+        entries.sort(key=lambda entry: entry["seq"])
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with atomic_writer(self.path, compress=True) as f:
+            f.write(json.dumps({"version": CASSETTE_VERSION}) + "\n")
+            for entry in entries:
+                f.write(json.dumps(entry, separators=(",", ":")) + "\n")
+
+    def __enter__(self) -> "Cassette":
+        global _ACTIVE
+        with _ACTIVE_LOCK:
+            if _ACTIVE is not None:
+                raise RuntimeError(f"Cassette {_ACTIVE.path} is already active.")
+            _ACTIVE = self
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        global _ACTIVE
+        with _ACTIVE_LOCK:
+            _ACTIVE = None
+        if self.mode == "record":
+            self.save()
+
+    ###########################################################################
+    # Recording and replaying
+    ###########################################################################
+
+    @staticmethod
+    def make_key(kind: str, request: Dict[str, Any]) -> str:
+        """
+        Hash one provider request.
+
+        :param kind: Provider of the request ("llm", "ads" or "simbad").
+        :param request: JSON-serializable description of everything the response depends on.
+        :return: Hex digest identifying the request.
+        """
+        payload = json.dumps([kind, request], sort_keys=True, separators=(",", ":"))
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def _record(self, key: str, kind: str, response: Any, latency: float) -> None:
+        with self._lock:
+            seq = sum(len(recorded) for recorded in self._entries.values())
+            self._entries.setdefault(key, []).append(
+                {"seq": seq, "key": key, "kind": kind, "latency": latency, "response": response}
+            )
+
+    def _lookup(self, key: str, kind: str) -> Dict[str, Any]:
+        with self._lock:
+            recorded = self._entries.get(key)
+            if not recorded:
+                raise CassetteMissError(
+                    f"No recorded {kind} request matches this call in {self.path}."
+                )
+            idx = self._replayed.get(key, 0)
+            self._replayed[key] = idx + 1
+        return recorded[min(idx, len(recorded) - 1)]
+
+    def call(
+        self,
+        kind: str,
+        request: Dict[str, Any],
+        perform: Callable[[], Any],
+        encode: Callable[[Any], Any] = _identity,
+        decode: Callable[[Any], Any] = _identity,
+    ) -> Any:
+        """
+        Record or replay one blocking provider call.
+
+        :param kind: Provider of the request ("llm", "ads" or "simbad").
+        :param request: JSON-serializable description of the request.
+        :param perform: Makes the live call.
+        :param encode: Converts the live response to JSON-serializable data.
+        :param decode: Converts recorded data back to the response type.
+        :return: The live or replayed response.
+        """
+        key = self.make_key(kind, request)
+        if self.mode == "record":
+            start = time.perf_counter()
+            response = perform()
+            self._record(key, kind, encode(response), time.perf_counter() - start)
+            return response
+
+        entry = self._lookup(key, kind)
+        if self.latency_scale > 0:
+            time.sleep(entry["latency"] * self.latency_scale)
+        return decode(entry["response"])
+
+    async def acall(
+        self,
+        kind: str,
+        request: Dict[str, Any],
+        perform: Callable[[], Awaitable[Any]],
+        encode: Callable[[Any], Any] = _identity,
+        decode: Callable[[Any], Any] = _identity,
+    ) -> Any:
+        """Asyncio-native version of `call`, for coroutine-based provider calls."""
+        key = self.make_key(kind, request)
+        if self.mode == "record":
+            start = time.perf_counter()
+            response = await perform()
+            self._record(key, kind, encode(response), time.perf_counter() - start)
+            return response
+
+        entry = self._lookup(key, kind)
+        if self.latency_scale > 0:
+            await asyncio.sleep(entry["latency"] * self.latency_scale)
+        return decode(entry["response"])
+
+    def stats(self) -> Dict[str, int]:
+        """Return the number of recorded calls per provider."""
+        counts: Dict[str, int] = {}
+        with self._lock:
+            for recorded in self._entries.values():
+                for entry in recorded:
+                    counts[entry["kind"]] = counts.get(entry["kind"], 0) + 1
+        return counts
+
+
+def active_cassette() -> Optional[Cassette]:
+    """Return the cassette activated with `with Cassette(...)`, if any."""
+    return _ACTIVE
+
+
+def through_cassette(
+    kind: str,
+    request: Dict[str, Any],
+    perform: Callable[[], Any],
+    encode: Callable[[Any], Any] = _identity,
+    decode: Callable[[Any], Any] = _identity,
+) -> Any:
+    """Make a provider call through the active cassette, or directly without one."""
+    cassette = _ACTIVE
+    if cassette is None:
+        return perform()
+    return cassette.call(kind, request, perform, encode=encode, decode=decode)
+
+
+async def through_cassette_async(
+    kind: str,
+    request: Dict[str, Any],
+    perform: Callable[[], Awaitable[Any]],
+    encode: Callable[[Any], Any] = _identity,
+    decode: Callable[[Any], Any] = _identity,
+) -> Any:
+    """Asyncio-native version of `through_cassette`."""
+    cassette = _ACTIVE
+    if cassette is None:
+        return await perform()
+    return await cassette.acall(kind, request, perform, encode=encode, decode=decode)
@@ -0,0 +1,587 @@
+"""
+Local survey catalog access for astro_virtual_lab tools.
+
+Catalogs (FITS, NumPy, CSV or Parquet) are read column-by-column in fixed-size chunks,
+so tables with millions of rows never have to fit in memory. FITS tables and NumPy
+arrays are memory-mapped and Parquet files are read batch-by-batch with only the
+requested columns.
+
+The tools built on top of these readers return compact summaries (counts, separations,
+statistics) rather than row dumps, so their output fits comfortably in an LLM context.
+
+Example:
+    from astro_virtual_lab.catalogs import binned_median, crossmatch_catalog
+
+    summary = crossmatch_catalog(
+        catalog_path="apogee_dr17_subset.fits",
+        object_names=["Arcturus", "HD 122563"],
+        radius_arcsec=2.0,
+    )
+    trend = binned_median("apogee_dr17_subset.fits", x_column="FE_H", y_column="ALPHA_M")
+"""
+
+import asyncio
+import csv
+import gzip
+from itertools import islice
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+import astropy.units as u
+import numpy as np
+from astropy.coordinates import SkyCoord
+from astropy.io import fits
+
+from astro_virtual_lab.config import get_setting
+from astro_virtual_lab.constants import (
+    CATALOG_CHUNK_ROWS,
+    CROSSMATCH_MAX_TARGETS,
+    DEFAULT_DATA_DIR,
+    SURVEY_MAX_BINS,
+    SURVEY_QUANTILE_RESOLUTION,
+)
+from astro_virtual_lab.tools import tool
+from astro_virtual_lab.clients import close_async_http_client
+from astro_virtual_lab.utils import query_simbad_async
+
+_FITS_SUFFIXES = (".fits", ".fit", ".fts", ".fits.gz")
+_CSV_SUFFIXES = (".csv", ".csv.gz", ".tsv", ".tsv.gz")
+_PARQUET_SUFFIXES = (".parquet", ".pq")
+_NUMPY_SUFFIXES = (".npy",)
+
+
+###############################################################################
+# Catalog readers
+###############################################################################
+
+
+def resolve_data_path(path: str) -> Path:
+    """
+    Resolve a catalog path requested by an agent.
+
+    Relative paths are resolved against `data_dir` from config.yml (by default
+    `./data`), and paths outside of it are rejected, so agents can only read the
+    configured data whatever path they ask for.
+
+    :param path: Absolute path, or path relative to the data directory.
+    :return: The resolved path of an existing file (or directory of .npy columns).
+    """
+    data_dir = get_setting("data_dir", default=DEFAULT_DATA_DIR)
+    root = Path(data_dir).expanduser().resolve()
+    resolved = (root / Path(path).expanduser()).resolve()
+    if not resolved.is_relative_to(root):
+        raise PermissionError(f"'{path}' is outside of the data directory ({root}).")
+
+    if not resolved.exists():
+        raise FileNotFoundError(f"Catalog file not found: {path}")
+    return resolved
+
+
+def _match_columns(available: Sequence[str], columns: Sequence[str]) -> List[str]:
+    """Map requested column names onto the file's columns, ignoring case."""
+    by_lower = {name.lower(): name for name in available}
+    missing = [column for column in columns if column.lower() not in by_lower]
+    if missing:
+        raise KeyError(
+            f"Columns {missing} not found; available columns: {list(available)[:50]}"
+        )
+    return [by_lower[column.lower()] for column in columns]
+
+
+def iter_catalog_columns(
+    path: Path, columns: Sequence[str], chunk_size: int = CATALOG_CHUNK_ROWS
+) -> Iterator[Dict[str, np.ndarray]]:
+    """
+    Stream selected numeric columns of a catalog in chunks.
+
+    :param path: FITS (first table HDU), structured .npy array, directory of per-column
+        .npy files, CSV/TSV (optionally gzipped) or Parquet file.
+    :param columns: Column names to read (case-insensitive).
+    :param chunk_size: Number of rows per chunk.
+    :return: Iterator of {requested column name: float array} chunks.
+    """
+    name = path.name.lower()
+    if path.is_dir() or name.endswith(_NUMPY_SUFFIXES):
+        yield from _iter_numpy_columns(path, columns, chunk_size)
+    elif name.endswith(_FITS_SUFFIXES):
+        yield from _iter_fits_columns(path, columns, chunk_size)
+    elif name.endswith(_CSV_SUFFIXES):
+        yield from _iter_csv_columns(path, columns, chunk_size)
+    elif name.endswith(_PARQUET_SUFFIXES):
+        yield from _iter_parquet_columns(path, columns, chunk_size)
+    else:
+        raise ValueError(
+            f"Unsupported catalog format: {path.name}. Use FITS, NumPy, CSV or Parquet."
+        )
+
+
+def _iter_fits_columns(
+    path: Path, columns: Sequence[str], chunk_size: int
+) -> Iterator[Dict[str, np.ndarray]]:
+    """Yield chunks of a FITS table, slicing memory-mapped columns."""
+    with fits.open(path, memmap=True) as hdul:
+        table_hdu = next(
+            (hdu for hdu in hdul if isinstance(hdu, (fits.BinTableHDU, fits.TableHDU))),
+            None,
+        )
+        if table_hdu is None:
+            raise ValueError(f"No table HDU found in {path.name}.")
+
+        data = table_hdu.data
+        file_columns = _match_columns(table_hdu.columns.names, columns)
+        for start in range(0, len(data), chunk_size):
+            yield {
+                column: np.asarray(data[file_column][start : start + chunk_size], dtype=float)
+                for column, file_column in zip(columns, file_columns)
+            }
+
+
+def _iter_numpy_columns(
+    path: Path, columns: Sequence[str], chunk_size: int
+) -> Iterator[Dict[str, np.ndarray]]:
+    """Yield chunks of memory-mapped NumPy columns.
+
+    `path` is either a structured .npy array with named fields, or a directory holding
+    one 1-D `<column>.npy` file per column.
+    """
+    if path.is_dir():
+        available = {file.stem: file for file in path.glob("*.npy")}
+        file_columns = _match_columns(list(available), columns)
+        arrays = [np.load(available[column], mmap_mode="r") for column in file_columns]
+    else:
+        data = np.load(path, mmap_mode="r")
+        if data.dtype.names is None:
+            raise ValueError(f"{path.name} is not a structured array with named columns.")
+        file_columns = _match_columns(data.dtype.names, columns)
+        arrays = [data[column] for column in file_columns]
+
+    num_rows = min(len(array) for array in arrays)
+    for start in range(0, num_rows, chunk_size):
+        yield {
+            column: np.asarray(array[start : start + chunk_size], dtype=float)
+            for column, array in zip(columns, arrays)
+        }
+
+
+def _iter_csv_columns(
+    path: Path, columns: Sequence[str], chunk_size: int
+) -> Iterator[Dict[str, np.ndarray]]:
+    """Yield chunks of a delimited text table, parsing only the requested columns."""
+    name = path.name.lower()
+    delimiter = "\t" if ".tsv" in name else ","
+    opener = gzip.open if name.endswith(".gz") else open
+
+    with opener(path, "rt", encoding="utf-8", newline="") as f:
+        reader = csv.reader(f, delimiter=delimiter)
+        header = next(reader)
+        file_columns = _match_columns(header, columns)
+        indices = [header.index(file_column) for file_column in file_columns]
+
+        while rows := list(islice(reader, chunk_size)):
+            yield {
+                column: np.array(
+                    [_parse_float(row[index]) if index < len(row) else np.nan for row in rows],
+                    dtype=float,
+                )
+                for column, index in zip(columns, indices)
+            }
+
+
+def _parse_float(value: str) -> float:
+    """Parse a CSV cell, mapping empty or non-numeric cells to NaN."""
+    try:
+        return float(value)
+    except ValueError:
+        return np.nan
+
+
+def _iter_parquet_columns(
+    path: Path, columns: Sequence[str], chunk_size: int
+) -> Iterator[Dict[str, np.ndarray]]:
+    """Yield record batches of a Parquet file, reading only the requested columns."""
+    try:
+        import pyarrow.parquet as pq
+    except ImportError as e:
+        raise ImportError(
+            "Reading Parquet catalogs requires pyarrow: pip install pyarrow"
+        ) from e
+
+    parquet_file = pq.ParquetFile(path)
+    file_columns = _match_columns(parquet_file.schema_arrow.names, columns)
+    for batch in parquet_file.iter_batches(batch_size=chunk_size, columns=file_columns):
+        yield {
+            column: batch.column(file_column).to_numpy(zero_copy_only=False).astype(float)
+            for column, file_column in zip(columns, file_columns)
+        }
+
+
+###############################################################################
+# Cross-matching
+###############################################################################
+
+
+async def _resolve_objects(object_names: Sequence[str]) -> List[Dict[str, Any]]:
+    """Resolve object names concurrently through SIMBAD."""
+    try:
+        return await asyncio.gather(
+            *(query_simbad_async(name, verbose=False) for name in object_names),
+            return_exceptions=True,
+        )
+    finally:
+        # The pooled client is bound to this short-lived loop; close it with the loop
+        await close_async_http_client()
+
+
+@tool(timeout=300.0, max_concurrency=2, cpu_bound=True, hidden=("chunk_size",))
+def crossmatch_catalog(
+    catalog_path: str,
+    object_names: List[str],
+    radius_arcsec: float = 1.0,
+    ra_column: str = "ra",
+    dec_column: str = "dec",
+    chunk_size: int = CATALOG_CHUNK_ROWS,
+) -> Dict[str, Any]:
+    """
+    Cross-match a local survey catalog against objects resolved by SIMBAD.
+
+    The objects are resolved concurrently, then the catalog is streamed in chunks and
+    matched with vectorized `SkyCoord.match_to_catalog_sky`, keeping the nearest
+    catalog row for every object and counting the rows within the match radius.
+
+    The objects are resolved in an event loop of their own, so this function blocks
+    and must not be called from a running event loop (use `asyncio.to_thread`).
+
+    :param catalog_path: Path to a FITS, CSV or Parquet catalog with RA/Dec in degrees.
+    :param object_names: Names or identifiers of the objects to look up in SIMBAD.
+    :param radius_arcsec: Match radius in arcseconds.
+    :param ra_column: Name of the right ascension column (degrees, ICRS).
+    :param dec_column: Name of the declination column (degrees, ICRS).
+    :param chunk_size: Number of catalog rows processed per chunk.
+    :return: Summary with per-object nearest matches and overall match statistics.
+    """
+    if not object_names:
+        raise ValueError("Provide at least one object name to cross-match.")
+    if len(object_names) > CROSSMATCH_MAX_TARGETS:
+        raise ValueError(
+            f"At most {CROSSMATCH_MAX_TARGETS} objects can be cross-matched per call."
+        )
+
+    path = resolve_data_path(catalog_path)
+
+    # Resolve the objects, keeping track of those SIMBAD does not know
+    names, ra_deg, dec_deg, unresolved = [], [], [], []
+    for name, result in zip(object_names, asyncio.run(_resolve_objects(object_names))):
+        if isinstance(result, Exception) or "error" in result:
+            unresolved.append(name)
+            continue
+        names.append((name, result["name"]))
+        ra_deg.append(result["coordinates"]["ra_deg"])
+        dec_deg.append(result["coordinates"]["dec_deg"])
+
+    summary: Dict[str, Any] = {
+        "catalog": path.name,
+        "radius_arcsec": radius_arcsec,
+        "rows_scanned": 0,
+        "unresolved": unresolved,
+    }
+    if not names:
+        summary["targets"] = []
+        summary["num_matched"] = 0
+        return summary
+
+    targets = SkyCoord(ra=ra_deg * u.deg, dec=dec_deg * u.deg, frame="icrs")
+    radius = radius_arcsec * u.arcsec
+
+    best_sep = np.full(len(targets), np.inf)
+    best_row = np.full(len(targets), -1, dtype=np.int64)
+    rows_within = np.zeros(len(targets), dtype=np.int64)
+    row_offset = 0
+
+    for chunk in iter_catalog_columns(path, (ra_column, dec_column), chunk_size):
+        ra, dec = chunk[ra_column], chunk[dec_column]
+        valid = np.flatnonzero(np.isfinite(ra) & np.isfinite(dec))
+        if len(valid) > 0:
+            catalog = SkyCoord(ra=ra[valid] * u.deg, dec=dec[valid] * u.deg, frame="icrs")
+
+            # Nearest row of this chunk for every target
+            idx, sep, _ = targets.match_to_catalog_sky(catalog)
+            sep_arcsec = sep.arcsec
+            closer = sep_arcsec < best_sep
+            best_sep[closer] = sep_arcsec[closer]
+            best_row[closer] = row_offset + valid[idx[closer]]
+
+            # Rows of this chunk within the radius of their nearest target
+            target_idx, target_sep, _ = catalog.match_to_catalog_sky(targets)
+            within = target_sep < radius
+            rows_within += np.bincount(target_idx[within], minlength=len(targets))
+
+        row_offset += len(ra)
+
+    matched = best_sep <= radius_arcsec
+    summary["rows_scanned"] = row_offset
+    summary["num_matched"] = int(matched.sum())
+    summary["targets"] = [
+        {
+            "name": name,
+            "simbad_id": simbad_id,
+            "ra_deg": round(float(target.ra.deg), 6),
+            "dec_deg": round(float(target.dec.deg), 6),
+            "matched": bool(matched[i]),
+            "nearest_row": int(best_row[i]) if best_row[i] >= 0 else None,
+            "nearest_separation_arcsec": (
+                round(float(best_sep[i]), 3) if np.isfinite(best_sep[i]) else None
+            ),
+            "rows_within_radius": int(rows_within[i]),
+        }
+        for i, ((name, simbad_id), target) in enumerate(zip(names, targets))
+    ]
+    if summary["num_matched"]:
+        summary["median_match_separation_arcsec"] = round(
+            float(np.median(best_sep[matched])), 3
+        )
+    return summary
+
+
+###############################################################################
+# Survey statistics
+###############################################################################
+#
+# Exact quantiles of a streamed column would need every value in memory. Instead,
+# a first pass finds the value range and a second pass accumulates fine-grained
+# histograms, from which quantiles are interpolated to within
+# 1/SURVEY_QUANTILE_RESOLUTION of the range.
+
+
+def _sig(value: float, digits: int = 4) -> Optional[float]:
+    """Round to a few significant digits to keep tool output compact."""
+    if value is None or not np.isfinite(value):
+        return None
+    return float(f"{value:.{digits}g}")
+
+
+def _filtered_chunks(
+    path: Path,
+    columns: Sequence[str],
+    filters: Optional[Dict[str, Sequence[float]]],
+    chunk_size: int,
+) -> Iterator[Tuple[Dict[str, np.ndarray], np.ndarray]]:
+    """Yield (chunk, row mask) pairs, the mask applying the inclusive range filters."""
+    filters = filters or {}
+    wanted = list(dict.fromkeys([*columns, *filters]))
+    for chunk in iter_catalog_columns(path, wanted, chunk_size):
+        mask = np.ones(len(chunk[wanted[0]]), dtype=bool)
+        for column, (low, high) in filters.items():
+            values = chunk[column]
+            mask &= (values >= low) & (values <= high)
+        yield chunk, mask
+
+
+def _value_ranges(
+    path: Path,
+    columns: Sequence[str],
+    filters: Optional[Dict[str, Sequence[float]]],
+    chunk_size: int,
+) -> Dict[str, Tuple[float, float]]:
+    """First pass: finite min/max of each column over the filtered rows."""
+    ranges = {column: (np.inf, -np.inf) for column in columns}
+    for chunk, mask in _filtered_chunks(path, columns, filters, chunk_size):
+        for column in columns:
+            values = chunk[column][mask]
+            values = values[np.isfinite(values)]
+            if len(values):
+                low, high = ranges[column]
+                ranges[column] = (min(low, values.min()), max(high, values.max()))
+    return ranges
+
+
+def _histogram_quantiles(
+    counts: np.ndarray, edges: np.ndarray, quantiles: Sequence[float]
+) -> List[Optional[float]]:
+    """Interpolate quantiles (0-1) from a histogram."""
+    total = counts.sum()
+    if total == 0:
+        return [None for _ in quantiles]
+    cumulative = np.concatenate([[0.0], np.cumsum(counts) / total])
+    return [_sig(np.interp(q, cumulative, edges)) for q in quantiles]
+
+
+def _check_bins(bins: int) -> int:
+    """Reject bin counts that would produce oversized tool output."""
+    if not 1 <= bins <= SURVEY_MAX_BINS:
+        raise ValueError(f"bins must be between 1 and {SURVEY_MAX_BINS}.")
+    return int(bins)
+
+
+@tool(timeout=300.0, max_concurrency=2, cpu_bound=True, hidden=("chunk_size",))
+def binned_median(
+    catalog_path: str,
+    x_column: str,
+    y_column: str,
+    bins: int = 10,
+    x_range: Optional[Sequence[float]] = None,
+    filters: Optional[Dict[str, Sequence[float]]] = None,
+    chunk_size: int = CATALOG_CHUNK_ROWS,
+) -> Dict[str, Any]:
+    """
+    Median trend of one column binned in another, e.g. [alpha/Fe] vs [Fe/H].
+
+    :param catalog_path: Path to a FITS, NumPy, CSV or Parquet catalog.
+    :param x_column: Column defining the bins (e.g. "FE_H").
+    :param y_column: Column summarized in each bin (e.g. "ALPHA_M").
+    :param bins: Number of equal-width bins in x.
+    :param x_range: [min, max] of the binned range (defaults to the data range).
+    :param filters: Inclusive {column: [min, max]} ranges selecting rows.
+    :param chunk_size: Number of catalog rows processed per chunk.
+    :return: Per-bin counts, medians and 16th/84th percentiles of the y column.
+    """
+    path = resolve_data_path(catalog_path)
+    bins = _check_bins(bins)
+    ranges = _value_ranges(path, (x_column, y_column), filters, chunk_size)
+    if x_range is not None:
+        ranges[x_column] = (float(x_range[0]), float(x_range[1]))
+    (x_low, x_high), (y_low, y_high) = ranges[x_column], ranges[y_column]
+    if not (np.isfinite(x_low) and np.isfinite(y_low)):
+        return {"catalog": path.name, "num_rows": 0, "bins": []}
+
+    x_edges = np.linspace(x_low, x_high if x_high > x_low else x_low + 1.0, bins + 1)
+    y_edges = np.linspace(
+        y_low, y_high if y_high > y_low else y_low + 1.0, SURVEY_QUANTILE_RESOLUTION + 1
+    )
+    counts = np.zeros((bins, SURVEY_QUANTILE_RESOLUTION))
+    for chunk, mask in _filtered_chunks(path, (x_column, y_column), filters, chunk_size):
+        counts += np.histogram2d(
+            chunk[x_column][mask], chunk[y_column][mask], bins=(x_edges, y_edges)
+        )[0]
+
+    summary_bins = []
+    for i in range(bins):
+        p16, median, p84 = _histogram_quantiles(counts[i], y_edges, (0.16, 0.5, 0.84))
+        summary_bins.append(
+            {
+                "x_min": _sig(x_edges[i]),
+                "x_max": _sig(x_edges[i + 1]),
+                "count": int(counts[i].sum()),
+                "median": median,
+                "p16": p16,
+                "p84": p84,
+            }
+        )
+
+    return {
+        "catalog": path.name,
+        "x_column": x_column,
+        "y_column": y_column,
+        "num_rows": int(counts.sum()),
+        "bins": summary_bins,
+    }
+
+
+@tool(timeout=300.0, max_concurrency=2, cpu_bound=True, hidden=("chunk_size",))
+def column_histogram(
+    catalog_path: str,
+    column: str,
+    bins: int = 20,
+    value_range: Optional[Sequence[float]] = None,
+    filters: Optional[Dict[str, Sequence[float]]] = None,
+    chunk_size: int = CATALOG_CHUNK_ROWS,
+) -> Dict[str, Any]:
+    """
+    Histogram of one catalog column.
+
+    :param catalog_path: Path to a FITS, NumPy, CSV or Parquet catalog.
+    :param column: Column to histogram (e.g. "FE_H").
+    :param bins: Number of equal-width bins.
+    :param value_range: [min, max] of the histogram (defaults to the data range).
+    :param filters: Inclusive {column: [min, max]} ranges selecting rows.
+    :param chunk_size: Number of catalog rows processed per chunk.
+    :return: Bin edges, counts and the number of rows outside the range.
+    """
+    path = resolve_data_path(catalog_path)
+    bins = _check_bins(bins)
+    if value_range is None:
+        low, high = _value_ranges(path, (column,), filters, chunk_size)[column]
+        if not np.isfinite(low):
+            return {"catalog": path.name, "column": column, "num_rows": 0}
+    else:
+        low, high = float(value_range[0]), float(value_range[1])
+
+    edges = np.linspace(low, high if high > low else low + 1.0, bins + 1)
+    counts = np.zeros(bins, dtype=np.int64)
+    num_finite = 0
+    for chunk, mask in _filtered_chunks(path, (column,), filters, chunk_size):
+        values = chunk[column][mask]
+        values = values[np.isfinite(values)]
+        num_finite += len(values)
+        counts += np.histogram(values, bins=edges)[0]
+
+    return {
+        "catalog": path.name,
+        "column": column,
+        "num_rows": num_finite,
+        "out_of_range": int(num_finite - counts.sum()),
+        "edges": [_sig(edge) for edge in edges],
+        "counts": counts.tolist(),
+    }
+
+
+@tool(timeout=300.0, max_concurrency=2, cpu_bound=True, hidden=("chunk_size",))
+def column_percentiles(
+    catalog_path: str,
+    columns: List[str],
+    percentiles: Sequence[float] = (1, 5, 16, 50, 84, 95, 99),
+    filters: Optional[Dict[str, Sequence[float]]] = None,
+    chunk_size: int = CATALOG_CHUNK_ROWS,
+) -> Dict[str, Any]:
+    """
+    Count, missing values, mean, standard deviation and percentiles of catalog columns.
+
+    :param catalog_path: Path to a FITS, NumPy, CSV or Parquet catalog.
+    :param columns: Columns to summarize.
+    :param percentiles: Percentiles (0-100) to report.
+    :param filters: Inclusive {column: [min, max]} ranges selecting rows.
+    :param chunk_size: Number of catalog rows processed per chunk.
+    :return: Per-column summary statistics.
+    """
+    path = resolve_data_path(catalog_path)
+    ranges = _value_ranges(path, columns, filters, chunk_size)
+
+    edges = {}
+    for column, (low, high) in ranges.items():
+        if np.isfinite(low):
+            edges[column] = np.linspace(
+                low, high if high > low else low + 1.0, SURVEY_QUANTILE_RESOLUTION + 1
+            )
+    counts = {column: np.zeros(SURVEY_QUANTILE_RESOLUTION) for column in edges}
+    sums = {column: np.zeros(3) for column in columns}  # n, sum, sum of squares
+    missing = {column: 0 for column in columns}
+
+    for chunk, mask in _filtered_chunks(path, columns, filters, chunk_size):
+        for column in columns:
+            values = chunk[column][mask]
+            finite = values[np.isfinite(values)]
+            missing[column] += len(values) - len(finite)
+            sums[column] += (len(finite), finite.sum(), np.square(finite).sum())
+            if column in edges:
+                counts[column] += np.histogram(finite, bins=edges[column])[0]
+
+    summary = {}
+    for column in columns:
+        n, total, total_sq = sums[column]
+        mean = total / n if n else np.nan
+        std = np.sqrt(max(total_sq / n - mean**2, 0.0)) if n else np.nan
+        quantiles = (
+            _histogram_quantiles(counts[column], edges[column], [p / 100 for p in percentiles])
+            if column in edges
+            else [None for _ in percentiles]
+        )
+        summary[column] = {
+            "count": int(n),
+            "missing": int(missing[column]),
+            "mean": _sig(mean),
+            "std": _sig(std),
+            "min": _sig(ranges[column][0]),
+            "max": _sig(ranges[column][1]),
+            "percentiles": {f"p{p:g}": value for p, value in zip(percentiles, quantiles)},
+        }
+
+    return {"catalog": path.name, "columns": summary}
@@ -0,0 +1,435 @@
+"""
+Command-line runner for astro_virtual_lab meetings.
+
+Meetings are described in YAML specs (see `astro_virtual_lab.specs`) whose keys are
+the keyword arguments of `run_meeting`, with agents referenced by name.
+
+Subcommands:
+    astro-virtual-lab run spec.yml --cache-dir .avl_cache
+    astro-virtual-lab batch specs/ --jobs 8 --budget 5
+    astro-virtual-lab resume specs/ --cache-dir .avl_cache
+    astro-virtual-lab stats meeting_outputs
+    astro-virtual-lab render meeting_outputs
+    astro-virtual-lab tree meeting_outputs
+    astro-virtual-lab ads-quota
+    astro-virtual-lab serve --db jobs.sqlite --workers 4 --cache-dir .avl_cache
+    astro-virtual-lab enqueue specs/ --db /shared/jobs.sqlite --wait
+    astro-virtual-lab worker --db /shared/jobs.sqlite --archive-dir /shared/outputs
+
+With `--record cassette.gz`, all LLM, ADS and SIMBAD traffic is captured, and
+`--replay cassette.gz` runs the same meetings again offline against the recording
+(see `astro_virtual_lab.cassette`), e.g. to benchmark `--jobs` or caching settings.
+For overnight sweeps, `--batch-api` sends the completions as Batch API jobs, and
+`--dedup-storage` stores each distinct block of text of the transcripts once (see
+`astro_virtual_lab.store`); `render` writes their Markdown on demand.
+
+Specs with `fork_from` and `fork_turn` branch from a saved meeting, replaying its turns
+up to the fork point (see `astro_virtual_lab.fork`); `tree` shows the branches.
+
+`enqueue` and `worker` spread meetings over several nodes through a job queue on a
+shared disk (see `astro_virtual_lab.server`).
+
+All meetings of an invocation run in one process, so the scientific stack is imported
+once. With `--cache-dir`, every completed agent turn is cached; `resume` skips
+meetings that were already saved and replays the cached turns of interrupted ones.
+"""
+
+import contextlib
+import json
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from tap import Tap
+from tqdm import tqdm
+
+from astro_virtual_lab.ads import get_ads_client
+from astro_virtual_lab.batch import BatchBroker
+from astro_virtual_lab.cache import CompletionCache
+from astro_virtual_lab.cassette import Cassette
+from astro_virtual_lab.constants import (
+    BATCH_POLL_INTERVAL,
+    JOB_LEASE_SECONDS,
+    JOB_MAX_ATTEMPTS,
+    MESSAGE_STORE_FILENAME,
+)
+from astro_virtual_lab.fork import format_tree
+from astro_virtual_lab.jobs import TERMINAL_STATUSES, JobQueue
+from astro_virtual_lab.run_meeting import run_meeting
+from astro_virtual_lab.server import POLL_INTERVAL, run_worker, serve
+from astro_virtual_lab.specs import (
+    collect_specs,
+    is_saved,
+    load_meeting_specs,
+    read_meeting_specs,
+    spec_files,
+)
+from astro_virtual_lab.store import MessageStore
+from astro_virtual_lab.usage import BudgetExceededError, UsageTracker
+from astro_virtual_lab.utils import (
+    count_tokens,
+    load_meeting,
+    save_markdown,
+    saved_meetings,
+)
+
+###############################################################################
+# Execution
+###############################################################################
+
+
+def run_specs(
+    specs: List[Dict[str, Any]],
+    jobs: int = 1,
+    cache: Optional[CompletionCache] = None,
+    usage: Optional[UsageTracker] = None,
+    batch_api: bool = False,
+    batch_poll_interval: float = BATCH_POLL_INTERVAL,
+    dedup_storage: bool = False,
+) -> int:
+    """
+    Run meetings concurrently and report failures.
+
+    Meetings are independent, so they run on a thread pool of `jobs` workers (the
+    work is dominated by waiting on the LLM API). Once the budget is exhausted, the
+    meetings that have not started yet are cancelled.
+
+    In Batch API mode all meetings run at once and advance in lock-step, each step's
+    completions being sent as one batch job (see `astro_virtual_lab.batch`).
+
+    :param specs: `run_meeting` keyword arguments, one dict per meeting.
+    :param jobs: Number of meetings run at the same time (ignored in Batch API mode).
+    :param cache: Completion cache shared by all meetings.
+    :param usage: Usage tracker (and budget) shared by all meetings.
+    :param batch_api: If True, send the completions as Batch API jobs.
+    :param batch_poll_interval: Seconds between status checks of a batch job.
+    :param dedup_storage: If True, save every transcript in deduplicated form.
+    :return: Number of meetings that failed or were not run.
+    """
+    names = [f"{spec['save_dir'] / spec['save_name']}" for spec in specs]
+    failures = 0
+    broker = (
+        BatchBroker(participants=len(specs), poll_interval=batch_poll_interval)
+        if batch_api
+        else None
+    )
+
+    def run(spec: Dict[str, Any]) -> None:
+        if dedup_storage:
+            spec = {**spec, "dedup_storage": True}
+        try:
+            run_meeting(**spec, cache=cache, usage=usage, batch=broker)
+        finally:
+            if broker is not None:
+                broker.leave()
+
+    workers = len(specs) if broker is not None else jobs
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+        futures = {executor.submit(run, spec): name for spec, name in zip(specs, names)}
+        for future in tqdm(as_completed(futures), total=len(futures), desc="Meetings"):
+            name = futures[future]
+            if future.cancelled():
+                continue
+            try:
+                future.result()
+            except BudgetExceededError as e:
+                failures += 1
+                tqdm.write(f"[{name}] stopped: {e}")
+                for pending in futures:
+                    pending.cancel()
+            except Exception as e:
+                failures += 1
+                tqdm.write(f"[{name}] failed: {e!r}")
+
+    failures += sum(future.cancelled() for future in futures)
+    return failures
+
+
+def enqueue_specs(queue: JobQueue, paths: List[Path], wait: bool = False) -> int:
+    """
+    Submit the meetings of spec files to a (shared) job queue.
+
+    :param queue: Queue the workers take jobs from.
+    :param paths: YAML meeting specs, or directories of specs.
+    :param wait: If True, block until every submitted job has ended.
+    :return: Number of submitted jobs that failed or were cancelled (0 without `wait`).
+    """
+    job_ids = [
+        queue.submit(spec) for file in spec_files(paths) for spec in read_meeting_specs(file)
+    ]
+    print(f"Submitted {len(job_ids)} meeting(s) to {queue.db_path}.")
+    if not wait:
+        return 0
+
+    pending = set(job_ids)
+    failures = 0
+    with tqdm(total=len(job_ids), desc="Meetings") as progress:
+        while pending:
+            for job_id in sorted(pending):
+                job = queue.get(job_id)
+                if job["status"] not in TERMINAL_STATUSES:
+                    continue
+                pending.discard(job_id)
+                progress.update()
+                if job["status"] != "done":
+                    failures += 1
+                    tqdm.write(f"[{job_id}] {job['status']}: {job['error']}")
+            if pending:
+                time.sleep(POLL_INTERVAL)
+    return failures
+
+
+def meeting_stats(save_dir: Path) -> List[Dict[str, Any]]:
+    """
+    Summarize every meeting saved in `save_dir`.
+
+    Messages repeated across meetings (prompts, replayed summaries) are tokenized
+    once, so the scan time grows with the amount of unique text.
+
+    :param save_dir: Directory written by `save_meeting`.
+    :return: Per meeting: name, number of turns, and tokens per speaker.
+    """
+    token_counts: Dict[str, int] = {}
+    stats = []
+    for name in saved_meetings(save_dir):
+        discussion = load_meeting(save_dir, name)
+        tokens: Dict[str, int] = {}
+        for turn in discussion:
+            message = turn["message"]
+            if message not in token_counts:
+                token_counts[message] = count_tokens(message)
+            tokens[turn["agent"]] = tokens.get(turn["agent"], 0) + token_counts[message]
+        stats.append(
+            {
+                "meeting": str(save_dir / name),
+                "turns": len(discussion),
+                "tokens": sum(tokens.values()),
+                "tokens_by_speaker": tokens,
+            }
+        )
+    return stats
+
+
+###############################################################################
+# Command-line interface
+###############################################################################
+
+
+class RunnerArgs(Tap):
+    jobs: int = 1  # Number of meetings run concurrently
+    cache_dir: Optional[Path] = None  # Directory of the completion cache (enables resuming)
+    budget: Optional[float] = None  # Maximum spend in USD across all meetings
+    usage_json: bool = False  # Print the token usage as JSON instead of a table
+    record: Optional[Path] = None  # Record all provider traffic to this cassette file
+    replay: Optional[Path] = None  # Serve all provider traffic from this cassette file
+    replay_latency_scale: float = 0.0  # Multiple of the recorded latency to wait when replaying
+    batch_api: bool = False  # Run all meetings in lock-step, sending each step as a Batch API job
+    batch_poll_interval: float = BATCH_POLL_INTERVAL  # Seconds between batch job status checks
+    dedup_storage: bool = False  # Save transcripts as references into a shared message store
+
+    def process_args(self) -> None:
+        if self.record is not None and self.replay is not None:
+            raise ValueError("--record and --replay cannot be used together.")
+
+
+class RunArgs(RunnerArgs):
+    spec: Path  # YAML meeting spec
+
+    def configure(self) -> None:
+        self.add_argument("spec")
+
+
+class BatchArgs(RunnerArgs):
+    specs: List[Path]  # YAML meeting specs, or directories of specs
+
+    def configure(self) -> None:
+        self.add_argument("specs", nargs="+")
+
+
+class StatsArgs(Tap):
+    save_dirs: List[Path]  # Directories of saved meetings
+    cache_dir: Optional[Path] = None  # Also report the size of this completion cache
+
+    def configure(self) -> None:
+        self.add_argument("save_dirs", nargs="+")
+
+
+class RenderArgs(Tap):
+    save_dirs: List[Path]  # Directories of saved meetings
+    compress: bool = False  # Write gzip-compressed .md.gz files
+
+    def configure(self) -> None:
+        self.add_argument("save_dirs", nargs="+")
+
+
+class TreeArgs(Tap):
+    save_dirs: List[Path]  # Directories of saved meetings
+
+    def configure(self) -> None:
+        self.add_argument("save_dirs", nargs="+")
+
+
+class QuotaArgs(Tap):
+    pass
+
+
+class ServeArgs(Tap):
+    db: Path = Path("astro_virtual_lab_jobs.sqlite")  # SQLite file of the job queue
+    host: str = "127.0.0.1"  # Interface to listen on
+    port: int = 8765  # TCP port to listen on
+    socket: Optional[Path] = None  # Listen on this Unix socket instead of TCP
+    workers: int = 4  # Number of meetings run concurrently
+    cache_dir: Optional[Path] = None  # Directory of the completion cache
+    budget: Optional[float] = None  # Maximum spend in USD for the lifetime of the server
+    shared: bool = False  # The queue is shared with workers on other nodes
+    archive_dir: Optional[Path] = None  # Save meetings with a relative save_dir under this directory
+
+
+class EnqueueArgs(Tap):
+    specs: List[Path]  # YAML meeting specs, or directories of specs
+    db: Path  # SQLite file of the shared job queue
+    wait: bool = False  # Wait until all submitted meetings have ended
+
+    def configure(self) -> None:
+        self.add_argument("specs", nargs="+")
+
+
+class WorkerArgs(Tap):
+    db: Path  # SQLite file of the shared job queue
+    workers: int = 4  # Number of meetings run concurrently on this node
+    lease: float = JOB_LEASE_SECONDS  # Seconds a job is held without a heartbeat
+    max_attempts: int = JOB_MAX_ATTEMPTS  # Attempts after which a failed job is final
+    cache_dir: Optional[Path] = None  # Directory of the completion cache
+    budget: Optional[float] = None  # Maximum spend in USD for the lifetime of the worker
+    archive_dir: Optional[Path] = None  # Save meetings with a relative save_dir under this directory
+
+
+class Args(Tap):
+    def configure(self) -> None:
+        self.add_subparsers(dest="command", required=True, help="Command to run")
+        self.add_subparser("run", RunArgs, help="Run the meetings of one spec")
+        self.add_subparser("batch", BatchArgs, help="Run the meetings of many specs")
+        self.add_subparser(
+            "resume", BatchArgs, help="Run the meetings that are not saved yet"
+        )
+        self.add_subparser("stats", StatsArgs, help="Summarize saved meetings")
+        self.add_subparser(
+            "render", RenderArgs, help="Write the Markdown of saved meetings"
+        )
+        self.add_subparser("tree", TreeArgs, help="Show the forks of saved meetings")
+        self.add_subparser(
+            "ads-quota", QuotaArgs, help="Report the remaining quota of each ADS token"
+        )
+        self.add_subparser("serve", ServeArgs, help="Run meetings submitted over HTTP")
+        self.add_subparser(
+            "enqueue", EnqueueArgs, help="Submit meetings to a shared job queue"
+        )
+        self.add_subparser(
+            "worker", WorkerArgs, help="Run meetings from a shared job queue"
+        )
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Entry point of the `astro-virtual-lab` command."""
+    args = Args(underscores_to_dashes=True).parse_args(argv)
+
+    if args.command == "serve":
+        serve(
+            db_path=args.db,
+            host=args.host,
+            port=args.port,
+            socket_path=args.socket,
+            workers=args.workers,
+            cache_dir=args.cache_dir,
+            budget=args.budget,
+            shared=args.shared,
+            archive_dir=args.archive_dir,
+        )
+        return 0
+
+    if args.command == "enqueue":
+        failures = enqueue_specs(JobQueue(args.db, shared=True), args.specs, wait=args.wait)
+        return 1 if failures else 0
+
+    if args.command == "worker":
+        run_worker(
+            db_path=args.db,
+            workers=args.workers,
+            lease=args.lease,
+            cache_dir=args.cache_dir,
+            budget=args.budget,
+            archive_dir=args.archive_dir,
+            max_attempts=args.max_attempts,
+        )
+        return 0
+
+    if args.command == "stats":
+        for save_dir in args.save_dirs:
+            for stats in meeting_stats(save_dir):
+                print(json.dumps(stats))
+            store_path = save_dir / MESSAGE_STORE_FILENAME
+            if store_path.exists():
+                print(json.dumps({"store": MessageStore(store_path).stats()}))
+        if args.cache_dir is not None:
+            print(json.dumps({"cache": CompletionCache(args.cache_dir).stats()}))
+        return 0
+
+    if args.command == "tree":
+        for save_dir in args.save_dirs:
+            for line in format_tree(save_dir):
+                print(line)
+        return 0
+
+    if args.command == "ads-quota":
+        for quota in get_ads_client().probe():
+            print(json.dumps(quota))
+        return 0
+
+    if args.command == "render":
+        for save_dir in args.save_dirs:
+            for name in saved_meetings(save_dir):
+                discussion = load_meeting(save_dir, name)
+                print(save_markdown(save_dir, name, discussion, compress=args.compress))
+        return 0
+
+    specs = (
+        load_meeting_specs(args.spec)
+        if args.command == "run"
+        else collect_specs(args.specs)
+    )
+    if args.command == "resume":
+        if args.cache_dir is None:
+            print("resume requires --cache-dir to replay completed turns.", file=sys.stderr)
+            return 2
+        specs = [spec for spec in specs if not is_saved(spec)]
+        print(f"Resuming {len(specs)} unsaved meeting(s).")
+
+    cache = CompletionCache(args.cache_dir) if args.cache_dir is not None else None
+    usage = UsageTracker(budget=args.budget)
+    if args.record is not None:
+        cassette = Cassette(args.record, mode="record")
+    elif args.replay is not None:
+        cassette = Cassette(
+            args.replay, mode="replay", latency_scale=args.replay_latency_scale
+        )
+    else:
+        cassette = contextlib.nullcontext()
+    with cassette:
+        failures = run_specs(
+            specs,
+            jobs=args.jobs,
+            cache=cache,
+            usage=usage,
+            batch_api=args.batch_api,
+            batch_poll_interval=args.batch_poll_interval,
+            dedup_storage=args.dedup_storage,
+        )
+
+    print(json.dumps(usage.to_dict()) if args.usage_json else usage.report())
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,25 +1,77 @@
 """Client initialization for various APIs used in astro_virtual_lab."""
 
+import asyncio
+import functools
+import weakref
+
+import httpx
 from openai import OpenAI
-from astro_virtual_lab.config import load_config
+from astro_virtual_lab.providers import get_provider, get_provider_by_name
+
+# Pooled asyncio HTTP clients, one per event loop (httpx connections are loop-bound)
+_ASYNC_HTTP_CLIENTS: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, httpx.AsyncClient]" = (
+    weakref.WeakKeyDictionary()
+)
+ASYNC_HTTP_TIMEOUT = httpx.Timeout(30.0, connect=10.0)
+ASYNC_HTTP_LIMITS = httpx.Limits(max_connections=32, max_keepalive_connections=16)
+
+def model_provider(model: str) -> str:
+    """Return the name of the provider serving `model` (see `providers.get_provider`).
+
+    Args:
+        model: Model name, e.g. 'gpt-4o' or 'deepseek-chat'
 
+    Returns:
+        str: Provider name accepted by `init_openai_client`
+    """
+    return get_provider(model).name
+
+
+@functools.lru_cache(maxsize=None)
 def init_openai_client(model_type: str = "openai") -> OpenAI:
-    """Initialize OpenAI client with appropriate configuration.
+    """Initialize an OpenAI-compatible client for a provider of the registry.
+
+    Clients are created once per provider and reused, so every turn of every
+    meeting in the process shares the same connection pool. Call
+    `init_openai_client.cache_clear()` after changing API keys.
     
     Args:
-        model_type: Either 'openai' or 'deepseek' to determine which API to use
+        model_type: Name of the provider, e.g. 'openai', 'deepseek' or one
+            configured in the `providers` section of config.yml
         
     Returns:
-        OpenAI: Configured OpenAI client
+        OpenAI: Client configured with the provider's base URL and API key
+
+    Raises:
+        ValueError: If no provider has this name
     """
-    config = load_config()
-    
-    if model_type == "openai":
-        return OpenAI(api_key=config["api_keys"]["openai"])
-    elif model_type == "deepseek":
-        return OpenAI(
-            api_key=config["api_keys"]["deepseek"],
-            base_url="https://api.deepseek.com"
+    provider = get_provider_by_name(model_type)
+    return OpenAI(api_key=provider.resolve_api_key(), base_url=provider.base_url)
+
+
+def get_async_http_client() -> httpx.AsyncClient:
+    """Return the pooled asyncio HTTP client for the running event loop.
+
+    The client keeps connections alive across requests, so repeated ADS and SIMBAD
+    queries reuse TLS sessions instead of reconnecting for every call.
+
+    Returns:
+        httpx.AsyncClient: Shared client bound to the current event loop
+    """
+    loop = asyncio.get_running_loop()
+    client = _ASYNC_HTTP_CLIENTS.get(loop)
+    if client is None or client.is_closed:
+        client = httpx.AsyncClient(
+            timeout=ASYNC_HTTP_TIMEOUT,
+            limits=ASYNC_HTTP_LIMITS,
+            follow_redirects=True,
         )
-    else:
-        raise ValueError(f"Unknown model type: {model_type}")
+        _ASYNC_HTTP_CLIENTS[loop] = client
+    return client
+
+
+async def close_async_http_client() -> None:
+    """Close the pooled asyncio HTTP client of the running event loop, if any."""
+    client = _ASYNC_HTTP_CLIENTS.pop(asyncio.get_running_loop(), None)
+    if client is not None:
+        await client.aclose()
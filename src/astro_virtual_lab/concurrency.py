@@ -0,0 +1,283 @@
+"""
+Concurrency helpers shared by the asyncio-native service clients and the meetings.
+
+- SingleFlight      : Coalesces concurrent identical requests into one in-flight call
+- ServiceLimiter    : Caps the number of concurrent requests made to each external service
+- CancellationToken : Deadline and cooperative cancellation of blocking calls
+- throttle          : Waits for the process-wide rate limiter (e.g. shared across nodes)
+
+SingleFlight and ServiceLimiter keep their state per running event loop, because
+asyncio futures and semaphores are bound to the loop that created them.
+"""
+
+import asyncio
+import threading
+import time
+import weakref
+from concurrent.futures import Future
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional, Protocol, TypeVar
+
+T = TypeVar("T")
+
+
+class SingleFlight:
+    """
+    Share one in-flight call between all concurrent callers that use the same key.
+
+    The first caller for a key starts the call; callers arriving while it is still
+    running await the same task instead of issuing their own request. Once the call
+    finishes the key is forgotten, so later callers trigger a fresh request.
+    """
+
+    def __init__(self) -> None:
+        self._inflight: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[Hashable, asyncio.Task]]" = (
+            weakref.WeakKeyDictionary()
+        )
+
+    async def do(self, key: Hashable, func: Callable[[], Awaitable[T]]) -> T:
+        """
+        Run `func` for `key`, or join the call already in flight for that key.
+
+        :param key: Hashable identity of the request (e.g. service, query and options).
+        :param func: Zero-argument coroutine function that performs the request.
+        :return: The result of the (possibly shared) call.
+        """
+        loop = asyncio.get_running_loop()
+        inflight = self._inflight.setdefault(loop, {})
+
+        task = inflight.get(key)
+        if task is None:
+            task = loop.create_task(func())
+            inflight[key] = task
+            task.add_done_callback(lambda _: inflight.pop(key, None))
+
+        # Shield the shared task so one cancelled caller does not cancel the others
+        return await asyncio.shield(task)
+
+    def in_flight(self) -> int:
+        """Return the number of calls currently in flight on the running loop."""
+        loop = asyncio.get_running_loop()
+        return len(self._inflight.get(loop, {}))
+
+
+class ServiceLimiter:
+    """Per-service concurrency limits backed by one asyncio.Semaphore per event loop."""
+
+    def __init__(self, limits: Dict[str, int], default_limit: int = 4) -> None:
+        """
+        :param limits: Maximum number of concurrent requests per service name.
+        :param default_limit: Limit used for services missing from `limits`.
+        """
+        self.limits = dict(limits)
+        self.default_limit = default_limit
+        self._semaphores: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[str, asyncio.Semaphore]]" = (
+            weakref.WeakKeyDictionary()
+        )
+
+    def limit_for(self, service: str) -> int:
+        """Return the configured concurrency limit for `service`."""
+        return max(1, int(self.limits.get(service, self.default_limit)))
+
+    def semaphore(self, service: str) -> asyncio.Semaphore:
+        """
+        Return the semaphore guarding `service` on the running event loop.
+
+        Use it as `async with limiter.semaphore("ads"): ...`.
+        """
+        loop = asyncio.get_running_loop()
+        per_loop = self._semaphores.setdefault(loop, {})
+        if service not in per_loop:
+            per_loop[service] = asyncio.Semaphore(self.limit_for(service))
+        return per_loop[service]
+
+    async def run(self, service: str, func: Callable[[], Awaitable[Any]]) -> Any:
+        """Await `func()` while holding a slot of the `service` semaphore."""
+        async with self.semaphore(service):
+            return await func()
+
+
+class OperationCancelledError(RuntimeError):
+    """Raised when an operation is stopped through its `CancellationToken`."""
+
+
+class DeadlineExceededError(TimeoutError):
+    """Raised when an operation runs past the deadline of its `CancellationToken`."""
+
+    def __init__(self, message: str, token: "CancellationToken") -> None:
+        super().__init__(message)
+        self.token = token
+
+
+class CancellationToken:
+    """
+    Thread-safe cancellation signal with an optional deadline.
+
+    A child token (see `child`) is cancelled with its parent and never outlives the
+    parent's deadline, so a per-turn token derived from a per-meeting token honors
+    both. Blocking calls that cannot be interrupted (HTTP requests, tool calls) are
+    run through `run` or `wait`: the waiting thread is released as soon as the token
+    is cancelled or expires, and the abandoned call finishes in the background.
+    """
+
+    # Seconds between checks of the parent's state while waiting
+    POLL_INTERVAL = 0.1
+
+    def __init__(
+        self,
+        timeout: Optional[float] = None,
+        parent: Optional["CancellationToken"] = None,
+        name: str = "operation",
+    ) -> None:
+        """
+        :param timeout: Seconds from now after which the token expires (None never).
+        :param parent: Token whose cancellation and deadline also apply to this one.
+        :param name: Description used in error messages (e.g. "turn" or "meeting").
+        """
+        self.parent = parent
+        self.name = name
+        self.timeout = timeout
+        self.deadline = time.monotonic() + timeout if timeout is not None else None
+        self._cancelled = threading.Event()
+        self._reason = ""
+
+    def child(self, timeout: Optional[float] = None, name: str = "operation") -> "CancellationToken":
+        """Return a token cancelled with this one, with an optional shorter deadline."""
+        return CancellationToken(timeout=timeout, parent=self, name=name)
+
+    def cancel(self, reason: str = "cancelled") -> None:
+        """Cancel the token and all of its children."""
+        self._reason = reason
+        self._cancelled.set()
+
+    def _expired_token(self) -> Optional["CancellationToken"]:
+        """Return the token (this one or an ancestor) whose deadline has passed."""
+        token: Optional[CancellationToken] = self
+        now = time.monotonic()
+        while token is not None:
+            if token.deadline is not None and now >= token.deadline:
+                return token
+            token = token.parent
+        return None
+
+    def _cancelled_token(self) -> Optional["CancellationToken"]:
+        token: Optional[CancellationToken] = self
+        while token is not None:
+            if token._cancelled.is_set():
+                return token
+            token = token.parent
+        return None
+
+    @property
+    def cancelled(self) -> bool:
+        """True once the token, or an ancestor, is cancelled or past its deadline."""
+        return self._cancelled_token() is not None or self._expired_token() is not None
+
+    def remaining(self) -> Optional[float]:
+        """Seconds left before the nearest deadline (None without a deadline)."""
+        deadlines = []
+        token: Optional[CancellationToken] = self
+        while token is not None:
+            if token.deadline is not None:
+                deadlines.append(token.deadline)
+            token = token.parent
+        if not deadlines:
+            return None
+        return max(0.0, min(deadlines) - time.monotonic())
+
+    def raise_if_cancelled(self) -> None:
+        """
+        :raises OperationCancelledError: If the token or an ancestor was cancelled.
+        :raises DeadlineExceededError: If the token or an ancestor is past its deadline.
+        """
+        cancelled = self._cancelled_token()
+        if cancelled is not None:
+            raise OperationCancelledError(f"The {cancelled.name} was {cancelled._reason}.")
+        expired = self._expired_token()
+        if expired is not None:
+            raise DeadlineExceededError(
+                f"The {expired.name} exceeded its deadline of {expired.timeout:g} seconds.",
+                expired,
+            )
+
+    def wait(self, future: Future, timeout: Optional[float] = None) -> Any:
+        """
+        Wait for a future until it completes or the token is cancelled or expires.
+
+        :param future: Future of the running call.
+        :param timeout: Additional limit in seconds for this call only.
+        :return: The result of the future.
+        :raises OperationCancelledError: If the token was cancelled first.
+        :raises DeadlineExceededError: If the token's deadline passed first.
+        :raises concurrent.futures.TimeoutError: If `timeout` elapsed first.
+        """
+        end = time.monotonic() + timeout if timeout is not None else None
+        while True:
+            self.raise_if_cancelled()
+            wait = self.POLL_INTERVAL
+            remaining = self.remaining()
+            if remaining is not None:
+                wait = min(wait, remaining)
+            if end is not None:
+                left = end - time.monotonic()
+                if left <= 0:
+                    # Raise the same error as Future.result(timeout=...)
+                    return future.result(timeout=0)
+                wait = min(wait, left)
+            try:
+                return future.result(timeout=max(wait, 0.0))
+            # Before Python 3.11 this is not the builtin TimeoutError
+            except FutureTimeoutError:
+                if future.done():
+                    raise
+
+    def run(self, func: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+        """
+        Run a blocking call in a daemon thread and wait for it with `wait`.
+
+        :return: The result of `func(*args, **kwargs)`.
+        """
+        self.raise_if_cancelled()
+        future: Future = Future()
+
+        def target() -> None:
+            if not future.set_running_or_notify_cancel():
+                return
+            try:
+                future.set_result(func(*args, **kwargs))
+            except BaseException as e:
+                future.set_exception(e)
+
+        threading.Thread(target=target, name=f"{self.name}-call", daemon=True).start()
+        return self.wait(future)
+
+
+class RateLimiter(Protocol):
+    """Anything that blocks until one more request to a service is allowed."""
+
+    def acquire(self, service: str) -> None: ...
+
+
+_RATE_LIMITER: Optional[RateLimiter] = None
+
+
+def set_rate_limiter(limiter: Optional[RateLimiter]) -> None:
+    """
+    Install the rate limiter applied to every request to the LLM providers, ADS and
+    SIMBAD (e.g. a `jobs.SharedRateLimiter` coordinating several nodes), or None.
+    """
+    global _RATE_LIMITER
+    _RATE_LIMITER = limiter
+
+
+def throttle(service: str) -> None:
+    """Block until the installed rate limiter allows one more request to `service`."""
+    limiter = _RATE_LIMITER
+    if limiter is not None:
+        limiter.acquire(service)
+
+
+async def throttle_async(service: str) -> None:
+    """Asyncio-native version of `throttle`, which waits without blocking the loop."""
+    if _RATE_LIMITER is not None:
+        await asyncio.to_thread(throttle, service)
@@ -2,6 +2,8 @@
 
 import os
 from pathlib import Path
+from typing import Any
+
 import yaml
 
 def load_config() -> dict:
@@ -35,3 +37,28 @@ def load_config() -> dict:
             config[section][key] = env_value
     
     return config
+
+
+def get_setting(*keys: str, default: Any = None) -> Any:
+    """Look up an optional nested value in the configuration.
+
+    Missing keys, or a missing config.yml, fall back to `default` so that optional
+    tuning knobs never make the configuration file mandatory.
+
+    Args:
+        *keys: Path of nested keys, e.g. ("settings", "concurrency", "ads").
+        default: Value returned when the setting is not configured.
+
+    Returns:
+        The configured value, or `default`.
+    """
+    try:
+        node = load_config()
+    except FileNotFoundError:
+        return default
+
+    for key in keys:
+        if not isinstance(node, dict) or key not in node:
+            return default
+        node = node[key]
+    return node
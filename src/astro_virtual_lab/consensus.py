@@ -0,0 +1,138 @@
+"""
+Early-exit consensus detection for team meetings.
+
+With `run_meeting(..., early_exit=True)` the team lead is asked to close every
+intermediate synthesis with a one-line verdict ("Consensus: yes" or "Consensus: no").
+After each round the meeting skips straight to the final summary when any of the
+following holds, so that easy agendas do not pay for rounds that change nothing:
+
+- the lead's verdict is "yes";
+- every team member passed in the round;
+- the lead's synthesis is nearly the same as in the previous round (word-overlap
+  cosine similarity above a threshold) and the round's discussion covers the key
+  terms of the agenda questions.
+
+None of these checks needs an extra LLM call.
+"""
+
+import math
+import re
+from collections import Counter
+from dataclasses import dataclass
+from typing import Iterable, Optional
+
+from astro_virtual_lab.constants import (
+    CONSENSUS_MIN_QUESTION_COVERAGE,
+    CONSENSUS_SIMILARITY_THRESHOLD,
+    STOPWORDS,
+)
+
+_VERDICT_PATTERN = re.compile(r"^\W*consensus\W*:\W*(yes|no)\b", re.IGNORECASE | re.MULTILINE)
+_WORD_PATTERN = re.compile(r"[a-z][a-z0-9/\-\[\]]+")
+
+
+@dataclass(frozen=True)
+class ConsensusCheck:
+    """Outcome of the consensus test for one round."""
+
+    converged: bool
+    reason: str
+    similarity: float
+    question_coverage: float
+
+
+def _content_words(text: str) -> Counter:
+    """Count the lower-cased words of `text` that are not stopwords."""
+    return Counter(
+        word for word in _WORD_PATTERN.findall(text.lower()) if word not in STOPWORDS
+    )
+
+
+def parse_consensus_verdict(text: str) -> Optional[bool]:
+    """
+    Read the lead's closing "Consensus: yes/no" line.
+
+    :param text: The lead's synthesis.
+    :return: True or False, or None if the synthesis has no verdict line.
+    """
+    matches = _VERDICT_PATTERN.findall(text)
+    if not matches:
+        return None
+    # The instruction asks for the verdict on the last line, so the last one wins
+    return matches[-1].lower() == "yes"
+
+
+def text_similarity(previous: str, current: str) -> float:
+    """
+    Cosine similarity of the content-word counts of two texts.
+
+    :return: Similarity between 0 (no shared words) and 1 (same word distribution).
+    """
+    a, b = _content_words(previous), _content_words(current)
+    dot = sum(count * b[word] for word, count in a.items())
+    norm = math.sqrt(sum(v * v for v in a.values())) * math.sqrt(sum(v * v for v in b.values()))
+    return dot / norm if norm else 0.0
+
+
+def question_coverage(agenda_questions: Iterable[str], text: str) -> float:
+    """
+    Fraction of the agenda questions whose key terms mostly appear in `text`.
+
+    A question counts as covered when at least half of its content words occur in
+    the text. Without agenda questions the coverage is 1.
+
+    :param agenda_questions: Questions that must be answered in the meeting.
+    :param text: Discussion to check (e.g. the round's replies and synthesis).
+    :return: Coverage between 0 and 1.
+    """
+    questions = list(agenda_questions)
+    if not questions:
+        return 1.0
+
+    words = _content_words(text)
+    covered = 0
+    for question in questions:
+        terms = set(_content_words(question))
+        if not terms or sum(term in words for term in terms) >= len(terms) / 2:
+            covered += 1
+    return covered / len(questions)
+
+
+def is_pass(reply: str) -> bool:
+    """Return True if a team member's reply is just a "pass"."""
+    return re.sub(r"[\W_]+", " ", reply).strip().lower() in ("pass", "i pass")
+
+
+def check_consensus(
+    previous_synthesis: str,
+    synthesis: str,
+    member_replies: Iterable[str],
+    agenda_questions: Iterable[str] = (),
+    similarity_threshold: float = CONSENSUS_SIMILARITY_THRESHOLD,
+    min_question_coverage: float = CONSENSUS_MIN_QUESTION_COVERAGE,
+) -> ConsensusCheck:
+    """
+    Decide whether a team meeting can skip its remaining rounds.
+
+    :param previous_synthesis: The lead's previous reply (initial thoughts or synthesis).
+    :param synthesis: The lead's synthesis of the round that just ended.
+    :param member_replies: The team members' replies in that round.
+    :param agenda_questions: Questions that must be answered in the meeting.
+    :param similarity_threshold: Minimum similarity between the two syntheses.
+    :param min_question_coverage: Minimum agenda question coverage for the similarity test.
+    :return: Whether the discussion converged, and why.
+    """
+    replies = list(member_replies)
+    similarity = text_similarity(previous_synthesis, synthesis)
+    coverage = question_coverage(agenda_questions, "\n".join([*replies, synthesis]))
+
+    if parse_consensus_verdict(synthesis):
+        reason = "the team lead reported consensus"
+    elif replies and all(is_pass(reply) for reply in replies):
+        reason = "every team member passed"
+    elif similarity >= similarity_threshold and coverage >= min_question_coverage:
+        reason = f"the synthesis repeated the previous round (similarity {similarity:.2f})"
+    else:
+        return ConsensusCheck(False, "", similarity, coverage)
+
+    return ConsensusCheck(True, reason, similarity, coverage)
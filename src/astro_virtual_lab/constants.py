@@ -1,6 +1,6 @@
 """
 Holds constants used throughout the astro_virtual_lab package, such as token pricing
-details, default temperatures, and tool function descriptions for ADS/SIMBAD searches.
+details, default temperatures, service endpoints, and tool execution limits.
 """
 
 ###############################################################################
@@ -12,13 +12,60 @@ MODEL_TO_INPUT_PRICE_PER_TOKEN = {
     # example cost in USD per 1M tokens
     "gpt-3.5-turbo": 0.5 / 1_000_000,
     "gpt-4o": 5.0 / 1_000_000,
+    "deepseek-chat": 0.27 / 1_000_000,
+    "deepseek-reasoner": 0.55 / 1_000_000,
 }
 
 MODEL_TO_OUTPUT_PRICE_PER_TOKEN = {
     "gpt-3.5-turbo": 1.5 / 1_000_000,
     "gpt-4o": 15.0 / 1_000_000,
+    "deepseek-chat": 1.10 / 1_000_000,
+    "deepseek-reasoner": 2.19 / 1_000_000,
 }
 
+###############################################################################
+# LLM Providers (extended or overridden by the `providers` section of config.yml)
+###############################################################################
+# Provider serving models that no provider lists
+DEFAULT_PROVIDER = "openai"
+
+BUILTIN_PROVIDERS = {
+    "openai": {
+        "batch_api": True,
+    },
+    "deepseek": {
+        "base_url": "https://api.deepseek.com",
+        "model_prefixes": ["deepseek-"],
+        # The reasoner has no function calling, needs alternating user/assistant turns
+        # and counts its chain of thought in max_tokens
+        "models": [
+            "deepseek-chat",
+            {
+                "deepseek-reasoner": {
+                    "tools": False,
+                    "alternate_roles": True,
+                    "max_tokens": False,
+                }
+            },
+        ],
+    },
+}
+
+###############################################################################
+# Output Length Budgets (opt-in, see the `output_budget` section of config.yml)
+###############################################################################
+# Recommended maximum completion tokens per agent turn, by meeting phase (see
+# `routing`), applied with `recommended: true`; the final summary stays uncapped
+OUTPUT_TOKEN_BUDGETS = {
+    "opening": 800,
+    "member": 600,
+    "synthesis": 1000,
+}
+
+# Words per token used to turn a token budget into the length asked for in the
+# prompt; below the ~0.75 of English text so that replies end before the hard cap
+OUTPUT_WORDS_PER_TOKEN = 0.6
+
 ###############################################################################
 # Temperature Presets
 ###############################################################################
@@ -26,61 +73,161 @@ CONSISTENT_TEMPERATURE = 0.2
 CREATIVE_TEMPERATURE = 0.8
 
 ###############################################################################
-# Tool Descriptions (ADS & SIMBAD)
-###############################################################################
-ADS_TOOL_NAME = "ads_search"
-ADS_TOOL_DESCRIPTION = {
-    "type": "function",
-    "function": {
-        "name": ADS_TOOL_NAME,
-        "description": (
-            "Search NASA's Astrophysics Data System (ADS) for astronomy research papers. "
-            "Returns abstracts and bibliographic information for the most relevant papers. "
-            "Use this when you need references or background from peer-reviewed literature."
-        ),
-        "parameters": {
-            "type": "object",
-            "properties": {
-                "query": {
-                    "type": "string",
-                    "description": (
-                        "The search query to use to search NASA ADS for astronomy papers. "
-                        "More specific queries are more likely to return relevant papers."
-                    ),
-                },
-                "num_articles": {
-                    "type": "integer",
-                    "enum": [1, 2, 3],
-                    "description": "The number of papers to return from the search query.",
-                },
-            },
-            "required": ["query", "num_articles"],
-        },
-    },
-}
+# Service Endpoints (used by the asyncio clients)
+###############################################################################
+ADS_API_URL = "https://api.adsabs.harvard.edu/v1/search/query"
+SIMBAD_TAP_URL = "https://simbad.cds.unistra.fr/simbad/sim-tap/sync"
 
-SIMBAD_TOOL_NAME = "simbad_search"
-SIMBAD_TOOL_DESCRIPTION = {
-    "type": "function",
-    "function": {
-        "name": SIMBAD_TOOL_NAME,
-        "description": (
-            "Query the SIMBAD astronomical database for information about celestial objects. "
-            "Returns detailed information including coordinates, magnitudes, spectral type, and more. "
-            "Use this to retrieve details for a known star, galaxy, or object by name."
-        ),
-        "parameters": {
-            "type": "object",
-            "properties": {
-                "object_name": {
-                    "type": "string",
-                    "description": (
-                        "The name of the astronomical object to search for. "
-                        "Can be a common name (e.g., 'M31'), catalog identifier, or coordinates."
-                    ),
-                },
-            },
-            "required": ["object_name"],
-        },
-    },
+# Daily number of ADS API queries allowed per token, assumed until ADS reports it
+ADS_DAILY_QUERY_LIMIT = 5000
+
+# Seconds after which a blocking ADS request is abandoned
+ADS_REQUEST_TIMEOUT = 30.0
+
+# Default number of concurrent in-flight requests per external service
+DEFAULT_SERVICE_CONCURRENCY = {
+    "ads": 4,
+    "simbad": 4,
 }
+
+###############################################################################
+# ADS Result Formatting
+###############################################################################
+# Fields fetched from ADS and shown to the agents, in display order
+ADS_RESULT_FIELDS = ("title", "authors", "year", "bibcode", "abstract")
+
+# Author lists longer than this are collapsed to "First, Second, ..., et al. (N authors)"
+ADS_MAX_AUTHORS = 5
+
+# Abstracts are cut at a word boundary after this many characters
+ADS_MAX_ABSTRACT_CHARS = 1200
+
+# Maximum number of tokens returned to the LLM by a single ADS tool call
+ADS_TOOL_TOKEN_BUDGET = 1500
+
+# Number of ADS queries whose results are kept in memory (least recently used evicted)
+ADS_RESULT_CACHE_SIZE = 2048
+
+# Maximum number of tool calls an agent may make while composing one reply
+MAX_TOOL_CALLS_PER_TURN = 4
+
+###############################################################################
+# Literature Prefetch
+###############################################################################
+# Maximum number of ADS queries derived from the agenda before a meeting
+PREFETCH_MAX_QUERIES = 8
+
+# Maximum number of tokens of prefetched abstracts injected into the contexts
+PREFETCH_TOKEN_BUDGET = 4000
+
+# Maximum number of ADS queries searched for the next speaker in a pipelined meeting
+PIPELINE_PREFETCH_QUERIES = 3
+
+# Maximum number of tokens of abstracts added to the next speaker's prompt
+PIPELINE_PREFETCH_TOKEN_BUDGET = 1500
+
+# Words that carry no signal in agenda sentences, questions and replies
+# (ignored when building search queries and when comparing meeting rounds)
+STOPWORDS = frozenset(
+    """
+    a about all also an analyze and any are as at be based between both by can
+    compare could did do does for from has have how identify in into investigate is
+    it its may might must of on or our over should specifically study such tell than
+    that the their them these they this those through to understand use using via
+    want was we were what when where which while who why will with within would you
+    your aim focus develop apply data
+    """.split()
+)
+
+###############################################################################
+# Local Catalog Tools
+###############################################################################
+# Directory the catalog tools read from when `data_dir` is not set in config.yml
+# (relative to the working directory)
+DEFAULT_DATA_DIR = "data"
+
+# Number of catalog rows read and processed per chunk
+CATALOG_CHUNK_ROWS = 100_000
+
+# Maximum number of SIMBAD objects cross-matched in one tool call
+CROSSMATCH_MAX_TARGETS = 50
+
+# Maximum number of bins an agent may request from the survey statistics tools
+SURVEY_MAX_BINS = 50
+
+# Number of fine histogram bins used to estimate streamed medians and percentiles
+SURVEY_QUANTILE_RESOLUTION = 2048
+
+###############################################################################
+# Tool Execution Limits
+###############################################################################
+# Default seconds after which a tool call is abandoned
+TOOL_DEFAULT_TIMEOUT = 60.0
+
+# Default maximum number of characters of a tool result sent back to the model
+TOOL_MAX_RESULT_CHARS = 8000
+
+# Number of worker threads shared by all tool calls
+TOOL_MAX_WORKERS = 16
+
+# Number of worker processes running CPU-bound tools
+TOOL_PROCESS_WORKERS = 4
+
+###############################################################################
+# Prompt Caching
+###############################################################################
+# Number of rendered prompt fragments kept by each memoized prompt builder
+PROMPT_CACHE_SIZE = 256
+
+###############################################################################
+# Deduplicated Meeting Storage
+###############################################################################
+# File of the message store shared by the deduplicated meetings of a save directory
+MESSAGE_STORE_FILENAME = "messages.sqlite"
+
+# Paragraphs are merged into chunks of at least this many characters before hashing
+MESSAGE_CHUNK_MIN_CHARS = 512
+
+###############################################################################
+# Meeting Event Streams
+###############################################################################
+# Number of events `iter_meeting` buffers before the meeting waits for its consumer
+MEETING_EVENT_BUFFER = 64
+
+# Seconds between checks for cancellation while the meeting waits for its consumer
+MEETING_EVENT_POLL_INTERVAL = 0.1
+
+###############################################################################
+# Early Exit
+###############################################################################
+# Word-overlap similarity between consecutive lead syntheses above which the
+# discussion is considered to have converged
+CONSENSUS_SIMILARITY_THRESHOLD = 0.8
+
+# Fraction of the agenda questions whose key terms must appear in the round's
+# discussion before the similarity test may end the meeting early
+CONSENSUS_MIN_QUESTION_COVERAGE = 0.75
+
+###############################################################################
+# Distributed Workers
+###############################################################################
+# Seconds a distributed worker holds a job without renewing its lease
+JOB_LEASE_SECONDS = 120.0
+
+# Number of times a job is run before a failure or an expired lease is final
+JOB_MAX_ATTEMPTS = 3
+
+# Length in seconds of the windows in which shared rate limits count requests
+RATE_LIMIT_WINDOW = 60.0
+
+###############################################################################
+# Batch API
+###############################################################################
+# Seconds between status checks of a submitted batch job
+BATCH_POLL_INTERVAL = 30.0
+
+# Completion window requested for batch jobs
+BATCH_COMPLETION_WINDOW = "24h"
+
+# Number of requests the local stand-in batch endpoint runs at the same time
+LOCAL_BATCH_WORKERS = 8
@@ -0,0 +1,103 @@
+"""
+Typed events emitted while a meeting runs, in the order they happen:
+
+- MeetingStarted : The meeting and its participants
+- TokenDelta     : A fragment of the reply an agent is generating (streaming models)
+- ToolCalled     : A tool call made by an agent and its result
+- TurnCompleted  : A prompt or reply added to the discussion
+- RoundCompleted : The end of a discussion round (team meetings)
+- MeetingSummary : The final summary, once the meeting is saved
+
+Token deltas are provisional: if a model fails mid-reply and a fallback model takes
+over, the fallback's reply is streamed again from the start. `TurnCompleted` always
+carries the final text of a turn.
+
+Events are received with `run_meeting(..., on_event=...)` or by iterating over
+`iter_meeting` / `aiter_meeting` (see `astro_virtual_lab.streaming`).
+"""
+
+from dataclasses import asdict, dataclass
+from typing import Any, ClassVar, Dict, Optional
+
+from astro_virtual_lab.routing import MeetingPhase
+
+
+@dataclass(frozen=True)
+class MeetingEvent:
+    """Base class of meeting events."""
+
+    type: ClassVar[str] = "event"
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Return the event as a JSON-serializable dict with its `type`."""
+        return {"type": self.type, **asdict(self)}
+
+
+@dataclass(frozen=True)
+class MeetingStarted(MeetingEvent):
+    """The meeting is about to start."""
+
+    type: ClassVar[str] = "start"
+
+    meeting_type: str
+    save_name: str
+    participants: tuple[str, ...]
+    num_rounds: int
+
+
+@dataclass(frozen=True)
+class TokenDelta(MeetingEvent):
+    """A fragment of the reply an agent is generating."""
+
+    type: ClassVar[str] = "delta"
+
+    agent: str
+    text: str
+
+
+@dataclass(frozen=True)
+class ToolCalled(MeetingEvent):
+    """An agent called a tool while composing its reply."""
+
+    type: ClassVar[str] = "tool_call"
+
+    agent: str
+    name: str
+    arguments: str
+    result: str
+
+
+@dataclass(frozen=True)
+class TurnCompleted(MeetingEvent):
+    """
+    A turn was added to the discussion.
+
+    "User" turns are the meeting's prompts and have no `phase`; `index` is the position
+    of the turn in the saved transcript.
+    """
+
+    type: ClassVar[str] = "turn"
+
+    index: int
+    agent: str
+    message: str
+    phase: Optional[MeetingPhase] = None
+
+
+@dataclass(frozen=True)
+class RoundCompleted(MeetingEvent):
+    """A discussion round ended (with the lead's synthesis, except in the last round)."""
+
+    type: ClassVar[str] = "round"
+
+    round_num: int
+    num_rounds: int
+
+
+@dataclass(frozen=True)
+class MeetingSummary(MeetingEvent):
+    """The meeting ended and was saved; `summary` is its last message."""
+
+    type: ClassVar[str] = "summary"
+
+    summary: str
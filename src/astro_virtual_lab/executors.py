@@ -0,0 +1,94 @@
+"""
+Process-pool execution of CPU-bound work for astro_virtual_lab.
+
+Heavy tool work (vectorized SkyCoord matching, catalog statistics, tokenizing large
+texts) holds the GIL, so running it on the orchestration threads stalls every other
+concurrent meeting. Tools registered with `cpu_bound=True` are instead executed on a
+persistent pool of worker processes. The workers are warm: astropy, numpy and
+tiktoken are imported once, when each worker starts, rather than on every call.
+
+Only the call's arguments and result cross the process boundary. The catalog tools
+pass a path and read the catalog in the worker, so keep large data out of the
+arguments in the same way.
+
+Example:
+    from astro_virtual_lab.executors import submit_cpu_bound
+
+    future = submit_cpu_bound(my_module.summarize_catalog, "apogee_dr17_subset.fits")
+    summary = future.result()
+"""
+
+import atexit
+import multiprocessing
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import Any, Callable, Optional
+
+from astro_virtual_lab.config import get_setting
+from astro_virtual_lab.constants import TOOL_PROCESS_WORKERS
+
+_PROCESS_POOL: Optional[ProcessPoolExecutor] = None
+_PROCESS_POOL_LOCK = threading.Lock()
+
+
+###############################################################################
+# Worker pool
+###############################################################################
+
+
+def _warm_worker() -> None:
+    """Import the heavy scientific stack once when a worker process starts."""
+    import astropy.coordinates  # noqa: F401
+    import astropy.units  # noqa: F401
+    import tiktoken
+
+    import astro_virtual_lab.catalogs  # noqa: F401  (registers the catalog tools)
+
+    try:
+        tiktoken.get_encoding("cl100k_base")
+    except Exception:
+        # The encoding is downloaded lazily; offline workers load it on first use
+        pass
+
+
+def get_process_pool() -> ProcessPoolExecutor:
+    """
+    Return the persistent process pool for CPU-bound work, starting it on first use.
+
+    Workers are spawned (not forked) so they never inherit locks held by the
+    orchestration threads. The pool size comes from `process_workers` in config.yml.
+    """
+    global _PROCESS_POOL
+    with _PROCESS_POOL_LOCK:
+        if _PROCESS_POOL is None:
+            max_workers = get_setting("process_workers", default=TOOL_PROCESS_WORKERS)
+            _PROCESS_POOL = ProcessPoolExecutor(
+                max_workers=max(1, int(max_workers)),
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_warm_worker,
+            )
+    return _PROCESS_POOL
+
+
+def shutdown_process_pool(wait: bool = True) -> None:
+    """Stop the worker processes (a new pool is started on the next submission)."""
+    global _PROCESS_POOL
+    with _PROCESS_POOL_LOCK:
+        pool, _PROCESS_POOL = _PROCESS_POOL, None
+    if pool is not None:
+        pool.shutdown(wait=wait, cancel_futures=True)
+
+
+atexit.register(shutdown_process_pool, wait=False)
+
+
+def submit_cpu_bound(func: Callable[..., Any], *args: Any, **kwargs: Any) -> Future:
+    """
+    Run `func(*args, **kwargs)` on the process pool.
+
+    `func` must be importable by module path (a module-level function), and its
+    arguments and result must be picklable (pass file paths rather than large arrays).
+
+    :return: Future resolving to the function's result.
+    """
+    return get_process_pool().submit(func, *args, **kwargs)
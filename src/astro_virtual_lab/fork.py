@@ -0,0 +1,130 @@
+"""
+Forking a saved meeting into variant branches.
+
+A fork continues a saved meeting from one of its turns with different arguments, e.g.
+other agenda rules, an added expert or a higher temperature. The turns before the fork
+point are replayed from the saved transcript without any API call, and the variant
+only pays for the turns after it:
+
+    from astro_virtual_lab.fork import fork_meeting
+
+    summaries = fork_meeting(
+        save_dir=Path("meeting_outputs"),
+        fork_from="thick_disk",
+        fork_turn=9,
+        variants={
+            "thick_disk_creative": {"temperature": 0.8},
+            "thick_disk_with_theorist": {
+                "team_members": (
+                    GALACTIC_EVOLUTION_EXPERT,
+                    STELLAR_EVOLUTION_EXPERT,
+                    THEORIST,
+                ),
+            },
+        },
+        meeting_type="team",
+        agenda="Study the chemical evolution of the Galactic thick disk.",
+        team_lead=PRINCIPAL_INVESTIGATOR,
+        team_members=(GALACTIC_EVOLUTION_EXPERT, STELLAR_EVOLUTION_EXPERT),
+        model="gpt-4o",
+    )
+
+The variants run concurrently. Each is saved as a manifest holding a reference to the
+meeting it was forked from, the fork point and its own turns, so the shared prefix is
+stored once however many variants branch from it, and variants can be forked again.
+`load_meeting` reassembles a variant's full transcript transparently, and
+`meeting_tree` lists the branches of a save directory. A forked meeting cannot be
+loaded once the meeting it was forked from is deleted, or re-run with a different
+history up to the fork point (the manifest holds a digest of the shared turns).
+
+The same is available in meeting specs through the `fork_from` and `fork_turn` keys,
+as long as the meeting forked from is saved before the variants start.
+
+Experts added in a variant join the discussion after the fork point. The speakers up to
+the fork point must otherwise be those of the saved meeting.
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, List, Mapping, Optional, Tuple
+
+from astro_virtual_lab.run_meeting import run_meeting
+from astro_virtual_lab.utils import meeting_parent, saved_meetings
+
+
+def fork_meeting(
+    save_dir: Path,
+    fork_from: str,
+    fork_turn: int,
+    variants: Mapping[str, Mapping[str, Any]],
+    max_workers: Optional[int] = None,
+    **kwargs: Any,
+) -> Dict[str, Optional[str]]:
+    """
+    Run variants of a saved meeting concurrently, each branching from the same turn.
+
+    :param save_dir: Directory holding the saved meeting, where the variants are saved.
+    :param fork_from: Name of the saved meeting.
+    :param fork_turn: Number of leading turns of `fork_from` shared by the variants.
+    :param variants: `run_meeting` arguments overriding `kwargs`, by variant save_name.
+    :param max_workers: Number of variants run at the same time (default: all of them).
+    :param kwargs: `run_meeting` arguments shared by the variants, describing the meeting.
+    :return: The summary of each variant, by save_name (None unless `return_summary`).
+    :raises Exception: The first error of a failed variant, once all of them have ended.
+    """
+    specs = {
+        name: {
+            **kwargs,
+            **overrides,
+            "save_dir": save_dir,
+            "save_name": name,
+            "fork_from": fork_from,
+            "fork_turn": fork_turn,
+        }
+        for name, overrides in variants.items()
+    }
+    with ThreadPoolExecutor(max_workers=max_workers or max(1, len(specs))) as executor:
+        futures = {
+            name: executor.submit(run_meeting, **spec) for name, spec in specs.items()
+        }
+    return {name: future.result() for name, future in futures.items()}
+
+
+def meeting_tree(save_dir: Path) -> Dict[str, List[Tuple[str, int]]]:
+    """
+    Return the fork branches of the meetings saved in `save_dir`.
+
+    :param save_dir: Directory written by `save_meeting`.
+    :return: For each meeting that was forked, its forks and the number of turns each
+        shares with it, ordered by fork point.
+    """
+    children: Dict[str, List[Tuple[str, int]]] = {}
+    for name in saved_meetings(save_dir):
+        parent = meeting_parent(save_dir, name)
+        if parent is not None:
+            children.setdefault(parent[0], []).append((name, parent[1]))
+    for forks in children.values():
+        forks.sort(key=lambda fork: (fork[1], fork[0]))
+    return children
+
+
+def format_tree(save_dir: Path) -> List[str]:
+    """
+    Render the fork branches of the meetings saved in `save_dir`, one line per meeting.
+
+    :param save_dir: Directory written by `save_meeting`.
+    :return: The meetings that were forked, each followed by its indented forks.
+    """
+    children = meeting_tree(save_dir)
+    forked = {name for forks in children.values() for name, _ in forks}
+    lines: List[str] = []
+
+    def add(name: str, depth: int, fork_turn: Optional[int]) -> None:
+        branch = f" (from turn {fork_turn})" if fork_turn is not None else ""
+        lines.append(f"{'    ' * depth}{name}{branch}")
+        for child, turn in children.get(name, []):
+            add(child, depth + 1, turn)
+
+    for root in sorted(set(children) - forked):
+        add(root, 0, None)
+    return lines
@@ -0,0 +1,535 @@
+"""
+Persistent SQLite-backed queue of meeting jobs for astro_virtual_lab.
+
+A job is a meeting spec (the JSON form of the CLI's YAML specs) plus its state:
+
+    queued -> running -> done | failed | cancelled
+
+Turns are stored as they complete, so clients can follow a meeting while it runs.
+The queue lives in a single SQLite file in WAL mode; every operation opens its own
+short-lived connection, which makes a `JobQueue` safe to share between threads and
+between processes. Jobs that were running when the server stopped are put back in
+the queue on restart (`requeue_interrupted`) and, with a completion cache, replay
+their finished turns for free.
+
+Several nodes can also share one queue file on a shared disk (`shared=True`), each
+running workers (`astro-virtual-lab worker`). A distributed worker claims a job
+with a lease that it renews by heartbeat while the meeting runs; a job whose lease
+expires (crashed or partitioned node) or whose meeting fails is put back in the
+queue, up to `JOB_MAX_ATTEMPTS` attempts, and a worker that lost its lease can no
+longer write to the job. A `SharedRateLimiter` on the same file caps the request
+rate of every service across all nodes.
+
+Example:
+    from astro_virtual_lab.jobs import JobQueue
+
+    queue = JobQueue(Path("jobs.sqlite"))
+    job_id = queue.submit({"meeting_type": "individual", ...})
+    print(queue.get(job_id)["status"])
+"""
+
+import contextlib
+import json
+import random
+import sqlite3
+import threading
+import time
+import uuid
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Mapping, Optional, Tuple
+
+from astro_virtual_lab.constants import JOB_MAX_ATTEMPTS, RATE_LIMIT_WINDOW
+
+JOB_STATUSES = ("queued", "running", "done", "failed", "cancelled")
+TERMINAL_STATUSES = frozenset({"done", "failed", "cancelled"})
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    spec TEXT NOT NULL,
+    status TEXT NOT NULL DEFAULT 'queued',
+    cancel_requested INTEGER NOT NULL DEFAULT 0,
+    created REAL NOT NULL,
+    started REAL,
+    finished REAL,
+    error TEXT,
+    summary TEXT,
+    worker TEXT,
+    lease_expires REAL,
+    attempts INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS jobs_status_created ON jobs (status, created);
+CREATE TABLE IF NOT EXISTS turns (
+    job_id TEXT NOT NULL,
+    idx INTEGER NOT NULL,
+    agent TEXT NOT NULL,
+    message TEXT NOT NULL,
+    PRIMARY KEY (job_id, idx)
+);
+CREATE TABLE IF NOT EXISTS rate_windows (
+    service TEXT NOT NULL,
+    window INTEGER NOT NULL,
+    count INTEGER NOT NULL,
+    PRIMARY KEY (service, window)
+);
+"""
+
+# Columns added after the first release, created on queues made by older versions
+_ADDED_JOB_COLUMNS = {
+    "worker": "TEXT",
+    "lease_expires": "REAL",
+    "attempts": "INTEGER NOT NULL DEFAULT 0",
+}
+
+_JOB_COLUMNS = (
+    "id",
+    "status",
+    "cancel_requested",
+    "created",
+    "started",
+    "finished",
+    "error",
+    "summary",
+    "worker",
+    "attempts",
+)
+
+
+class JobCancelledError(RuntimeError):
+    """Raised inside a running meeting when its job has been cancelled."""
+
+
+class LeaseLostError(JobCancelledError):
+    """Raised inside a running meeting when its worker no longer holds the job's lease."""
+
+
+@contextlib.contextmanager
+def _transaction(db_path: Path) -> Iterator[sqlite3.Connection]:
+    """Open a connection in a write transaction, commit on success and close it."""
+    conn = sqlite3.connect(db_path, timeout=30.0, isolation_level=None)
+    try:
+        conn.execute("BEGIN IMMEDIATE")
+        yield conn
+        conn.execute("COMMIT")
+    except BaseException:
+        if conn.in_transaction:
+            conn.execute("ROLLBACK")
+        raise
+    finally:
+        conn.close()
+
+
+class JobQueue:
+    """Durable FIFO queue of meeting jobs and their turns."""
+
+    def __init__(self, db_path: Path, shared: bool = False) -> None:
+        """
+        :param db_path: SQLite file holding the queue (created if missing).
+        :param shared: If True, the file is used by several nodes over a shared disk.
+            WAL mode needs shared memory between the processes, so the rollback
+            journal is used instead (the file system must support POSIX locks).
+        """
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        # Wakes up threads of this process that wait for new jobs or turns
+        self._changed = threading.Condition()
+        with contextlib.closing(sqlite3.connect(self.db_path, timeout=30.0)) as conn:
+            conn.execute(f"PRAGMA journal_mode={'DELETE' if shared else 'WAL'}")
+            conn.executescript(_SCHEMA)
+            columns = {row[1] for row in conn.execute("PRAGMA table_info(jobs)")}
+            for column, definition in _ADDED_JOB_COLUMNS.items():
+                if column not in columns:
+                    conn.execute(f"ALTER TABLE jobs ADD COLUMN {column} {definition}")
+
+    def _connect(self) -> "contextlib.AbstractContextManager[sqlite3.Connection]":
+        """Open a connection in a write transaction, commit on success and close it."""
+        return _transaction(self.db_path)
+
+    def _notify(self) -> None:
+        with self._changed:
+            self._changed.notify_all()
+
+    def wait(self, timeout: float) -> None:
+        """Block until the queue changes in this process, or `timeout` seconds pass."""
+        with self._changed:
+            self._changed.wait(timeout)
+
+    ###########################################################################
+    # Producers
+    ###########################################################################
+
+    def submit(self, spec: Dict[str, Any]) -> str:
+        """
+        Add a meeting to the queue.
+
+        :param spec: JSON-serializable meeting spec.
+        :return: The new job's id.
+        """
+        job_id = uuid.uuid4().hex
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT INTO jobs (id, spec, created) VALUES (?, ?, ?)",
+                (job_id, json.dumps(spec), time.time()),
+            )
+        self._notify()
+        return job_id
+
+    def cancel(self, job_id: str) -> Optional[str]:
+        """
+        Cancel a job. Queued jobs are cancelled at once; running jobs stop after
+        their current turn.
+
+        :param job_id: Job to cancel.
+        :return: The job's status after the request, or None if the job is unknown.
+        """
+        with self._connect() as conn:
+            conn.execute(
+                "UPDATE jobs SET status = 'cancelled', finished = ? "
+                "WHERE id = ? AND status = 'queued'",
+                (time.time(), job_id),
+            )
+            conn.execute(
+                "UPDATE jobs SET cancel_requested = 1 WHERE id = ? AND status = 'running'",
+                (job_id,),
+            )
+            row = conn.execute("SELECT status FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        self._notify()
+        return row[0] if row else None
+
+    ###########################################################################
+    # Workers
+    ###########################################################################
+
+    def claim(
+        self, worker: Optional[str] = None, lease: Optional[float] = None
+    ) -> Optional[Tuple[str, Dict[str, Any]]]:
+        """
+        Atomically take the oldest queued job and mark it running.
+
+        With a lease, jobs whose lease has expired are first put back in the queue.
+
+        :param worker: Identity of the claiming worker (e.g. "host:pid").
+        :param lease: Seconds the worker holds the job without a `heartbeat`.
+        :return: (job id, spec), or None if the queue is empty.
+        """
+        if lease is not None:
+            self.requeue_expired()
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT id, spec FROM jobs WHERE status = 'queued' "
+                "ORDER BY created LIMIT 1"
+            ).fetchone()
+            if row is None:
+                return None
+            job_id, spec = row
+            now = time.time()
+            conn.execute(
+                "UPDATE jobs SET status = 'running', started = ?, worker = ?, "
+                "lease_expires = ?, attempts = attempts + 1 WHERE id = ?",
+                (now, worker, now + lease if lease is not None else None, job_id),
+            )
+            # A re-run starts from the first turn (cached turns are replayed)
+            conn.execute("DELETE FROM turns WHERE job_id = ?", (job_id,))
+        return job_id, json.loads(spec)
+
+    @staticmethod
+    def _holds(conn: sqlite3.Connection, job_id: str, worker: Optional[str]) -> bool:
+        """Return True if the job is running and, for a given worker, claimed by it."""
+        row = conn.execute(
+            "SELECT status, worker FROM jobs WHERE id = ?", (job_id,)
+        ).fetchone()
+        return (
+            row is not None
+            and row[0] == "running"
+            and (worker is None or row[1] == worker)
+        )
+
+    def add_turn(
+        self, job_id: str, turn: Dict[str, str], worker: Optional[str] = None
+    ) -> None:
+        """
+        Append a completed turn to a running job.
+
+        :param worker: Worker holding the job's lease, if it was claimed with one.
+        :raises JobCancelledError: If the job was cancelled in the meantime.
+        :raises LeaseLostError: If `worker` no longer holds the job.
+        """
+        with self._connect() as conn:
+            if worker is not None and not self._holds(conn, job_id, worker):
+                raise LeaseLostError(f"Worker {worker} lost the lease of job {job_id}.")
+            conn.execute(
+                "INSERT INTO turns (job_id, idx, agent, message) "
+                "SELECT ?, COUNT(*), ?, ? FROM turns WHERE job_id = ?",
+                (job_id, turn["agent"], turn["message"], job_id),
+            )
+            cancel_requested = conn.execute(
+                "SELECT cancel_requested FROM jobs WHERE id = ?", (job_id,)
+            ).fetchone()[0]
+        self._notify()
+        if cancel_requested:
+            raise JobCancelledError(f"Job {job_id} was cancelled.")
+
+    def finish(
+        self,
+        job_id: str,
+        status: str,
+        error: Optional[str] = None,
+        summary: Optional[str] = None,
+        worker: Optional[str] = None,
+    ) -> bool:
+        """
+        Record the outcome of a job ("done", "failed" or "cancelled").
+
+        :param worker: Worker holding the job's lease, if it was claimed with one; the
+            outcome is ignored if another worker has taken over the job since.
+        :return: True if the outcome was recorded.
+        """
+        if status not in TERMINAL_STATUSES:
+            raise ValueError(f"Invalid final status: {status}")
+        with self._connect() as conn:
+            if worker is not None and not self._holds(conn, job_id, worker):
+                return False
+            conn.execute(
+                "UPDATE jobs SET status = ?, finished = ?, error = ?, summary = ?, "
+                "lease_expires = NULL WHERE id = ?",
+                (status, time.time(), error, summary, job_id),
+            )
+        self._notify()
+        return True
+
+    ###########################################################################
+    # Leases (distributed workers)
+    ###########################################################################
+
+    def heartbeat(self, job_id: str, worker: str, lease: float) -> str:
+        """
+        Renew a worker's lease on a running job.
+
+        :param job_id: Job claimed by the worker.
+        :param worker: Worker holding the lease.
+        :param lease: Seconds from now until the lease expires.
+        :return: "ok" if the lease was renewed, "cancel" if the job was cancelled,
+            or "lost" if the worker no longer holds the job.
+        """
+        with self._connect() as conn:
+            if not self._holds(conn, job_id, worker):
+                return "lost"
+            conn.execute(
+                "UPDATE jobs SET lease_expires = ? WHERE id = ?",
+                (time.time() + lease, job_id),
+            )
+            cancel_requested = conn.execute(
+                "SELECT cancel_requested FROM jobs WHERE id = ?", (job_id,)
+            ).fetchone()[0]
+        return "cancel" if cancel_requested else "ok"
+
+    def release(
+        self,
+        job_id: str,
+        worker: str,
+        error: str,
+        max_attempts: int = JOB_MAX_ATTEMPTS,
+    ) -> Optional[str]:
+        """
+        Give up a failed job: put it back in the queue, or fail it after its last attempt.
+
+        :param job_id: Job claimed by the worker.
+        :param worker: Worker holding the lease.
+        :param error: Description of the failure, kept on the job.
+        :param max_attempts: Number of attempts after which the job fails for good.
+        :return: The job's new status, or None if the worker no longer held the job.
+        """
+        with self._connect() as conn:
+            if not self._holds(conn, job_id, worker):
+                return None
+            attempts = conn.execute(
+                "SELECT attempts FROM jobs WHERE id = ?", (job_id,)
+            ).fetchone()[0]
+            if attempts < max_attempts:
+                status = "queued"
+                conn.execute(
+                    "UPDATE jobs SET status = 'queued', started = NULL, worker = NULL, "
+                    "lease_expires = NULL, error = ? WHERE id = ?",
+                    (error, job_id),
+                )
+            else:
+                status = "failed"
+                conn.execute(
+                    "UPDATE jobs SET status = 'failed', finished = ?, error = ?, "
+                    "lease_expires = NULL WHERE id = ?",
+                    (time.time(), error, job_id),
+                )
+        self._notify()
+        return status
+
+    def requeue_expired(self, max_attempts: int = JOB_MAX_ATTEMPTS) -> int:
+        """
+        Put running jobs whose lease has expired back in the queue (cancelled jobs are
+        marked cancelled, and jobs out of attempts failed).
+
+        :param max_attempts: Number of attempts after which the job fails for good.
+        :return: Number of requeued jobs.
+        """
+        now = time.time()
+        expired = "status = 'running' AND lease_expires IS NOT NULL AND lease_expires < ?"
+        with self._connect() as conn:
+            conn.execute(
+                f"UPDATE jobs SET status = 'cancelled', finished = ?, lease_expires = NULL "
+                f"WHERE {expired} AND cancel_requested = 1",
+                (now, now),
+            )
+            conn.execute(
+                f"UPDATE jobs SET status = 'failed', finished = ?, lease_expires = NULL, "
+                f"error = 'lease expired on worker ' || COALESCE(worker, '?') "
+                f"WHERE {expired} AND attempts >= ?",
+                (now, now, max_attempts),
+            )
+            cursor = conn.execute(
+                f"UPDATE jobs SET status = 'queued', started = NULL, worker = NULL, "
+                f"lease_expires = NULL WHERE {expired}",
+                (now,),
+            )
+        if cursor.rowcount:
+            self._notify()
+        return cursor.rowcount
+
+    def requeue_interrupted(self) -> int:
+        """
+        Put jobs left running by a stopped server back in the queue.
+
+        Call this once at start-up, before any worker claims a job. Queues shared by
+        several nodes rely on leases instead (see `requeue_expired`).
+
+        :return: Number of requeued jobs.
+        """
+        with self._connect() as conn:
+            conn.execute(
+                "UPDATE jobs SET status = 'cancelled', finished = ? "
+                "WHERE status = 'running' AND cancel_requested = 1",
+                (time.time(),),
+            )
+            cursor = conn.execute(
+                "UPDATE jobs SET status = 'queued', started = NULL WHERE status = 'running'"
+            )
+        return cursor.rowcount
+
+    ###########################################################################
+    # Queries
+    ###########################################################################
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Return a job's state (without its spec), or None if it is unknown."""
+        with self._connect() as conn:
+            row = conn.execute(
+                f"SELECT {', '.join(_JOB_COLUMNS)} FROM jobs WHERE id = ?", (job_id,)
+            ).fetchone()
+            if row is None:
+                return None
+            num_turns = conn.execute(
+                "SELECT COUNT(*) FROM turns WHERE job_id = ?", (job_id,)
+            ).fetchone()[0]
+        job = dict(zip(_JOB_COLUMNS, row))
+        job["cancel_requested"] = bool(job["cancel_requested"])
+        job["turns"] = num_turns
+        return job
+
+    def list(self, status: Optional[str] = None, limit: int = 100) -> List[Dict[str, Any]]:
+        """Return the most recent jobs, optionally only those with `status`."""
+        query = f"SELECT {', '.join(_JOB_COLUMNS)} FROM jobs"
+        params: Tuple[Any, ...] = ()
+        if status is not None:
+            query += " WHERE status = ?"
+            params = (status,)
+        query += " ORDER BY created DESC LIMIT ?"
+        with self._connect() as conn:
+            rows = conn.execute(query, (*params, limit)).fetchall()
+        return [dict(zip(_JOB_COLUMNS, row)) for row in rows]
+
+    def turns(self, job_id: str, after: int = 0) -> List[Dict[str, Any]]:
+        """
+        Return the turns of a job, starting at index `after`.
+
+        :return: List of {"index", "agent", "message"} dicts in meeting order.
+        """
+        with self._connect() as conn:
+            rows = conn.execute(
+                "SELECT idx, agent, message FROM turns WHERE job_id = ? AND idx >= ? "
+                "ORDER BY idx",
+                (job_id, after),
+            ).fetchall()
+        return [{"index": idx, "agent": agent, "message": message} for idx, agent, message in rows]
+
+
+###############################################################################
+# Global rate limits
+###############################################################################
+
+
+class SharedRateLimiter:
+    """
+    Requests-per-minute limits shared by every process using the same SQLite file.
+
+    Requests are counted in fixed windows of `RATE_LIMIT_WINDOW` seconds, per service
+    (an LLM provider name, "ads" or "simbad"). A caller that would exceed a limit
+    sleeps until the next window, so the workers of all nodes together stay within
+    the rate limit of each API key. Services without a limit are not counted.
+    """
+
+    def __init__(
+        self, db_path: Path, limits: Mapping[str, int], window: float = RATE_LIMIT_WINDOW
+    ) -> None:
+        """
+        :param db_path: SQLite file holding the counters (usually the job queue's).
+        :param limits: Maximum number of requests per window, by service.
+        :param window: Length of a counting window in seconds.
+        """
+        self.db_path = Path(db_path)
+        self.limits = dict(limits)
+        self.window = window
+        with contextlib.closing(sqlite3.connect(self.db_path, timeout=30.0)) as conn:
+            conn.executescript(_SCHEMA)
+
+    def acquire(self, service: str) -> None:
+        """Block until one more request to `service` fits in its rate limit."""
+        limit = self.limits.get(service)
+        if not limit:
+            return
+        while True:
+            now = time.time()
+            window = int(now // self.window)
+            with _transaction(self.db_path) as conn:
+                row = conn.execute(
+                    "SELECT count FROM rate_windows WHERE service = ? AND window = ?",
+                    (service, window),
+                ).fetchone()
+                count = row[0] if row else 0
+                if count < limit:
+                    conn.execute(
+                        "INSERT INTO rate_windows (service, window, count) VALUES (?, ?, 1) "
+                        "ON CONFLICT (service, window) DO UPDATE SET count = count + 1",
+                        (service, window),
+                    )
+                    if row is None:
+                        # First request of a window: drop the counters of past windows
+                        conn.execute(
+                            "DELETE FROM rate_windows WHERE service = ? AND window < ?",
+                            (service, window),
+                        )
+                    return
+            # Spread the waiting callers over the start of the next window
+            jitter = random.uniform(0, 0.1 * self.window)
+            time.sleep((window + 1) * self.window - now + jitter)
+
+    def usage(self) -> Dict[str, Dict[str, int]]:
+        """Return the requests counted in the current window and the limit, by service."""
+        window = int(time.time() // self.window)
+        with contextlib.closing(sqlite3.connect(self.db_path, timeout=30.0)) as conn:
+            counts = dict(
+                conn.execute(
+                    "SELECT service, count FROM rate_windows WHERE window = ?", (window,)
+                ).fetchall()
+            )
+        return {
+            service: {"requests": counts.get(service, 0), "limit": limit}
+            for service, limit in self.limits.items()
+        }
@@ -0,0 +1,313 @@
+"""
+Pre-meeting literature prefetch for astro_virtual_lab.
+
+Before a meeting starts, search queries are extracted from the agenda, the agenda
+questions and the expertise of each participant. The queries run concurrently through
+`search_ads`, and the deduplicated abstracts are packed into a token-budgeted
+context block that is handed to the meeting as an extra context. The searches also
+warm the ADS result cache, so the same lookups made by agents during the meeting
+resolve locally instead of waiting on the network mid-turn.
+
+During a pipelined meeting (`run_meeting(..., pipeline=True)`), a `TurnPrefetcher`
+keeps doing the same while the meeting runs: as soon as a turn starts generating,
+searches drawn from the next speaker's expertise and the latest reply are issued in
+the background, and the abstracts they find are added to that speaker's prompt. The
+ADS latency overlaps the current turn, and every search made is shown to an agent
+rather than only warming the cache for a tool call that would have to match it
+exactly.
+
+Example:
+    from astro_virtual_lab.prefetch import extract_literature_queries, prefetch_literature
+
+    queries = extract_literature_queries(agenda, agenda_questions, agents=team_members)
+    literature_context = prefetch_literature(queries)
+"""
+
+import re
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from typing import Dict, Iterable, List, Optional, Set
+
+from astro_virtual_lab.agent import Agent
+from astro_virtual_lab.concurrency import CancellationToken
+from astro_virtual_lab.config import get_setting
+from astro_virtual_lab.constants import (
+    DEFAULT_SERVICE_CONCURRENCY,
+    PIPELINE_PREFETCH_QUERIES,
+    PIPELINE_PREFETCH_TOKEN_BUDGET,
+    PREFETCH_MAX_QUERIES,
+    PREFETCH_TOKEN_BUDGET,
+    STOPWORDS,
+)
+from astro_virtual_lab.utils import ADSPaper, count_tokens, search_ads
+
+
+def _ads_concurrency() -> int:
+    """Return the configured number of simultaneous ADS searches."""
+    return max(
+        1,
+        int(get_setting("concurrency", "ads", default=DEFAULT_SERVICE_CONCURRENCY["ads"])),
+    )
+
+
+def _keywords(text: str, max_terms: int) -> str:
+    """Reduce a sentence to its first `max_terms` content words, in order."""
+    words = re.findall(r"\[?[A-Za-z][\w/\-\]]*", text)
+    terms: List[str] = []
+    for word in words:
+        if word.lower() in STOPWORDS or len(word) < 3:
+            continue
+        if word.lower() not in (term.lower() for term in terms):
+            terms.append(word)
+        if len(terms) == max_terms:
+            break
+    return " ".join(terms)
+
+
+def extract_literature_queries(
+    agenda: str,
+    agenda_questions: tuple[str, ...] = (),
+    agents: Iterable[Agent] = (),
+    max_queries: int = PREFETCH_MAX_QUERIES,
+    max_terms: int = 6,
+) -> List[str]:
+    """
+    Build short keyword queries for ADS from the meeting definition.
+
+    Agenda questions come first (they are the most specific), followed by each
+    sentence or list item of the agenda, and finally each participant's expertise.
+
+    :param agenda: Main agenda text.
+    :param agenda_questions: Questions that must be answered in the meeting.
+    :param agents: Participants whose `expertise` should seed a query.
+    :param max_queries: Maximum number of queries to return.
+    :param max_terms: Maximum number of keywords per query.
+    :return: Deduplicated list of keyword queries.
+    """
+    segments: List[str] = list(agenda_questions)
+    for line in agenda.splitlines():
+        # Strip list numbering, then split prose lines into sentences
+        line = re.sub(r"^\s*(\d+[.)]|[-*])\s*", "", line)
+        segments.extend(part for part in re.split(r"(?<=[.!?])\s+", line) if part)
+    segments.extend(agent.expertise for agent in agents)
+
+    queries: List[str] = []
+    seen = set()
+    for segment in segments:
+        query = _keywords(segment, max_terms=max_terms)
+        # Single-word queries are too broad to be useful context
+        if len(query.split()) < 2 or query.lower() in seen:
+            continue
+        seen.add(query.lower())
+        queries.append(query)
+        if len(queries) == max_queries:
+            break
+    return queries
+
+
+def prefetch_literature(
+    queries: List[str],
+    num_articles: int = 3,
+    token_budget: int = PREFETCH_TOKEN_BUDGET,
+    max_workers: Optional[int] = None,
+    verbose: bool = True,
+) -> str:
+    """
+    Run ADS searches concurrently and pack the unique abstracts into one context.
+
+    Papers are deduplicated by bibcode and added in query order until the token
+    budget is exhausted. Failed or empty searches are skipped.
+
+    :param queries: Keyword queries, e.g. from `extract_literature_queries`.
+    :param num_articles: Number of papers requested per query.
+    :param token_budget: Maximum number of tokens of the returned context.
+    :param max_workers: Concurrent searches (defaults to the configured ADS limit).
+    :param verbose: Print search details for debugging or clarity.
+    :return: Context text with the selected abstracts, or "" if nothing was found.
+    """
+    if not queries:
+        return ""
+
+    if max_workers is None:
+        max_workers = _ads_concurrency()
+
+    def search(query: str) -> List[ADSPaper]:
+        if verbose:
+            print(f"[ADS Prefetch] Searching for up to {num_articles} articles with query: '{query}'")
+        try:
+            return search_ads(query, num_articles)
+        except Exception as e:
+            if verbose:
+                print(f"[ADS Prefetch] Search failed for query '{query}': {e}")
+            return []
+
+    with ThreadPoolExecutor(max_workers=max(1, int(max_workers))) as executor:
+        results = list(executor.map(search, queries))
+
+    return _pack_papers(
+        results,
+        header="Relevant literature retrieved from NASA ADS before the meeting:",
+        token_budget=token_budget,
+        seen_bibcodes=set(),
+    )
+
+
+def _pack_papers(
+    results: Iterable[List[ADSPaper]],
+    header: str,
+    token_budget: int,
+    seen_bibcodes: Set[str],
+) -> str:
+    """
+    Format the papers of several searches under a header, within a token budget.
+
+    Papers whose bibcode is in `seen_bibcodes` are skipped, and the bibcodes of the
+    papers included are added to it.
+    """
+    blocks: List[str] = []
+    used_tokens = count_tokens(header)
+
+    for papers in results:
+        for paper in papers:
+            if paper.bibcode in seen_bibcodes:
+                continue
+            block = paper.format()
+            block_tokens = count_tokens(block)
+            if used_tokens + block_tokens > token_budget:
+                continue
+            seen_bibcodes.add(paper.bibcode)
+            blocks.append(block)
+            used_tokens += block_tokens
+
+    if not blocks:
+        return ""
+
+    return f"{header}\n\n" + "\n\n".join(blocks)
+
+
+class TurnPrefetcher:
+    """
+    Searches ADS for the next speaker of a meeting while the current turn generates.
+
+    `start` issues the searches for the next speaker, and `collect` returns the
+    abstracts found, to be added to that speaker's prompt. Each call to `start`
+    replaces the previous speculation: searches that have not begun yet are
+    cancelled. A query is searched at most once per meeting and a paper is shown at
+    most once, so the ADS quota is only spent on abstracts the agents will read.
+    """
+
+    def __init__(
+        self,
+        max_queries: int = PIPELINE_PREFETCH_QUERIES,
+        num_articles: int = 3,
+        max_workers: Optional[int] = None,
+        token_budget: int = PIPELINE_PREFETCH_TOKEN_BUDGET,
+    ) -> None:
+        """
+        :param max_queries: Maximum number of new searches per speculation.
+        :param num_articles: Number of papers requested per search (the tool's default).
+        :param max_workers: Concurrent searches (defaults to the configured ADS limit).
+        :param token_budget: Maximum number of tokens of abstracts added to a prompt.
+        """
+        self.max_queries = max_queries
+        self.num_articles = num_articles
+        self.token_budget = token_budget
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers or _ads_concurrency(),
+            thread_name_prefix="turn-prefetch",
+        )
+        self._agent: Optional[Agent] = None
+        self._pending: Dict[str, Future] = {}
+        self._searched: Set[str] = set()
+        self._shown: Set[str] = set()
+
+    def _search(self, query: str) -> List[ADSPaper]:
+        try:
+            return search_ads(query, self.num_articles)
+        except Exception:
+            # A failed search adds nothing; the agent can still search with the tool
+            return []
+
+    def _cancel_pending(self) -> None:
+        for query, future in self._pending.items():
+            # Cancelled searches never ran, so a later speculation may issue them again
+            if future.cancel():
+                self._searched.discard(query)
+        self._pending = {}
+
+    def start(self, agent: Agent, hint: str = "") -> List[str]:
+        """
+        Begin the searches the next speaker is likely to make.
+
+        :param agent: Agent speaking next.
+        :param hint: Latest discussion text (e.g. the last reply) to draw queries from.
+        :return: The queries submitted by this call.
+        """
+        self._cancel_pending()
+        self._agent = agent
+        candidates = extract_literature_queries(
+            agenda=f"{agent.expertise}.\n{hint}", max_queries=PREFETCH_MAX_QUERIES
+        )
+        queries = [query for query in candidates if query.lower() not in self._searched]
+        queries = queries[: self.max_queries]
+        for query in queries:
+            self._searched.add(query.lower())
+            self._pending[query.lower()] = self._executor.submit(self._search, query)
+        return queries
+
+    def collect(
+        self,
+        agent: Agent,
+        token: Optional[CancellationToken] = None,
+        timeout: Optional[float] = None,
+    ) -> str:
+        """
+        Wait for the searches started for `agent` and format the papers they found.
+
+        :param agent: Agent about to speak.
+        :param token: Token of the meeting; waiting stops when it is cancelled or expires.
+        :param timeout: Seconds to wait for the searches; those still running are dropped.
+        :return: Context with the abstracts not shown earlier in the meeting, or "" if
+            there are none or the searches were started for another agent.
+        :raises OperationCancelledError: If `token` was cancelled while waiting.
+        :raises DeadlineExceededError: If the deadline of `token` passed while waiting.
+        """
+        if self._agent is None or self._agent.title != agent.title:
+            return ""
+        futures = [future for future in self._pending.values() if not future.cancelled()]
+        self._pending = {}
+        self._agent = None
+
+        end = time.monotonic() + timeout if timeout is not None else None
+        results: List[List[ADSPaper]] = []
+        try:
+            for future in futures:
+                left = max(end - time.monotonic(), 0.0) if end is not None else None
+                try:
+                    results.append(
+                        token.wait(future, left) if token is not None else future.result(left)
+                    )
+                except FutureTimeoutError:
+                    break
+        finally:
+            # Searches that have not started by now are no longer worth their quota
+            for future in futures:
+                future.cancel()
+        return _pack_papers(
+            results,
+            header=f"Literature retrieved from NASA ADS for {agent.title}:",
+            token_budget=self.token_budget,
+            seen_bibcodes=self._shown,
+        )
+
+    def close(self) -> None:
+        """Cancel the pending searches and release the worker threads."""
+        self._cancel_pending()
+        self._executor.shutdown(wait=False)
+
+    def __enter__(self) -> "TurnPrefetcher":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
@@ -2,15 +2,25 @@
 Defines default Agents and prompt text used in the astro_virtual_lab.
 Also contains helper functions for building multi-agent meeting prompts
 (including agendas, rules, etc.).
+
+The prompt builders are pure functions of hashable arguments (agents are immutable
+values and agenda items are tuples), so they are memoized: the fragments of a meeting
+are rendered once and reused by every round and by repeated meetings on the same agenda.
 """
 
+from functools import lru_cache
 from typing import Iterable
 
 from astro_virtual_lab.agent import Agent
+from astro_virtual_lab.constants import OUTPUT_WORDS_PER_TOKEN, PROMPT_CACHE_SIZE
 
 ###############################################################################
 # Default Agents
 ###############################################################################
+# Each agent is offered only the tools that fit its role, which keeps prompts small
+LITERATURE_TOOLS = ("run_ads_search", "query_simbad")
+SURVEY_TOOLS = ("binned_median", "column_histogram", "column_percentiles")
+
 PRINCIPAL_INVESTIGATOR = Agent(
     title="Principal Investigator",
     expertise="galactic archaeology, stellar population analysis",
@@ -19,6 +29,7 @@ PRINCIPAL_INVESTIGATOR = Agent(
         "lead research into the Milky Way's formation history using stellar populations, "
         "coordinate chemical abundance analysis, and integrate results with galactic evolution models"
     ),
+    tools=LITERATURE_TOOLS,
 )
 
 GALACTIC_EVOLUTION_EXPERT = Agent(
@@ -29,6 +40,7 @@ GALACTIC_EVOLUTION_EXPERT = Agent(
         "interpret chemical abundance patterns in the context of nucleosynthesis and galaxy formation scenarios, "
         "develop galactic evolution models, and connect observations with theoretical predictions"
     ),
+    tools=("run_ads_search", *SURVEY_TOOLS),
 )
 
 STELLAR_EVOLUTION_EXPERT = Agent(
@@ -39,6 +51,7 @@ STELLAR_EVOLUTION_EXPERT = Agent(
         "analyze stellar spectra to derive fundamental parameters and chemical abundances, "
         "interpret stellar populations in the context of evolutionary tracks and isochrones"
     ),
+    tools=(*LITERATURE_TOOLS, "crossmatch_catalog"),
 )
 
 MACHINE_LEARNING_EXPERT = Agent(
@@ -50,6 +63,7 @@ MACHINE_LEARNING_EXPERT = Agent(
         "and pattern recognition in astronomical data, with expertise in handling survey systematics "
         "and cross-calibration challenges"
     ),
+    tools=("run_ads_search", "crossmatch_catalog", *SURVEY_TOOLS),
 )
 
 SCIENTIFIC_CRITIC = Agent(
@@ -60,6 +74,7 @@ SCIENTIFIC_CRITIC = Agent(
         "evaluate methodologies, identify potential biases in survey data, and ensure "
         "proper handling of systematic uncertainties"
     ),
+    tools=("run_ads_search",),
 )
 
 ###############################################################################
@@ -77,6 +92,12 @@ SUMMARY_PROMPT = (
     "discussion while strictly adhering to the agenda rules"
 )
 
+CONSENSUS_PROMPT = (
+    'End your reply with a final line that reads "Consensus: yes" if the team agrees on '
+    "the answers to the agenda questions and another round of discussion would not change "
+    'your recommendation, or "Consensus: no" otherwise'
+)
+
 MERGE_PROMPT = (
     "Please read the summaries of multiple separate meetings about the same astronomical "
     "research agenda. Based on the summaries, provide a single answer that merges the "
@@ -98,6 +119,7 @@ def format_prompt_list(prompts: Iterable[str]) -> str:
     return "\n\n".join(f"{i+1}. {prompt}" for i, prompt in enumerate(prompts))
 
 
+@lru_cache(maxsize=PROMPT_CACHE_SIZE)
 def format_agenda(
     agenda: str, intro: str = "Here is the agenda for the meeting:"
 ) -> str:
@@ -105,6 +127,7 @@ def format_agenda(
     return f"{intro}\n\n{agenda}\n\n"
 
 
+@lru_cache(maxsize=PROMPT_CACHE_SIZE)
 def format_agenda_questions(
     agenda_questions: tuple[str, ...],
     intro: str = "Here are the agenda questions that must be answered:",
@@ -114,6 +137,7 @@ def format_agenda_questions(
     return f"{intro}\n\n{format_prompt_list(agenda_questions)}\n\n"
 
 
+@lru_cache(maxsize=PROMPT_CACHE_SIZE)
 def format_agenda_rules(
     agenda_rules: tuple[str, ...],
     intro: str = "Here are the agenda rules that must be followed:",
@@ -123,6 +147,34 @@ def format_agenda_rules(
     return f"{intro}\n\n{format_prompt_list(agenda_rules)}\n\n"
 
 
+@lru_cache(maxsize=PROMPT_CACHE_SIZE)
+def format_references(refs: tuple[str, ...], ref_type: str, intro: str) -> str:
+    """Wraps prior contexts or summaries in numbered begin/end markers."""
+    if not refs:
+        return ""
+    blocks = []
+    for idx, ref in enumerate(refs):
+        blocks.append(
+            f"[begin {ref_type} {idx+1}]\n\n{ref}\n\n[end {ref_type} {idx+1}]"
+        )
+    joined = "\n\n".join(blocks)
+    return f"{intro}\n\n{joined}\n\n"
+
+
+@lru_cache(maxsize=PROMPT_CACHE_SIZE)
+def output_length_prompt(max_tokens: int) -> str:
+    """
+    Asks for a reply that fits in `max_tokens` completion tokens, so that the reply
+    ends on its own instead of being cut off by the API.
+    """
+    words = max(10, round(max_tokens * OUTPUT_WORDS_PER_TOKEN, -1))
+    return (
+        f"Please keep your reply under about {words:.0f} words. If needed, be more "
+        "concise rather than leaving out any requested part."
+    )
+
+
+@lru_cache(maxsize=PROMPT_CACHE_SIZE)
 def summary_structure_prompt(has_agenda_questions: bool) -> str:
     """
     Returns instructions on how to structure a final summary.
@@ -164,6 +216,7 @@ def summary_structure_prompt(has_agenda_questions: bool) -> str:
 ###############################################################################
 # Team and Individual Meeting Prompts
 ###############################################################################
+@lru_cache(maxsize=PROMPT_CACHE_SIZE)
 def team_meeting_start_prompt(
     team_lead: Agent,
     team_members: tuple[Agent, ...],
@@ -183,16 +236,6 @@ def team_meeting_start_prompt(
     """
 
     # Optionally embed prior contexts or summaries
-    def format_references(refs: tuple[str, ...], ref_type: str, intro: str) -> str:
-        if not refs:
-            return ""
-        blocks = []
-        for idx, ref in enumerate(refs):
-            blocks.append(
-                f"[begin {ref_type} {idx+1}]\n\n{ref}\n\n[end {ref_type} {idx+1}]"
-            )
-        return f"{intro}\n\n{'\n\n'.join(blocks)}\n\n"
-
     context_str = format_references(
         contexts, "context", "Here is context for this meeting:"
     )
@@ -216,6 +259,7 @@ def team_meeting_start_prompt(
     )
 
 
+@lru_cache(maxsize=PROMPT_CACHE_SIZE)
 def team_meeting_team_lead_initial_prompt(team_lead: Agent) -> str:
     """Prompt for the team lead to provide initial thoughts on the agenda."""
     return (
@@ -224,6 +268,7 @@ def team_meeting_team_lead_initial_prompt(team_lead: Agent) -> str:
     )
 
 
+@lru_cache(maxsize=PROMPT_CACHE_SIZE)
 def team_meeting_team_member_prompt(
     team_member: Agent,
     round_num: int,
@@ -237,16 +282,22 @@ def team_meeting_team_member_prompt(
     )
 
 
+@lru_cache(maxsize=PROMPT_CACHE_SIZE)
 def team_meeting_team_lead_intermediate_prompt(
-    team_lead: Agent, round_num: int, num_rounds: int
+    team_lead: Agent, round_num: int, num_rounds: int, ask_consensus: bool = False
 ) -> str:
-    """Prompt for the team lead to summarize and ask for more info, at the end of each round except the final one."""
+    """
+    Prompt for the team lead to summarize and ask for more info, at the end of each round except the final one.
+    With `ask_consensus`, the lead also states whether the team has converged (used for early exit).
+    """
+    consensus = f" {CONSENSUS_PROMPT}." if ask_consensus else ""
     return (
         f"This concludes round {round_num} of {num_rounds} of discussion. "
-        f"{team_lead.title}, please {SYNTHESIS_PROMPT}."
+        f"{team_lead.title}, please {SYNTHESIS_PROMPT}.{consensus}"
     )
 
 
+@lru_cache(maxsize=PROMPT_CACHE_SIZE)
 def team_meeting_team_lead_final_prompt(
     team_lead: Agent,
     agenda: str,
@@ -273,6 +324,7 @@ def team_meeting_team_lead_final_prompt(
     )
 
 
+@lru_cache(maxsize=PROMPT_CACHE_SIZE)
 def individual_meeting_start_prompt(
     team_member: Agent,
     agenda: str,
@@ -286,16 +338,6 @@ def individual_meeting_start_prompt(
     Embeds context, summaries, the agenda, etc.
     """
 
-    def format_references(refs: tuple[str, ...], ref_type: str, intro: str) -> str:
-        if not refs:
-            return ""
-        blocks = []
-        for idx, ref in enumerate(refs):
-            blocks.append(
-                f"[begin {ref_type} {idx+1}]\n\n{ref}\n\n[end {ref_type} {idx+1}]"
-            )
-        return f"{intro}\n\n{'\n\n'.join(blocks)}\n\n"
-
     context_str = format_references(
         contexts, "context", "Here is context for this meeting:"
     )
@@ -0,0 +1,198 @@
+"""
+Registry of OpenAI-compatible LLM providers for astro_virtual_lab.
+
+Every model is served by a provider: an OpenAI-compatible endpoint with its own API
+key, concurrency limit and capabilities. OpenAI and DeepSeek are built in (see
+`constants.BUILTIN_PROVIDERS`); the `providers` section of config.yml overrides them
+and adds others, e.g. a local vLLM or llama.cpp server for cheap member turns:
+
+    providers:
+      local:
+        base_url: http://localhost:8000/v1
+        api_key: EMPTY                # any value for servers without auth, or api_key_env
+        models: [llama-3.1-8b-instruct, {qwen2.5-7b-instruct: {tools: false}}]
+        model_prefixes: [llama-]
+        max_concurrency: 4            # simultaneous requests sent to the server
+        tools: true                   # function calling (default for its models)
+        streaming: true               # server supports stream=True
+        alternate_roles: false        # needs strictly alternating user/assistant turns
+        max_tokens: true              # max_tokens caps the answer (not hidden reasoning)
+        batch_api: false              # provider implements the Batch API
+
+Without `api_key` or `api_key_env`, the key is read from `api_keys.<provider name>`.
+A model is served by the provider listing it, then by the provider with the longest
+matching prefix, and otherwise by the default provider (OpenAI).
+"""
+
+import contextlib
+import functools
+import os
+import threading
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterator, Mapping, Optional
+
+from astro_virtual_lab.config import get_setting, load_config
+from astro_virtual_lab.constants import BUILTIN_PROVIDERS, DEFAULT_PROVIDER
+
+_PROVIDER_KEYS = frozenset(
+    {
+        "base_url",
+        "api_key",
+        "api_key_env",
+        "models",
+        "model_prefixes",
+        "max_concurrency",
+        "tools",
+        "streaming",
+        "alternate_roles",
+        "max_tokens",
+        "batch_api",
+    }
+)
+_CAPABILITY_KEYS = ("tools", "streaming", "alternate_roles", "max_tokens")
+
+
+@dataclass(frozen=True)
+class ModelCapabilities:
+    """What a model's endpoint supports."""
+
+    tools: bool = True
+    streaming: bool = True
+    alternate_roles: bool = False
+    # False for models whose max_tokens also counts their reasoning, which a reply
+    # budget would cut short; their length is then only requested in the prompt
+    max_tokens: bool = True
+
+
+@dataclass(frozen=True)
+class Provider:
+    """An OpenAI-compatible endpoint and the models it serves."""
+
+    name: str
+    base_url: Optional[str] = None
+    api_key: Optional[str] = None
+    api_key_env: Optional[str] = None
+    models: Mapping[str, ModelCapabilities] = field(default_factory=dict)
+    model_prefixes: tuple[str, ...] = ()
+    max_concurrency: Optional[int] = None
+    capabilities: ModelCapabilities = ModelCapabilities()
+    batch_api: bool = False
+    _slots: Optional[threading.BoundedSemaphore] = field(
+        default=None, repr=False, compare=False
+    )
+
+    @classmethod
+    def from_dict(cls, name: str, settings: Mapping[str, Any]) -> "Provider":
+        """
+        Build a provider from its config.yml entry.
+
+        :param name: Provider name (also the default `api_keys` entry).
+        :param settings: Mapping with the keys documented in this module.
+        :return: The provider.
+        """
+        unknown = set(settings) - _PROVIDER_KEYS
+        if unknown:
+            raise ValueError(f"Unknown settings {sorted(unknown)} for provider '{name}'")
+
+        defaults = {key: settings[key] for key in _CAPABILITY_KEYS if key in settings}
+        capabilities = ModelCapabilities(**defaults)
+        models: Dict[str, ModelCapabilities] = {}
+        for entry in settings.get("models") or ():
+            # Either a model name, or {model name: capability overrides}
+            if isinstance(entry, str):
+                models[entry] = capabilities
+            else:
+                for model, overrides in entry.items():
+                    models[model] = ModelCapabilities(**{**defaults, **(overrides or {})})
+
+        max_concurrency = settings.get("max_concurrency")
+        return cls(
+            name=name,
+            base_url=settings.get("base_url"),
+            api_key=settings.get("api_key"),
+            api_key_env=settings.get("api_key_env"),
+            models=models,
+            model_prefixes=tuple(settings.get("model_prefixes") or ()),
+            max_concurrency=max_concurrency,
+            capabilities=capabilities,
+            batch_api=bool(settings.get("batch_api", False)),
+            _slots=(
+                threading.BoundedSemaphore(max_concurrency) if max_concurrency else None
+            ),
+        )
+
+    def capabilities_for(self, model: str) -> ModelCapabilities:
+        """Return the capabilities of one of the provider's models."""
+        return self.models.get(model, self.capabilities)
+
+    def resolve_api_key(self) -> str:
+        """
+        Return the API key: `api_key`, else the `api_key_env` variable, else
+        `api_keys.<name>` in config.yml.
+
+        :raises KeyError: If no key is configured for a hosted provider.
+        """
+        if self.api_key:
+            return self.api_key
+        if self.api_key_env and os.environ.get(self.api_key_env):
+            return os.environ[self.api_key_env]
+        try:
+            return load_config()["api_keys"][self.name]
+        except (FileNotFoundError, KeyError, TypeError):
+            raise KeyError(f"No API key configured for provider '{self.name}'") from None
+
+    @contextlib.contextmanager
+    def limit(self) -> Iterator[None]:
+        """Hold one of the provider's request slots for the duration of the block."""
+        if self._slots is None:
+            yield
+            return
+        with self._slots:
+            yield
+
+
+@functools.lru_cache(maxsize=None)
+def get_providers() -> Dict[str, Provider]:
+    """
+    Return the built-in providers merged with those of config.yml, by name.
+
+    The registry is built once per process, so that concurrency limits are shared by
+    all meetings. Call `get_providers.cache_clear()` after changing the configuration.
+    """
+    settings = {name: dict(entry) for name, entry in BUILTIN_PROVIDERS.items()}
+    for name, entry in (get_setting("providers", default={}) or {}).items():
+        settings[name] = {**settings.get(name, {}), **(entry or {})}
+    return {name: Provider.from_dict(name, entry) for name, entry in settings.items()}
+
+
+def get_provider_by_name(name: str) -> Provider:
+    """
+    Return a provider of the registry.
+
+    :raises ValueError: If no provider has this name.
+    """
+    providers = get_providers()
+    if name not in providers:
+        raise ValueError(f"Unknown provider: {name}. Known providers: {sorted(providers)}")
+    return providers[name]
+
+
+def get_provider(model: str) -> Provider:
+    """
+    Return the provider serving `model`.
+
+    :param model: Model name.
+    :return: The provider listing the model, else the one with the longest matching
+        prefix, else the default provider.
+    """
+    providers = get_providers()
+    for provider in providers.values():
+        if model in provider.models:
+            return provider
+
+    best, best_length = None, 0
+    for provider in providers.values():
+        for prefix in provider.model_prefixes:
+            if model.startswith(prefix) and len(prefix) > best_length:
+                best, best_length = provider, len(prefix)
+    return best if best is not None else providers[DEFAULT_PROVIDER]
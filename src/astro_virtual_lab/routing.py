@@ -0,0 +1,183 @@
+"""
+Per-phase and per-role model routing for astro_virtual_lab meetings.
+
+A meeting has four phases:
+
+- opening   : the team lead's initial thoughts (or the agent's reply in an individual meeting)
+- member    : the team members' replies in each round
+- synthesis : the team lead's intermediate syntheses
+- summary   : the team lead's final summary
+
+A `ModelRouter` picks the model of every turn from the phase and the speaking agent,
+so that cheap models can handle the member turns while a strong model writes the
+summary. Each model can have fallbacks, tried in order when the provider is
+overloaded or unreachable.
+
+The policy can be given to `run_meeting(routing=...)`, set in a meeting spec, or set
+for every meeting in the `routing` section of config.yml:
+
+    routing:
+      phases:
+        member: deepseek-chat
+        synthesis: deepseek-chat
+        summary: deepseek-reasoner
+      roles:
+        Scientific Critic: gpt-4o
+      fallbacks:
+        deepseek-reasoner: [deepseek-chat]
+
+An `OutputBudget` likewise caps the completion tokens of every turn by phase and
+role (role budgets win). The cap is sent as `max_tokens` and also requested in the
+prompt, so that replies end naturally instead of being cut off. No turn is capped
+unless budgets are set, e.g. in the `output_budget` section of config.yml, where
+`recommended: true` starts from `constants.OUTPUT_TOKEN_BUDGETS` and `null` removes
+a cap:
+
+    output_budget:
+      recommended: true
+      phases:
+        member: 400
+        synthesis: null
+      roles:
+        Scientific Critic: 300
+"""
+
+from dataclasses import dataclass, field
+from typing import Any, Literal, Mapping, Optional
+
+import openai
+
+from astro_virtual_lab.agent import Agent
+from astro_virtual_lab.config import get_setting
+from astro_virtual_lab.constants import OUTPUT_TOKEN_BUDGETS
+
+MeetingPhase = Literal["opening", "member", "synthesis", "summary"]
+MEETING_PHASES = ("opening", "member", "synthesis", "summary")
+
+# HTTP statuses meaning "try again later or elsewhere" (529 is used for overload)
+_OVERLOAD_STATUS_CODES = frozenset({429, 500, 502, 503, 504, 529})
+
+
+@dataclass(frozen=True)
+class ModelRouter:
+    """
+    Routing policy: which model serves each phase and agent, and its fallbacks.
+
+    Role overrides (keyed by agent title) win over phase models; turns matched by
+    neither use the meeting's `model`.
+    """
+
+    phases: Mapping[str, str] = field(default_factory=dict)
+    roles: Mapping[str, str] = field(default_factory=dict)
+    fallbacks: Mapping[str, tuple[str, ...]] = field(default_factory=dict)
+
+    def __post_init__(self) -> None:
+        _check_phases(self.phases)
+        object.__setattr__(
+            self,
+            "fallbacks",
+            {model: tuple(models) for model, models in self.fallbacks.items()},
+        )
+
+    @classmethod
+    def from_dict(cls, policy: Optional[Mapping[str, Any]]) -> "ModelRouter":
+        """Build a router from a mapping with optional phases, roles and fallbacks."""
+        policy = policy or {}
+        unknown = set(policy) - {"phases", "roles", "fallbacks"}
+        if unknown:
+            raise ValueError(f"Unknown routing keys {sorted(unknown)}")
+        return cls(
+            phases=dict(policy.get("phases") or {}),
+            roles=dict(policy.get("roles") or {}),
+            fallbacks=dict(policy.get("fallbacks") or {}),
+        )
+
+    @classmethod
+    def from_config(cls) -> "ModelRouter":
+        """Build the router configured in the `routing` section of config.yml."""
+        return cls.from_dict(get_setting("routing", default={}))
+
+    def models_for(self, phase: MeetingPhase, agent: Agent, default: str) -> tuple[str, ...]:
+        """
+        Return the models to try for one turn, in order.
+
+        :param phase: Phase of the meeting the turn belongs to.
+        :param agent: Agent speaking in the turn.
+        :param default: The meeting's model, used when no rule matches.
+        :return: The selected model followed by its fallbacks.
+        """
+        model = self.roles.get(agent.title) or self.phases.get(phase) or default
+        fallbacks = tuple(m for m in self.fallbacks.get(model, ()) if m != model)
+        return (model, *fallbacks)
+
+
+@dataclass(frozen=True)
+class OutputBudget:
+    """
+    Output length policy: the maximum completion tokens of each phase and agent.
+
+    Role budgets (keyed by agent title) win over phase budgets; turns matched by
+    neither, or budgeted None, are not capped.
+    """
+
+    phases: Mapping[str, Optional[int]] = field(default_factory=dict)
+    roles: Mapping[str, Optional[int]] = field(default_factory=dict)
+
+    def __post_init__(self) -> None:
+        _check_phases(self.phases)
+
+    @classmethod
+    def from_dict(cls, policy: Optional[Mapping[str, Any]]) -> "OutputBudget":
+        """
+        Build a budget from a mapping with optional phases and roles.
+
+        With `recommended: true`, phases it does not mention get their budget from
+        `OUTPUT_TOKEN_BUDGETS`; otherwise they are not capped.
+        """
+        policy = policy or {}
+        unknown = set(policy) - {"recommended", "phases", "roles"}
+        if unknown:
+            raise ValueError(f"Unknown output budget keys {sorted(unknown)}")
+        defaults = OUTPUT_TOKEN_BUDGETS if policy.get("recommended") else {}
+        return cls(
+            phases={**defaults, **(policy.get("phases") or {})},
+            roles=dict(policy.get("roles") or {}),
+        )
+
+    @classmethod
+    def from_config(cls) -> "OutputBudget":
+        """Build the budget configured in the `output_budget` section of config.yml."""
+        return cls.from_dict(get_setting("output_budget", default={}))
+
+    def max_tokens_for(self, phase: MeetingPhase, agent: Agent) -> Optional[int]:
+        """
+        Return the completion token budget of one turn.
+
+        :param phase: Phase of the meeting the turn belongs to.
+        :param agent: Agent speaking in the turn.
+        :return: Maximum completion tokens, or None for an uncapped turn.
+        """
+        if agent.title in self.roles:
+            return self.roles[agent.title]
+        return self.phases.get(phase)
+
+
+def _check_phases(phases: Mapping[str, Any]) -> None:
+    unknown = set(phases) - set(MEETING_PHASES)
+    if unknown:
+        raise ValueError(
+            f"Unknown meeting phases {sorted(unknown)}; expected {MEETING_PHASES}."
+        )
+
+
+def is_overload_error(error: Exception) -> bool:
+    """Return True if an API error means the model is overloaded or unreachable."""
+    if isinstance(
+        error,
+        (openai.RateLimitError, openai.APIConnectionError, openai.APITimeoutError),
+    ):
+        return True
+    return (
+        isinstance(error, openai.APIStatusError)
+        and error.status_code in _OVERLOAD_STATUS_CODES
+    )
@@ -27,29 +27,61 @@ Usage Example:
 """
 
 import json
+import time
 from pathlib import Path
-from typing import Dict, List, Literal, Optional
+from typing import Callable, Dict, Iterable, List, Literal, Optional, Sequence
+
+from openai.types.chat import ChatCompletion, ChatCompletionChunk
 
 ############################
 # External LLM client
 ############################
 from astro_virtual_lab.clients import init_openai_client
-from astro_virtual_lab.utils import run_ads_search
 
 ############################
 # Internal references
 ############################
+from astro_virtual_lab import prefetch
 from astro_virtual_lab.agent import Agent
-from astro_virtual_lab.constants import CONSISTENT_TEMPERATURE
+from astro_virtual_lab.batch import BatchBroker
+from astro_virtual_lab.cache import CompletionCache
+from astro_virtual_lab.cassette import through_cassette
+from astro_virtual_lab.concurrency import (
+    CancellationToken,
+    DeadlineExceededError,
+    throttle,
+)
+from astro_virtual_lab.consensus import check_consensus
+from astro_virtual_lab.constants import CONSISTENT_TEMPERATURE, MAX_TOOL_CALLS_PER_TURN
+from astro_virtual_lab.events import (
+    MeetingEvent,
+    MeetingStarted,
+    MeetingSummary,
+    RoundCompleted,
+    TokenDelta,
+    ToolCalled,
+    TurnCompleted,
+)
 from astro_virtual_lab.prompts import (
     individual_meeting_start_prompt,
+    output_length_prompt,
     team_meeting_start_prompt,
     team_meeting_team_lead_final_prompt,
     team_meeting_team_lead_intermediate_prompt,
     team_meeting_team_member_prompt,
 )
+from astro_virtual_lab.providers import get_provider
+from astro_virtual_lab.routing import (
+    MeetingPhase,
+    ModelRouter,
+    OutputBudget,
+    is_overload_error,
+)
+from astro_virtual_lab.tools import get_tool_schemas, run_tool
+from astro_virtual_lab.usage import UsageTracker
 from astro_virtual_lab.utils import (
     get_summary,
+    load_meeting,
     save_meeting,
 )
 
@@ -58,6 +90,43 @@ from astro_virtual_lab.utils import (
 ###############################################################################
 
 
+def check_participants(
+    meeting_type: str,
+    team_lead: Optional[Agent] = None,
+    team_members: Optional[tuple[Agent, ...]] = None,
+    team_member: Optional[Agent] = None,
+) -> None:
+    """
+    Check that the participants given to `run_meeting` fit the meeting type.
+
+    :raises ValueError: If a participant is missing or not allowed in this meeting type.
+    """
+    if meeting_type == "team":
+        if not team_lead or not team_members:
+            raise ValueError(
+                "For a 'team' meeting, you must specify a team_lead and team_members."
+            )
+        if team_member:
+            raise ValueError(
+                "For a 'team' meeting, do not provide an individual team_member."
+            )
+        if team_lead.title in {member.title for member in team_members}:
+            raise ValueError("team_lead must not appear in team_members.")
+    elif meeting_type == "individual":
+        if not team_member:
+            raise ValueError(
+                "For an 'individual' meeting, you must specify a single team_member."
+            )
+        if team_lead or team_members:
+            raise ValueError(
+                "For an 'individual' meeting, do not provide team_lead or team_members."
+            )
+    else:
+        raise ValueError(
+            f"Invalid meeting_type: {meeting_type}. Must be 'team' or 'individual'."
+        )
+
+
 def run_meeting(
     meeting_type: Literal["team", "individual"],
     agenda: str,
@@ -75,6 +144,22 @@ def run_meeting(
     use_astronomy_tools: bool = True,
     return_summary: bool = False,
     model: str = "gpt-3.5-turbo",
+    prefetch_literature: bool = False,
+    cache: Optional[CompletionCache] = None,
+    usage: Optional[UsageTracker] = None,
+    on_turn: Optional[Callable[[Dict[str, str]], None]] = None,
+    early_exit: bool = False,
+    routing: Optional[ModelRouter] = None,
+    output_budget: Optional[OutputBudget] = None,
+    pipeline: bool = False,
+    batch: Optional[BatchBroker] = None,
+    turn_timeout: Optional[float] = None,
+    meeting_deadline: Optional[float] = None,
+    cancel_token: Optional[CancellationToken] = None,
+    dedup_storage: bool = False,
+    on_event: Optional[Callable[[MeetingEvent], None]] = None,
+    fork_from: Optional[str] = None,
+    fork_turn: Optional[int] = None,
 ) -> Optional[str]:
     """
     Orchestrates a meeting with one or more LLM agents, either a "team" (with
@@ -97,151 +182,307 @@ def run_meeting(
     :param use_astronomy_tools: If True, allow the usage of ADS and SIMBAD in the conversation.
     :param return_summary: If True, returns the final text summary (last message).
     :param model: The OpenAI model name to use (e.g. "gpt-3.5-turbo", "gpt-4", "deepseek-chat").
+    :param prefetch_literature: If True, search ADS for the agenda, agenda questions and
+        participants' expertise before the meeting and add the abstracts to `contexts`.
+    :param cache: Completion cache; turns already in it are replayed without an API call,
+        so re-running an interrupted meeting resumes where it stopped.
+    :param usage: Tracker that records token usage and enforces its spending budget.
+    :param on_turn: Called with each turn ({"agent", "message"}) as soon as it is added,
+        e.g. to stream the meeting. An exception raised by the callback aborts the meeting.
+    :param early_exit: If True, end a team meeting before `num_rounds` once the discussion
+        has converged (see `astro_virtual_lab.consensus`), going straight to the summary.
+    :param routing: Per-phase and per-role model policy with fallbacks (defaults to the
+        `routing` section of config.yml). Turns it does not match use `model`.
+    :param output_budget: Per-phase and per-role completion token budgets (defaults to
+        the `output_budget` section of config.yml; no turn is capped without one),
+        sent as `max_tokens` and requested in the prompt of each capped turn.
+    :param pipeline: If True, search ADS for the next speaker while the current turn is
+        generating, and add the abstracts found to that speaker's prompt (see
+        `prefetch.TurnPrefetcher`).
+    :param batch: Broker that sends the completions of many concurrent meetings as Batch
+        API jobs (see `astro_virtual_lab.batch`). The caller must call `batch.leave()`
+        once the meeting ends.
+    :param turn_timeout: Seconds an agent turn (including its tool calls) may take. A team
+        member's turn that runs over is recorded as timed out and skipped; any other turn
+        raises `DeadlineExceededError`.
+    :param meeting_deadline: Seconds the whole meeting may take before it is abandoned
+        with `DeadlineExceededError`.
+    :param cancel_token: Token through which the meeting can be cancelled from another
+        thread (raising `OperationCancelledError`), even during an LLM or tool call.
+    :param dedup_storage: If True, save the transcript as references into the message
+        store shared by the meetings of `save_dir`, which keeps each distinct block of
+        text once (see `astro_virtual_lab.store`). No Markdown file is written.
+    :param on_event: Called with each event of the meeting (see `astro_virtual_lab.events`),
+        including the token deltas of the replies of models that support streaming.
+        Deltas may be delivered from a worker thread. An exception raised by the
+        callback aborts the meeting. `iter_meeting` wraps this in a generator.
+    :param fork_from: Name of a meeting saved in `save_dir` to branch from. Its first
+        `fork_turn` turns are replayed without any API call, and the meeting continues
+        from there with the arguments given here (see `astro_virtual_lab.fork`).
+    :param fork_turn: Number of turns of `fork_from` kept, required with `fork_from`.
     :return: The final summary of the meeting, if `return_summary` is True. Otherwise None.
     """
     # Basic checks
-    if meeting_type == "team":
-        if not team_lead or not team_members:
-            raise ValueError(
-                "For a 'team' meeting, you must specify a team_lead and team_members."
-            )
-        if team_member:
-            raise ValueError(
-                "For a 'team' meeting, do not provide an individual team_member."
-            )
-        if team_lead in team_members:
-            raise ValueError("team_lead must not appear in team_members.")
-    elif meeting_type == "individual":
-        if not team_member:
-            raise ValueError(
-                "For an 'individual' meeting, you must specify a single team_member."
-            )
-        if team_lead or team_members:
-            raise ValueError(
-                "For an 'individual' meeting, do not provide team_lead or team_members."
-            )
-    else:
-        raise ValueError(
-            f"Invalid meeting_type: {meeting_type}. Must be 'team' or 'individual'."
-        )
+    check_participants(meeting_type, team_lead, team_members, team_member)
+
+    # The prompt builders are memoized, so their arguments must be hashable
+    team_members = tuple(team_members) if team_members else team_members
+    agenda_questions = tuple(agenda_questions)
+    agenda_rules = tuple(agenda_rules)
+    summaries = tuple(summaries)
+    contexts = tuple(contexts)
 
     # Create the output directory if needed
     save_dir.mkdir(parents=True, exist_ok=True)
 
+    # Turns of the meeting this one branches from, replayed up to the fork point
+    replay = None
+    if fork_from is not None:
+        if fork_from == save_name:
+            raise ValueError("A forked meeting must be saved under a new save_name.")
+        if fork_turn is None:
+            raise ValueError("fork_turn is required with fork_from.")
+        source = load_meeting(save_dir, fork_from)
+        if not 0 <= fork_turn <= len(source):
+            raise ValueError(
+                f"fork_turn must be between 0 and {len(source)}, the number of turns "
+                f"of '{fork_from}'."
+            )
+        replay = _Replay(source[:fork_turn])
+
+    participants = (
+        (team_lead, *team_members) if meeting_type == "team" else (team_member,)
+    )
+
+    # Optionally pay the ADS latency up front instead of during the agents' turns.
+    # This also warms the ADS cache for tool calls made inside the meeting.
+    # A forked meeting replays its start prompt, contexts included.
+    if prefetch_literature and not (replay is not None and replay.active()):
+        queries = prefetch.extract_literature_queries(
+            agenda=agenda, agenda_questions=agenda_questions, agents=participants
+        )
+        literature_context = prefetch.prefetch_literature(queries)
+        if literature_context:
+            contexts = (*contexts, literature_context)
+
     # Prepare an in-memory discussion list
     # Format: [{"agent": "User" or agent.title, "message": "Text..."}]
     discussion: List[Dict[str, str]] = []
 
+    # Function to report the progress of the meeting
+    def emit(event: MeetingEvent) -> None:
+        if on_event is not None:
+            on_event(event)
+
     # Function to add a turn to the discussion
-    def add_turn(agent_label: str, message: str):
-        discussion.append({"agent": agent_label, "message": message.strip()})
+    def add_turn(agent_label: str, message: str, phase: Optional[MeetingPhase] = None):
+        turn = {"agent": agent_label, "message": message.strip()}
+        discussion.append(turn)
+        if on_turn is not None:
+            on_turn(turn)
+        emit(TurnCompleted(len(discussion) - 1, agent_label, turn["message"], phase))
+
+    # Searches for the next speaker overlap the current turn (see `prefetch_for` below)
+    prefetcher = (
+        prefetch.TurnPrefetcher() if pipeline and use_astronomy_tools else None
+    )
+
+    # Function to prompt the next speaker, with the literature found for it and its budget
+    budget = output_budget if output_budget is not None else OutputBudget.from_config()
+
+    def add_prompt(prompt: str, agent: Agent, phase: MeetingPhase) -> None:
+        if replay is not None and replay.active():
+            add_turn("User", replay.prompt())
+            return
+        literature = (
+            prefetcher.collect(agent, token=meeting_token, timeout=turn_timeout)
+            if prefetcher is not None
+            else ""
+        )
+        if literature:
+            prompt = f"{prompt}\n\n{literature}"
+        max_tokens = budget.max_tokens_for(phase, agent)
+        if max_tokens is not None:
+            prompt = f"{prompt}\n\n{output_length_prompt(max_tokens)}"
+        add_turn("User", prompt)
+
+    # Function to get an agent's reply from the model routed to this phase
+    router = routing if routing is not None else ModelRouter.from_config()
+
+    meeting_token = (
+        cancel_token.child(timeout=meeting_deadline, name="meeting")
+        if cancel_token is not None
+        else CancellationToken(timeout=meeting_deadline, name="meeting")
+    )
+
+    def get_reply(agent: Agent, phase: MeetingPhase) -> str:
+        if replay is not None and replay.active():
+            return replay.reply(agent)
+        primary, *fallbacks = router.models_for(phase, agent, default=model)
+        turn_token = meeting_token.child(timeout=turn_timeout, name=f"turn of {agent.title}")
+        try:
+            return _get_llm_response(
+                system_prompt=agent.prompt,
+                conversation=discussion,
+                temperature=temperature,
+                model=primary,
+                use_astronomy_tools=use_astronomy_tools,
+                tool_names=agent.tools,
+                cache=cache,
+                usage=usage,
+                fallback_models=tuple(fallbacks),
+                phase=phase,
+                batch=batch,
+                token=turn_token,
+                max_tokens=budget.max_tokens_for(phase, agent),
+                role=agent.title,
+                on_event=on_event,
+            )
+        except DeadlineExceededError as e:
+            # Skip a straggling member rather than holding up the whole meeting
+            if phase != "member" or e.token is not turn_token:
+                raise
+            if usage is not None:
+                usage.record_failure(primary, phase=phase)
+            return f"[No reply: this turn timed out after {turn_timeout:g} seconds.]"
+
+    # Function to search the literature for the next speaker during the current turn
+    def prefetch_for(agent: Agent) -> None:
+        if prefetcher is None or (replay is not None and replay.active()) or (
+            agent.tools is not None and "run_ads_search" not in agent.tools
+        ):
+            return
+        replies = [turn["message"] for turn in discussion if turn["agent"] != "User"]
+        prefetcher.start(agent, hint=replies[-1] if replies else agenda)
 
     ######################
     # Initialize the conversation with the meeting start prompt
     ######################
 
-    if meeting_type == "team":
-        # Build the system message for the team lead
-        system_prompt_lead = team_lead.prompt
-
-        # Build the user message describing the entire scenario
-        user_prompt = team_meeting_start_prompt(
-            team_lead=team_lead,
-            team_members=team_members,
-            agenda=agenda,
-            agenda_questions=agenda_questions,
-            agenda_rules=agenda_rules,
-            summaries=summaries,
-            contexts=contexts,
-            num_rounds=num_rounds,
+    emit(
+        MeetingStarted(
+            meeting_type=meeting_type,
+            save_name=save_name,
+            participants=tuple(agent.title for agent in participants),
+            num_rounds=num_rounds if meeting_type == "team" else 0,
         )
+    )
 
-        add_turn("User", user_prompt)
+    try:
+        if meeting_type == "team":
+            # Build the user message describing the entire scenario
+            user_prompt = team_meeting_start_prompt(
+                team_lead=team_lead,
+                team_members=team_members,
+                agenda=agenda,
+                agenda_questions=agenda_questions,
+                agenda_rules=agenda_rules,
+                summaries=summaries,
+                contexts=contexts,
+                num_rounds=num_rounds,
+            )
 
-        # Let the team lead respond
-        lead_response = _get_llm_response(
-            system_prompt=system_prompt_lead,
-            conversation=discussion,
-            temperature=temperature,
-            model=model,
-            use_astronomy_tools=use_astronomy_tools,
-        )
-        add_turn(team_lead.title, lead_response)
-
-        # Then begin the round-based discussion
-        for r in range(num_rounds):
-            round_num = r + 1
-            # Each team member responds
-            for member in team_members:
-                prompt = team_meeting_team_member_prompt(member, round_num, num_rounds)
-                add_turn("User", prompt)
-                member_response = _get_llm_response(
-                    system_prompt=member.prompt,
-                    conversation=discussion,
-                    temperature=temperature,
-                    model=model,
-                    use_astronomy_tools=use_astronomy_tools,
-                )
-                add_turn(member.title, member_response)
+            add_prompt(user_prompt, team_lead, "opening")
+
+            # Let the team lead respond
+            prefetch_for(team_members[0])
+            lead_response = get_reply(team_lead, "opening")
+            add_turn(team_lead.title, lead_response, "opening")
+
+            # Then begin the round-based discussion
+            previous_synthesis = lead_response
+            round_num = 0
+            for r in range(num_rounds):
+                round_num = r + 1
+                # Each team member responds
+                member_replies = []
+                for idx, member in enumerate(team_members):
+                    # An expert added in a forked meeting joins after the fork point
+                    if replay is not None and replay.joins_later(member):
+                        continue
+                    prompt = team_meeting_team_member_prompt(member, round_num, num_rounds)
+                    add_prompt(prompt, member, "member")
+                    next_speakers = team_members[idx + 1 :]
+                    prefetch_for(next_speakers[0] if next_speakers else team_lead)
+                    member_response = get_reply(member, "member")
+                    add_turn(member.title, member_response, "member")
+                    member_replies.append(member_response)
+
+                # The last round ends with the final summary below
+                if r == num_rounds - 1:
+                    emit(RoundCompleted(round_num, num_rounds))
+                    break
 
-            # Team lead synthesizes after each round
-            if r < num_rounds - 1:
                 # Intermediate synthesis
                 pi_prompt = team_meeting_team_lead_intermediate_prompt(
-                    team_lead, round_num, num_rounds
+                    team_lead, round_num, num_rounds, ask_consensus=early_exit
                 )
-            else:
-                # Final
-                pi_prompt = team_meeting_team_lead_final_prompt(
-                    team_lead=team_lead,
-                    agenda=agenda,
-                    agenda_questions=agenda_questions,
-                    agenda_rules=agenda_rules,
-                ).format(round_num, num_rounds)
-
-            add_turn("User", pi_prompt)
-            lead_synthesis = _get_llm_response(
-                system_prompt=system_prompt_lead,
-                conversation=discussion,
-                temperature=temperature,
-                model=model,
-                use_astronomy_tools=use_astronomy_tools,
+                add_prompt(pi_prompt, team_lead, "synthesis")
+                prefetch_for(team_members[0])
+                lead_synthesis = get_reply(team_lead, "synthesis")
+                add_turn(team_lead.title, lead_synthesis, "synthesis")
+                emit(RoundCompleted(round_num, num_rounds))
+
+                # Skip the remaining rounds once another round would not change the outcome
+                replaying = replay is not None and replay.active()
+                if early_exit and not replaying and check_consensus(
+                    previous_synthesis, lead_synthesis, member_replies, agenda_questions
+                ).converged:
+                    break
+                previous_synthesis = lead_synthesis
+
+            # Final summary
+            pi_prompt = team_meeting_team_lead_final_prompt(
+                team_lead=team_lead,
+                agenda=agenda,
+                agenda_questions=agenda_questions,
+                agenda_rules=agenda_rules,
+            ).format(round_num, num_rounds)
+            add_prompt(pi_prompt, team_lead, "summary")
+            lead_summary = get_reply(team_lead, "summary")
+            add_turn(team_lead.title, lead_summary, "summary")
+
+        else:
+            # individual meeting
+            # The user prompt
+            user_prompt = individual_meeting_start_prompt(
+                team_member=team_member,
+                agenda=agenda,
+                agenda_questions=agenda_questions,
+                agenda_rules=agenda_rules,
+                summaries=summaries,
+                contexts=contexts,
             )
-            add_turn(team_lead.title, lead_synthesis)
+            add_prompt(user_prompt, team_member, "opening")
 
-    else:
-        # individual meeting
-        # System message for the single agent
-        system_prompt_ind = team_member.prompt
-
-        # The user prompt
-        user_prompt = individual_meeting_start_prompt(
-            team_member=team_member,
-            agenda=agenda,
-            agenda_questions=agenda_questions,
-            agenda_rules=agenda_rules,
-            summaries=summaries,
-            contexts=contexts,
-        )
-        add_turn("User", user_prompt)
+            # The agent responds
+            agent_response = get_reply(team_member, "opening")
+            add_turn(team_member.title, agent_response, "opening")
 
-        # The agent responds
-        agent_response = _get_llm_response(
-            system_prompt=system_prompt_ind,
-            conversation=discussion,
-            temperature=temperature,
-            model=model,
-            use_astronomy_tools=use_astronomy_tools,
-        )
-        add_turn(team_member.title, agent_response)
+            # Then we might let a "Scientific Critic" chime in for X rounds, or
+            # keep it simple. For brevity, we won't do multiple rounds here unless
+            # you specifically want that logic. You can adapt similarly to the
+            # team approach if desired.
+    finally:
+        if prefetcher is not None:
+            prefetcher.close()
 
-        # Then we might let a "Scientific Critic" chime in for X rounds, or
-        # keep it simple. For brevity, we won't do multiple rounds here unless
-        # you specifically want that logic. You can adapt similarly to the
-        # team approach if desired.
+    if replay is not None and replay.active():
+        raise ValueError(
+            f"Turn {fork_turn} of '{fork_from}' is past the end of this meeting."
+        )
 
     # Save the entire discussion
-    save_meeting(save_dir=save_dir, save_name=save_name, discussion=discussion)
+    save_meeting(
+        save_dir=save_dir,
+        save_name=save_name,
+        discussion=discussion,
+        dedup=dedup_storage,
+        fork_of=fork_from,
+        fork_turn=fork_turn or 0,
+    )
+
+    emit(MeetingSummary(get_summary(discussion)))
 
     # Return summary if requested
     if return_summary:
@@ -249,6 +490,41 @@ def run_meeting(
     return None
 
 
+class _Replay:
+    """Turns of a saved meeting replayed, in order, in place of new ones."""
+
+    def __init__(self, turns: Sequence[Dict[str, str]]) -> None:
+        self.turns = list(turns)
+        self.position = 0
+        self.speakers = {turn["agent"] for turn in self.turns if turn["agent"] != "User"}
+
+    def active(self) -> bool:
+        """Return True until every turn has been replayed."""
+        return self.position < len(self.turns)
+
+    def joins_later(self, agent: Agent) -> bool:
+        """Return True while replaying turns in which `agent` never speaks."""
+        return self.active() and agent.title not in self.speakers
+
+    def _next(self, speaker: str) -> str:
+        turn = self.turns[self.position]
+        if turn["agent"] != speaker:
+            raise ValueError(
+                f"Turn {self.position} of the forked meeting is by {turn['agent']}, "
+                f"but this meeting has {speaker} speak there."
+            )
+        self.position += 1
+        return turn["message"]
+
+    def prompt(self) -> str:
+        """Return the next replayed prompt."""
+        return self._next("User")
+
+    def reply(self, agent: Agent) -> str:
+        """Return the next replayed reply, which must be by `agent`."""
+        return self._next(agent.title)
+
+
 ###############################################################################
 # Internal function to get a response from the LLM
 ###############################################################################
@@ -260,12 +536,23 @@ def _get_llm_response(
     temperature: float,
     model: str,
     use_astronomy_tools: bool,
+    tool_names: Optional[tuple[str, ...]] = None,
+    cache: Optional[CompletionCache] = None,
+    usage: Optional[UsageTracker] = None,
+    fallback_models: tuple[str, ...] = (),
+    phase: Optional[MeetingPhase] = None,
+    batch: Optional[BatchBroker] = None,
+    token: Optional[CancellationToken] = None,
+    max_tokens: Optional[int] = None,
+    role: Optional[str] = None,
+    on_event: Optional[Callable[[MeetingEvent], None]] = None,
 ) -> str:
     """
     Queries the OpenAI ChatCompletion API with the given system prompt + conversation.
 
     If use_astronomy_tools is True, the function can handle ADS or SIMBAD tool calls
     by intercepting function calls from the model. Otherwise, it runs purely in text mode.
+    If the model is overloaded or unreachable, the fallback models are tried in order.
 
     Args:
         system_prompt: The system prompt for the agent.
@@ -273,25 +560,174 @@ def _get_llm_response(
         temperature: The sampling temperature.
         model: The OpenAI model name to use.
         use_astronomy_tools: If True, handle ADS and SIMBAD tool usage.
+        tool_names: Registered tools offered to the agent (None offers all of them).
+        cache: Completion cache consulted before, and filled after, the API call.
+        usage: Tracker recording the tokens of every API call of the turn.
+        fallback_models: Models tried in order when `model` is overloaded.
+        phase: Meeting phase of the turn, used to break down the usage report.
+        batch: Broker sending the API calls as Batch API jobs instead of synchronously.
+        token: Cancellation token and deadline of the turn, applied to the API and tool calls.
+        max_tokens: Completion token budget of each API call (None is uncapped).
+        role: Title of the replying agent, used to report reply lengths per role.
+        on_event: Receives the token deltas and tool calls of the reply, attributed to
+            `role`. The reply is streamed if the model supports it.
 
     Returns:
         str: LLM's answer as text.
+
+    Raises:
+        BudgetExceededError: If `usage` has a budget and it is already spent.
+        DeadlineExceededError: If `token` expires before the reply is complete.
+        OperationCancelledError: If `token` is cancelled before the reply is complete.
     """
-    # Initialize client based on model type
-    client = init_openai_client("deepseek" if model.startswith("deepseek-") else "openai")
-    
+    if token is not None:
+        token.raise_if_cancelled()
+
+    if cache is not None:
+        # Keyed by the routed model, so a reply served by a fallback is replayed too
+        cache_key = cache.make_key(
+            model,
+            temperature,
+            system_prompt,
+            conversation,
+            tool_names if use_astronomy_tools else (),
+            max_tokens=max_tokens,
+        )
+        cached = cache.get(cache_key)
+        if cached is not None:
+            if usage is not None:
+                usage.record_cache_hit(model, phase=phase)
+            return cached
+
+    if usage is not None:
+        usage.check_budget()
+
+    candidates = (model, *fallback_models)
+    for idx, candidate in enumerate(candidates):
+        try:
+            content = _request_completion(
+                system_prompt=system_prompt,
+                conversation=conversation,
+                temperature=temperature,
+                model=candidate,
+                use_astronomy_tools=use_astronomy_tools,
+                tool_names=tool_names,
+                usage=usage,
+                phase=phase,
+                batch=batch,
+                token=token,
+                max_tokens=max_tokens,
+                role=role,
+                on_event=on_event,
+            )
+            break
+        except Exception as e:
+            if idx == len(candidates) - 1 or not is_overload_error(e):
+                raise
+            if usage is not None:
+                usage.record_failure(candidate, phase=phase)
+
+    if cache is not None:
+        cache.put(cache_key, content, model=candidate)
+    return content
+
+
+def _request_completion(
+    system_prompt: str,
+    conversation: List[Dict[str, str]],
+    temperature: float,
+    model: str,
+    use_astronomy_tools: bool,
+    tool_names: Optional[tuple[str, ...]],
+    usage: Optional[UsageTracker],
+    phase: Optional[MeetingPhase],
+    batch: Optional[BatchBroker] = None,
+    token: Optional[CancellationToken] = None,
+    max_tokens: Optional[int] = None,
+    role: Optional[str] = None,
+    on_event: Optional[Callable[[MeetingEvent], None]] = None,
+) -> str:
+    """Run one turn (including its tool calls) on a single model; see `_get_llm_response`."""
+    provider = get_provider(model)
+    capabilities = provider.capabilities_for(model)
+    # Models that count their reasoning in max_tokens only get the prompt hint
+    limits = (
+        {"max_tokens": max_tokens}
+        if max_tokens is not None and capabilities.max_tokens
+        else {}
+    )
+    output_tokens = 0
+    speaker = role or model
+    # Batched requests are answered all at once, so only direct calls are streamed
+    stream = on_event is not None and capabilities.streaming and batch is None
+
+    def on_delta(text: str) -> None:
+        on_event(TokenDelta(speaker, text))
+
+    def call_api(kwargs):
+        if batch is not None:
+            return batch.complete(kwargs)
+        # Let the HTTP request itself give up at the deadline of the turn
+        remaining = token.remaining() if token is not None else None
+        options = {"timeout": remaining} if remaining is not None else {}
+        # Waits for the rate limit shared with other workers, if one is installed
+        throttle(provider.name)
+        # The client is only needed when the call is not replayed from a cassette
+        with provider.limit():
+            client = init_openai_client(provider.name)
+            if not stream:
+                return client.chat.completions.create(**kwargs, **options)
+            chunks = client.chat.completions.create(
+                **kwargs,
+                **options,
+                stream=True,
+                stream_options={"include_usage": True},
+            )
+            return _collect_stream(chunks, on_delta, token)
+
+    def create(**kwargs):
+        """Call the API, recording the tokens and latency of the call."""
+        nonlocal output_tokens
+        start = time.perf_counter()
+        called = False
+
+        def perform():
+            nonlocal called
+            called = True
+            return token.run(call_api, kwargs) if token is not None else call_api(kwargs)
+
+        response = through_cassette(
+            "llm",
+            kwargs,
+            perform,
+            encode=lambda completion: completion.model_dump(mode="json"),
+            decode=ChatCompletion.model_validate,
+        )
+        # A completion replayed from a cassette arrives whole; stream it as one delta
+        if stream and not called and response.choices:
+            content = response.choices[0].message.content
+            if content:
+                on_delta(content)
+        if usage is not None:
+            usage.record_response(
+                model, response, latency=time.perf_counter() - start, phase=phase
+            )
+        if response.usage is not None:
+            output_tokens += response.usage.completion_tokens or 0
+        return response
+
     messages = [{"role": "system", "content": system_prompt}]
 
-    # For DeepSeek Reasoner, we need to ensure messages alternate between user/assistant
-    if model == "deepseek-reasoner":
+    # Some models (e.g. DeepSeek Reasoner) need messages alternating between user/assistant
+    if capabilities.alternate_roles:
         # Combine consecutive messages from the same role
         combined_messages = []
         current_role = None
         current_content = []
         
         for msg in conversation:
-            role = "assistant" if msg["agent"] == "Assistant" else "user"
-            if role == current_role:
+            msg_role = "assistant" if msg["agent"] == "Assistant" else "user"
+            if msg_role == current_role:
                 current_content.append(msg["message"])
             else:
                 if current_role is not None:
@@ -299,7 +735,7 @@ def _get_llm_response(
                         "role": current_role,
                         "content": "\n".join(current_content)
                     })
-                current_role = role
+                current_role = msg_role
                 current_content = [msg["message"]]
         
         if current_content:
@@ -318,25 +754,129 @@ def _get_llm_response(
             })
 
     # Some models like deepseek-reasoner don't support function calling
-    supports_functions = not model == "deepseek-reasoner"
+    supports_functions = capabilities.tools
     
     # Only add functions if the model supports them and astronomy tools are enabled
-    if use_astronomy_tools and supports_functions:
-        response = client.chat.completions.create(
+    if use_astronomy_tools and supports_functions and tool_names != ():
+        response = create(
             model=model,
             messages=messages,
             temperature=temperature,
-            functions=get_astronomy_tool_functions(),
+            functions=get_astronomy_tool_functions(tool_names),
             function_call="auto",
+            **limits,
         )
+
+        # Run requested tools and feed their results back until the model answers
+        message = response.choices[0].message
+        num_tool_calls = 0
+        while message.function_call is not None and num_tool_calls < MAX_TOOL_CALLS_PER_TURN:
+            function_call = message.function_call
+            messages.append({
+                "role": "assistant",
+                "content": message.content,
+                "function_call": {
+                    "name": function_call.name,
+                    "arguments": function_call.arguments,
+                },
+            })
+            result = run_tool(
+                function_call.name,
+                function_call.arguments,
+                allowed=tool_names,
+                token=token,
+            )
+            messages.append({
+                "role": "function",
+                "name": function_call.name,
+                "content": result,
+            })
+            num_tool_calls += 1
+            if on_event is not None:
+                on_event(
+                    ToolCalled(speaker, function_call.name, function_call.arguments, result)
+                )
+
+            response = create(
+                model=model,
+                messages=messages,
+                temperature=temperature,
+                functions=get_astronomy_tool_functions(tool_names),
+                # Force a text answer once the tool call budget is spent
+                function_call="auto" if num_tool_calls < MAX_TOOL_CALLS_PER_TURN else "none",
+                **limits,
+            )
+            message = response.choices[0].message
     else:
-        response = client.chat.completions.create(
+        response = create(
             model=model,
             messages=messages,
             temperature=temperature,
+            **limits,
+        )
+
+    # A reply that ran into its budget was cut off mid-sentence
+    if usage is not None and role is not None:
+        usage.record_turn(
+            role, output_tokens, truncated=response.choices[0].finish_reason == "length"
         )
+    return response.choices[0].message.content or ""
 
-    return response.choices[0].message.content
+
+def _collect_stream(
+    chunks: Iterable[ChatCompletionChunk],
+    on_delta: Callable[[str], None],
+    token: Optional[CancellationToken] = None,
+) -> ChatCompletion:
+    """
+    Assemble a streamed completion, passing on each fragment of its text as it arrives.
+
+    Args:
+        chunks: Chunks of a completion requested with `stream=True` (and usage included).
+        on_delta: Called with each non-empty fragment of the reply's text.
+        token: Cancellation token of the turn; the stream is dropped once it is cancelled.
+
+    Returns:
+        ChatCompletion: The completion the same request would have returned unstreamed.
+    """
+    first = None
+    content: List[str] = []
+    name: List[str] = []
+    arguments: List[str] = []
+    finish_reason = "stop"
+    usage = None
+    for chunk in chunks:
+        if token is not None:
+            token.raise_if_cancelled()
+        first = first or chunk
+        if chunk.usage is not None:
+            usage = chunk.usage.model_dump()
+        for choice in chunk.choices:
+            delta = choice.delta
+            if delta.content:
+                content.append(delta.content)
+                on_delta(delta.content)
+            if delta.function_call is not None:
+                name.append(delta.function_call.name or "")
+                arguments.append(delta.function_call.arguments or "")
+            if choice.finish_reason is not None:
+                finish_reason = choice.finish_reason
+    if first is None:
+        raise RuntimeError("The streamed completion ended without any chunk.")
+
+    message = {"role": "assistant", "content": "".join(content) if content else None}
+    if name:
+        message["function_call"] = {"name": "".join(name), "arguments": "".join(arguments)}
+    return ChatCompletion.model_validate(
+        {
+            "id": first.id,
+            "object": "chat.completion",
+            "created": first.created,
+            "model": first.model,
+            "choices": [{"index": 0, "message": message, "finish_reason": finish_reason}],
+            "usage": usage,
+        }
+    )
 
 
 ###############################################################################
@@ -344,26 +884,13 @@ def _get_llm_response(
 ###############################################################################
 
 
-def get_astronomy_tool_functions() -> List[Dict]:
-    """Get the function definitions for astronomy tools."""
-    return [
-        {
-            "name": "run_ads_search",
-            "description": "Search NASA ADS for papers matching a query",
-            "parameters": {
-                "type": "object",
-                "properties": {
-                    "query": {
-                        "type": "string",
-                        "description": "The search query"
-                    },
-                    "num_articles": {
-                        "type": "integer",
-                        "description": "Maximum number of papers to return",
-                        "default": 3
-                    }
-                },
-                "required": ["query"]
-            }
-        }
-    ]
+def get_astronomy_tool_functions(
+    tool_names: Optional[tuple[str, ...]] = None,
+) -> List[Dict]:
+    """
+    Get the function definitions for astronomy tools.
+
+    :param tool_names: Names of the allowed tools (None offers every registered tool).
+    :return: Function schemas generated once by the tool registry.
+    """
+    return get_tool_schemas(tool_names)
@@ -0,0 +1,527 @@
+"""
+Long-running meeting service for astro_virtual_lab.
+
+The service keeps one warm process: the scientific stack is imported once, the LLM
+and HTTP clients, the completion cache and the usage tracker are shared, and a pool
+of worker threads executes meetings taken from a persistent `JobQueue`. Specs are
+submitted over HTTP, on a TCP port or a Unix socket, using only the standard library.
+
+Endpoints (all bodies are JSON; specs use the same keys as the CLI's YAML specs):
+
+    GET    /health                     Service status and usage so far
+    GET    /jobs?status=queued         Most recent jobs
+    POST   /jobs                       Submit a meeting spec -> {"id": ...}
+    GET    /jobs/<id>                  Status of a job
+    GET    /jobs/<id>/turns?after=N    Turns completed so far
+    GET    /jobs/<id>/stream?after=N   Turns as NDJSON, streamed as they complete
+    POST   /jobs/<id>/cancel           Cancel a job (DELETE /jobs/<id> also works);
+                                       a running job stops even in the middle of a turn
+
+To spread meetings over several nodes, put the queue on a shared disk: the service
+(or `astro-virtual-lab enqueue`) acts as coordinator, and `astro-virtual-lab worker`
+runs meetings on each node. Distributed workers claim jobs with leases renewed by
+heartbeat, write transcripts to a shared archive directory, and share the rate
+limits of the `rate_limits` section of config.yml (requests per minute by service):
+
+    rate_limits:
+      openai: 500
+      deepseek: 300
+      ads: 60
+
+Example:
+    astro-virtual-lab serve --db jobs.sqlite --workers 4 --cache-dir .avl_cache
+    curl -X POST localhost:8765/jobs -d @spec.json
+    curl -N localhost:8765/jobs/<id>/stream
+
+    astro-virtual-lab enqueue specs/ --db /shared/jobs.sqlite          # coordinator
+    astro-virtual-lab worker --db /shared/jobs.sqlite --archive-dir /shared/outputs
+"""
+
+import json
+import os
+import socket
+import socketserver
+import sys
+import threading
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path, PurePath
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urlparse
+
+import httpx
+import requests
+
+from astro_virtual_lab.cache import CompletionCache
+from astro_virtual_lab.concurrency import (
+    CancellationToken,
+    DeadlineExceededError,
+    OperationCancelledError,
+    set_rate_limiter,
+)
+from astro_virtual_lab.config import get_setting
+from astro_virtual_lab.constants import JOB_LEASE_SECONDS, JOB_MAX_ATTEMPTS
+from astro_virtual_lab.jobs import (
+    TERMINAL_STATUSES,
+    JobCancelledError,
+    JobQueue,
+    SharedRateLimiter,
+)
+from astro_virtual_lab.routing import is_overload_error
+from astro_virtual_lab.run_meeting import run_meeting
+from astro_virtual_lab.specs import meeting_kwargs
+from astro_virtual_lab.usage import UsageTracker
+
+# Seconds between checks for new turns while streaming or idle
+POLL_INTERVAL = 1.0
+
+
+###############################################################################
+# Worker pool
+###############################################################################
+
+
+def is_transient_error(error: Exception) -> bool:
+    """
+    Return True if a failed job may succeed on another attempt.
+
+    Network failures and overloaded providers are transient. Errors such as an
+    exhausted budget, an invalid spec or a meeting past its deadline are not.
+    """
+    if isinstance(error, DeadlineExceededError):
+        return False
+    return is_overload_error(error) or isinstance(
+        error,
+        (
+            ConnectionError,
+            TimeoutError,
+            httpx.TransportError,
+            requests.ConnectionError,
+            requests.Timeout,
+        ),
+    )
+
+
+class MeetingService:
+    """Worker threads that execute the meetings of a job queue."""
+
+    def __init__(
+        self,
+        queue: JobQueue,
+        workers: int = 4,
+        cache: Optional[CompletionCache] = None,
+        usage: Optional[UsageTracker] = None,
+        lease: Optional[float] = None,
+        worker_id: Optional[str] = None,
+        archive_dir: Optional[Path] = None,
+        max_attempts: int = JOB_MAX_ATTEMPTS,
+    ) -> None:
+        """
+        :param queue: Queue to take jobs from.
+        :param workers: Number of meetings run at the same time.
+        :param cache: Completion cache shared by all meetings.
+        :param usage: Usage tracker (and budget) shared by all meetings.
+        :param lease: For a queue shared with other nodes, seconds a job is held
+            without a heartbeat. Jobs that fail with a transient error (see
+            `is_transient_error`) are then retried, up to `max_attempts`.
+        :param worker_id: Identity of this process in the queue (default "host:pid").
+        :param archive_dir: Directory under which meetings with a relative `save_dir`
+            are saved (e.g. a shared archive); by default the working directory.
+        :param max_attempts: Number of attempts after which a failed job is final.
+        """
+        self.queue = queue
+        self.workers = workers
+        self.cache = cache
+        self.usage = usage if usage is not None else UsageTracker()
+        self.lease = lease
+        self.worker_id = worker_id or f"{socket.gethostname()}:{os.getpid()}"
+        self.archive_dir = archive_dir
+        self.max_attempts = max_attempts
+        self._stopped = threading.Event()
+        self._threads: List[threading.Thread] = []
+        # Cancellation tokens of the jobs running in this process
+        self._tokens: Dict[str, CancellationToken] = {}
+        self._tokens_lock = threading.Lock()
+
+    def start(self) -> None:
+        """Requeue interrupted jobs and start the worker threads."""
+        if self.lease is None:
+            self.queue.requeue_interrupted()
+        else:
+            # Other nodes' running jobs are only requeued once their leases expire
+            thread = threading.Thread(
+                target=self._heartbeat, name="meeting-heartbeat", daemon=True
+            )
+            thread.start()
+            self._threads.append(thread)
+        for idx in range(self.workers):
+            thread = threading.Thread(
+                target=self._work, name=f"meeting-worker-{idx}", daemon=True
+            )
+            thread.start()
+            self._threads.append(thread)
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        """Stop taking new jobs and wait for the running meetings to finish."""
+        self._stopped.set()
+        for thread in self._threads:
+            thread.join(timeout)
+
+    def _work(self) -> None:
+        while not self._stopped.is_set():
+            claimed = (
+                self.queue.claim()
+                if self.lease is None
+                else self.queue.claim(worker=self.worker_id, lease=self.lease)
+            )
+            if claimed is None:
+                self.queue.wait(POLL_INTERVAL)
+                continue
+            self.run_job(*claimed)
+
+    def _heartbeat(self) -> None:
+        """Renew the leases of the running jobs; stop those cancelled or taken over."""
+        while not self._stopped.wait(self.lease / 3):
+            with self._tokens_lock:
+                running = list(self._tokens.items())
+            for job_id, token in running:
+                try:
+                    state = self.queue.heartbeat(job_id, self.worker_id, self.lease)
+                except Exception as e:
+                    # E.g. a locked or briefly unreachable shared queue: retry next beat,
+                    # since a dead heartbeat thread would let every lease expire
+                    print(
+                        f"[Heartbeat] Could not renew the lease of job {job_id}: {e!r}",
+                        file=sys.stderr,
+                    )
+                    continue
+                if state == "cancel":
+                    token.cancel()
+                elif state == "lost":
+                    token.cancel("taken over by another worker after its lease expired")
+
+    def cancel_running(self, job_id: str) -> bool:
+        """
+        Interrupt a job running in this process, even in the middle of a turn.
+
+        :return: True if the job was running here.
+        """
+        with self._tokens_lock:
+            token = self._tokens.get(job_id)
+        if token is None:
+            return False
+        token.cancel()
+        return True
+
+    def run_job(self, job_id: str, spec: Dict[str, Any]) -> None:
+        """Run one claimed job and record its outcome in the queue."""
+        token = CancellationToken(name="job")
+        with self._tokens_lock:
+            self._tokens[job_id] = token
+        # Only a worker holding a lease must prove ownership of the job
+        worker = self.worker_id if self.lease is not None else None
+        try:
+            kwargs = meeting_kwargs(spec, default_save_name=job_id)
+            if self.archive_dir is not None and not kwargs["save_dir"].is_absolute():
+                kwargs["save_dir"] = self.archive_dir / kwargs["save_dir"]
+            summary = run_meeting(
+                **kwargs,
+                return_summary=True,
+                cache=self.cache,
+                usage=self.usage,
+                on_turn=lambda turn: self.queue.add_turn(job_id, turn, worker=worker),
+                cancel_token=token,
+            )
+        except (JobCancelledError, OperationCancelledError):
+            self.queue.finish(job_id, "cancelled", worker=worker)
+        except Exception as e:
+            # A retry only helps against transient trouble; others would fail (or
+            # spend) again
+            if worker is None or not is_transient_error(e):
+                self.queue.finish(job_id, "failed", error=repr(e), worker=worker)
+            else:
+                self.queue.release(job_id, worker, repr(e), max_attempts=self.max_attempts)
+        else:
+            self.queue.finish(job_id, "done", summary=summary, worker=worker)
+        finally:
+            with self._tokens_lock:
+                self._tokens.pop(job_id, None)
+
+
+###############################################################################
+# HTTP interface
+###############################################################################
+
+
+def check_spec_paths(spec: Dict[str, Any]) -> None:
+    """
+    Check that a spec from an HTTP client only writes under the service's save root.
+
+    `save_dir` must be a relative path without "..", and `save_name` and `fork_from`
+    plain file names, so a client cannot read or write files elsewhere (absolute paths
+    would also bypass `archive_dir`).
+
+    :raises ValueError: If the spec names a path outside of the save root.
+    """
+    save_dir = PurePath(str(spec.get("save_dir", "meeting_outputs")))
+    if save_dir.is_absolute() or save_dir.anchor or ".." in save_dir.parts:
+        raise ValueError(f"save_dir must be a relative path without '..': {save_dir}")
+    for key in ("save_name", "fork_from"):
+        name = spec.get(key)
+        if name is not None and (
+            not isinstance(name, str)
+            or name in ("", ".", "..")
+            or "/" in name
+            or "\\" in name
+        ):
+            raise ValueError(f"{key} must be a plain file name: {name!r}")
+
+
+class MeetingRequestHandler(BaseHTTPRequestHandler):
+    """Routes the HTTP endpoints to the service's queue."""
+
+    server_version = "AstroVirtualLab"
+    protocol_version = "HTTP/1.1"
+    service: MeetingService  # set on the handler class by `make_server`
+
+    def address_string(self) -> str:
+        # Unix socket clients have no (host, port) address
+        return self.client_address[0] if self.client_address else "unix"
+
+    def _route(self) -> Tuple[List[str], Dict[str, List[str]]]:
+        url = urlparse(self.path)
+        return [part for part in url.path.split("/") if part], parse_qs(url.query)
+
+    def _send_json(self, status: HTTPStatus, payload: Any) -> None:
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _send_error(self, status: HTTPStatus, message: str) -> None:
+        self._send_json(status, {"error": message})
+
+    def _send_chunk(self, payload: Dict[str, Any]) -> None:
+        data = (json.dumps(payload) + "\n").encode("utf-8")
+        self.wfile.write(f"{len(data):X}\r\n".encode("ascii") + data + b"\r\n")
+        self.wfile.flush()
+
+    def do_GET(self) -> None:
+        parts, query = self._route()
+        queue = self.service.queue
+
+        if parts == ["health"]:
+            self._send_json(HTTPStatus.OK, {"status": "ok", "usage": self.service.usage.to_dict()})
+        elif parts == ["jobs"]:
+            status = query.get("status", [None])[0]
+            self._send_json(HTTPStatus.OK, queue.list(status=status))
+        elif len(parts) >= 2 and parts[0] == "jobs":
+            job = queue.get(parts[1])
+            if job is None:
+                self._send_error(HTTPStatus.NOT_FOUND, f"Unknown job {parts[1]}")
+            elif len(parts) == 2:
+                self._send_json(HTTPStatus.OK, job)
+            elif parts[2:] in (["turns"], ["stream"]):
+                try:
+                    after = int(query.get("after", ["0"])[0])
+                except ValueError:
+                    self._send_error(HTTPStatus.BAD_REQUEST, "after must be an integer")
+                    return
+                if parts[2] == "turns":
+                    self._send_json(HTTPStatus.OK, queue.turns(parts[1], after=after))
+                else:
+                    self._stream(parts[1], after=after)
+            else:
+                self._send_error(HTTPStatus.NOT_FOUND, f"Unknown path {self.path}")
+        else:
+            self._send_error(HTTPStatus.NOT_FOUND, f"Unknown path {self.path}")
+
+    def do_POST(self) -> None:
+        parts, _ = self._route()
+        if parts == ["jobs"]:
+            self._submit()
+        elif len(parts) == 3 and parts[0] == "jobs" and parts[2] == "cancel":
+            self._cancel(parts[1])
+        else:
+            self._send_error(HTTPStatus.NOT_FOUND, f"Unknown path {self.path}")
+
+    def do_DELETE(self) -> None:
+        parts, _ = self._route()
+        if len(parts) == 2 and parts[0] == "jobs":
+            self._cancel(parts[1])
+        else:
+            self._send_error(HTTPStatus.NOT_FOUND, f"Unknown path {self.path}")
+
+    def _submit(self) -> None:
+        length = int(self.headers.get("Content-Length", 0))
+        try:
+            spec = json.loads(self.rfile.read(length) or b"{}")
+            # Reject invalid specs now rather than when a worker picks them up
+            meeting_kwargs(spec, default_save_name="validation")
+            check_spec_paths(spec)
+        except (ValueError, TypeError) as e:
+            self._send_error(HTTPStatus.BAD_REQUEST, str(e))
+            return
+        job_id = self.service.queue.submit(spec)
+        self._send_json(HTTPStatus.CREATED, {"id": job_id})
+
+    def _cancel(self, job_id: str) -> None:
+        status = self.service.queue.cancel(job_id)
+        if status == "running":
+            self.service.cancel_running(job_id)
+        if status is None:
+            self._send_error(HTTPStatus.NOT_FOUND, f"Unknown job {job_id}")
+        else:
+            self._send_json(HTTPStatus.OK, {"id": job_id, "status": status})
+
+    def _stream(self, job_id: str, after: int) -> None:
+        """Send turns as NDJSON chunks until the job ends, then its final status."""
+        queue = self.service.queue
+        self.send_response(HTTPStatus.OK)
+        self.send_header("Content-Type", "application/x-ndjson")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+
+        while True:
+            # Read the status before the turns so no turn added at the end is missed
+            job = queue.get(job_id)
+            for turn in queue.turns(job_id, after=after):
+                self._send_chunk(turn)
+                after = turn["index"] + 1
+            if job["status"] in TERMINAL_STATUSES:
+                self._send_chunk({"id": job_id, "status": job["status"], "error": job["error"]})
+                break
+            queue.wait(POLL_INTERVAL)
+
+        self.wfile.write(b"0\r\n\r\n")
+
+
+class ThreadingUnixHTTPServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    """HTTP server listening on a Unix socket, one thread per connection."""
+
+    daemon_threads = True
+
+
+def make_server(
+    service: MeetingService,
+    host: str = "127.0.0.1",
+    port: int = 8765,
+    socket_path: Optional[Path] = None,
+) -> socketserver.BaseServer:
+    """
+    Create the HTTP server of a meeting service (call `serve_forever` to run it).
+
+    :param service: Service whose queue the endpoints operate on.
+    :param host: Interface to listen on.
+    :param port: TCP port to listen on.
+    :param socket_path: Listen on this Unix socket instead of TCP.
+    :return: The server.
+    """
+    handler = type("Handler", (MeetingRequestHandler,), {"service": service})
+    if socket_path is not None:
+        if socket_path.exists():
+            os.unlink(socket_path)
+        return ThreadingUnixHTTPServer(str(socket_path), handler)
+    return ThreadingHTTPServer((host, port), handler)
+
+
+def serve(
+    db_path: Path,
+    host: str = "127.0.0.1",
+    port: int = 8765,
+    socket_path: Optional[Path] = None,
+    workers: int = 4,
+    cache_dir: Optional[Path] = None,
+    budget: Optional[float] = None,
+    shared: bool = False,
+    archive_dir: Optional[Path] = None,
+) -> None:
+    """
+    Run the meeting service until interrupted.
+
+    :param db_path: SQLite file of the job queue.
+    :param host: Interface to listen on.
+    :param port: TCP port to listen on.
+    :param socket_path: Listen on this Unix socket instead of TCP.
+    :param workers: Number of meetings run at the same time.
+    :param cache_dir: Directory of the completion cache shared by all meetings.
+    :param budget: Maximum spend in USD for the lifetime of the service.
+    :param shared: If True, the queue is shared with workers on other nodes.
+    :param archive_dir: Directory under which meetings with a relative `save_dir`
+        are saved.
+    """
+    queue = JobQueue(db_path, shared=shared)
+    if shared:
+        set_rate_limiter(shared_rate_limiter(db_path))
+    service = MeetingService(
+        queue,
+        workers=workers,
+        cache=CompletionCache(cache_dir) if cache_dir is not None else None,
+        usage=UsageTracker(budget=budget),
+        lease=JOB_LEASE_SECONDS if shared else None,
+        archive_dir=archive_dir,
+    )
+    server = make_server(service, host=host, port=port, socket_path=socket_path)
+    service.start()
+    print(f"Serving meetings on {socket_path or f'http://{host}:{port}'} with {workers} workers")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        service.stop(timeout=0)
+
+
+###############################################################################
+# Distributed workers
+###############################################################################
+
+
+def shared_rate_limiter(db_path: Path) -> SharedRateLimiter:
+    """Build the rate limiter of the `rate_limits` section of config.yml on `db_path`."""
+    return SharedRateLimiter(db_path, get_setting("rate_limits", default={}) or {})
+
+
+def run_worker(
+    db_path: Path,
+    workers: int = 4,
+    lease: float = JOB_LEASE_SECONDS,
+    cache_dir: Optional[Path] = None,
+    budget: Optional[float] = None,
+    archive_dir: Optional[Path] = None,
+    max_attempts: int = JOB_MAX_ATTEMPTS,
+) -> None:
+    """
+    Run meetings from a queue shared with other nodes until interrupted.
+
+    :param db_path: SQLite file of the shared job queue.
+    :param workers: Number of meetings run at the same time on this node.
+    :param lease: Seconds a job is held without a heartbeat before it is requeued.
+    :param cache_dir: Directory of the completion cache (may be shared as well).
+    :param budget: Maximum spend in USD for the lifetime of this worker.
+    :param archive_dir: Directory under which meetings with a relative `save_dir`
+        are saved (e.g. a shared archive).
+    :param max_attempts: Number of attempts after which a failed job is final.
+    """
+    set_rate_limiter(shared_rate_limiter(db_path))
+    service = MeetingService(
+        JobQueue(db_path, shared=True),
+        workers=workers,
+        cache=CompletionCache(cache_dir) if cache_dir is not None else None,
+        usage=UsageTracker(budget=budget),
+        lease=lease,
+        archive_dir=archive_dir,
+        max_attempts=max_attempts,
+    )
+    service.start()
+    print(f"Worker {service.worker_id} running {workers} meetings at a time from {db_path}")
+    try:
+        while True:
+            service.queue.wait(POLL_INTERVAL)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        service.stop(timeout=0)
@@ -0,0 +1,201 @@
+"""
+Meeting specs: declarative descriptions of meetings, as used by the CLI and the server.
+
+A spec is a mapping whose keys are the keyword arguments of `run_meeting`. Agents are
+referenced by the name of a built-in agent in `astro_virtual_lab.prompts` (e.g.
+PRINCIPAL_INVESTIGATOR) or by its title, or defined inline as a mapping with title,
+expertise, goal, role and optional tools. A YAML spec file holds either a single
+meeting or a `meetings` list, with optional `defaults` shared by all of its meetings:
+
+    defaults:
+      model: gpt-4o
+      save_dir: meeting_outputs
+      num_rounds: 2
+    meetings:
+      - save_name: thick_disk
+        meeting_type: team
+        team_lead: PRINCIPAL_INVESTIGATOR
+        team_members: [GALACTIC_EVOLUTION_EXPERT, STELLAR_EVOLUTION_EXPERT]
+        agenda: Study the chemical evolution of the Galactic thick disk.
+        agenda_questions:
+          - How do alpha-element abundances vary with metallicity?
+        routing:
+          phases: {member: gpt-4o-mini}
+          fallbacks: {gpt-4o: [gpt-4o-mini]}
+        output_budget:
+          phases: {member: 400}
+"""
+
+import inspect
+from pathlib import Path
+from typing import Any, Dict, List, Union
+
+import yaml
+
+from astro_virtual_lab import prompts
+from astro_virtual_lab.agent import Agent
+from astro_virtual_lab.routing import ModelRouter, OutputBudget
+from astro_virtual_lab.run_meeting import check_participants, run_meeting
+
+# run_meeting arguments that hold agents, and those that hold tuples of strings
+_AGENT_KEYS = ("team_lead", "team_member")
+_TUPLE_KEYS = ("agenda_questions", "agenda_rules", "summaries", "contexts")
+_SPEC_KEYS = frozenset(inspect.signature(run_meeting).parameters) - {
+    "cache",
+    "usage",
+    "return_summary",
+    "on_turn",
+    "batch",
+    "cancel_token",
+    "on_event",
+}
+# run_meeting arguments without a default, other than those filled in by meeting_kwargs
+_REQUIRED_KEYS = frozenset(
+    name
+    for name, parameter in inspect.signature(run_meeting).parameters.items()
+    if parameter.default is inspect.Parameter.empty
+) - {"save_dir", "save_name"}
+
+
+def builtin_agents() -> Dict[str, Agent]:
+    """Return the agents defined in `prompts`, keyed by constant name and by title."""
+    agents: Dict[str, Agent] = {}
+    for name, value in vars(prompts).items():
+        if isinstance(value, Agent):
+            agents[name] = value
+            agents[value.title] = value
+    return agents
+
+
+def resolve_agent(value: Union[str, Dict[str, Any]]) -> Agent:
+    """
+    Turn an agent reference from a spec into an Agent.
+
+    :param value: Built-in agent name or title, or a mapping of Agent fields.
+    :return: The referenced or newly defined agent.
+    """
+    if isinstance(value, dict):
+        return Agent(**value)
+
+    agents = builtin_agents()
+    if value not in agents:
+        raise ValueError(
+            f"Unknown agent '{value}'. Built-in agents: "
+            + ", ".join(sorted(name for name in agents if name.isupper()))
+        )
+    return agents[value]
+
+
+def meeting_kwargs(spec: Dict[str, Any], default_save_name: str) -> Dict[str, Any]:
+    """
+    Validate one meeting spec and convert it to `run_meeting` keyword arguments.
+
+    :param spec: Meeting definition as read from YAML or JSON.
+    :param default_save_name: `save_name` used when the spec does not set one.
+    :return: Keyword arguments for `run_meeting`.
+    :raises ValueError: If the spec has unknown keys, lacks required ones or does not
+        name the participants its meeting type needs.
+    """
+    unknown = set(spec) - _SPEC_KEYS
+    if unknown:
+        raise ValueError(f"Unknown meeting keys {sorted(unknown)}")
+    missing = _REQUIRED_KEYS - set(spec)
+    if missing:
+        raise ValueError(f"Missing meeting keys {sorted(missing)}")
+    if not isinstance(spec["agenda"], str):
+        raise ValueError("agenda must be a string.")
+
+    kwargs = dict(spec)
+    kwargs.setdefault("save_dir", "meeting_outputs")
+    kwargs.setdefault("save_name", default_save_name)
+    kwargs["save_dir"] = Path(kwargs["save_dir"])
+    for key in _AGENT_KEYS:
+        if kwargs.get(key) is not None:
+            kwargs[key] = resolve_agent(kwargs[key])
+    if kwargs.get("team_members") is not None:
+        kwargs["team_members"] = tuple(
+            resolve_agent(member) for member in kwargs["team_members"]
+        )
+    for key in _TUPLE_KEYS:
+        if key in kwargs:
+            kwargs[key] = tuple(kwargs[key])
+    if kwargs.get("routing") is not None:
+        kwargs["routing"] = ModelRouter.from_dict(kwargs["routing"])
+    if kwargs.get("output_budget") is not None:
+        kwargs["output_budget"] = OutputBudget.from_dict(kwargs["output_budget"])
+    check_participants(
+        kwargs["meeting_type"],
+        kwargs.get("team_lead"),
+        kwargs.get("team_members"),
+        kwargs.get("team_member"),
+    )
+    return kwargs
+
+
+def read_meeting_specs(path: Path) -> List[Dict[str, Any]]:
+    """
+    Read a YAML spec and return its validated meetings as plain (JSON-serializable)
+    specs, e.g. to submit them to a job queue.
+
+    Meetings without a `save_name` are named after the spec file (with an index when
+    the file holds several meetings).
+
+    :param path: Path to the YAML spec.
+    :return: One spec per meeting, with the file's defaults applied.
+    """
+    with path.open("r", encoding="utf-8") as f:
+        document = yaml.safe_load(f) or {}
+
+    defaults = document.get("defaults", {})
+    meetings = document["meetings"] if "meetings" in document else [document]
+
+    specs = []
+    for idx, meeting in enumerate(meetings):
+        default_name = path.stem if len(meetings) == 1 else f"{path.stem}_{idx + 1}"
+        spec = {"save_name": default_name, **defaults, **meeting}
+        try:
+            meeting_kwargs(spec, default_name)
+        except ValueError as e:
+            raise ValueError(f"{path}: {e}") from e
+        specs.append(spec)
+
+    return specs
+
+
+def load_meeting_specs(path: Path) -> List[Dict[str, Any]]:
+    """
+    Read a YAML spec and return the `run_meeting` keyword arguments of its meetings.
+
+    Meetings without a `save_name` are named after the spec file (with an index when
+    the file holds several meetings). `save_dir` defaults to "meeting_outputs".
+
+    :param path: Path to the YAML spec.
+    :return: One dict of keyword arguments per meeting.
+    """
+    return [
+        meeting_kwargs(spec, spec["save_name"]) for spec in read_meeting_specs(path)
+    ]
+
+
+def spec_files(paths: List[Path]) -> List[Path]:
+    """Return the spec files given directly or found (*.yml, *.yaml) in directories."""
+    files: List[Path] = []
+    for path in paths:
+        if path.is_dir():
+            files.extend(sorted([*path.glob("*.yml"), *path.glob("*.yaml")]))
+        else:
+            files.append(path)
+    return files
+
+
+def collect_specs(paths: List[Path]) -> List[Dict[str, Any]]:
+    """Load every spec file given directly or found (*.yml, *.yaml) in a directory."""
+    return [spec for file in spec_files(paths) for spec in load_meeting_specs(file)]
+
+
+def is_saved(spec: Dict[str, Any]) -> bool:
+    """Return True if the meeting described by `spec` has already been saved."""
+    save_dir, save_name = spec["save_dir"], spec["save_name"]
+    return any(
+        (save_dir / f"{save_name}{suffix}").exists() for suffix in (".json", ".json.gz")
+    )
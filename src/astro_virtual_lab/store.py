@@ -0,0 +1,172 @@
+"""
+Content-addressed storage of meeting messages for astro_virtual_lab.
+
+The meetings of a sweep repeat large blocks of text: the start prompt's preamble,
+agenda, rules and contexts, and the summaries of earlier meetings replayed into later
+ones. With `save_meeting(..., dedup=True)`, a transcript is saved as a small manifest
+of references, and the text itself goes to a `MessageStore` shared by every meeting
+of the save directory, where each distinct block is stored once.
+
+Messages are split into chunks at paragraph breaks (short paragraphs are merged with
+the following ones), and each chunk is keyed by the hash of its text. Blocks shared by
+otherwise different messages, such as a summary embedded in two different start
+prompts, are therefore stored once as well. Disk use and the time needed to scan an
+archive grow with the amount of unique text rather than with the number of meetings.
+
+The store is a single SQLite file in WAL mode; every operation opens its own
+short-lived connection, so concurrent meetings and processes can share it.
+
+Example:
+    from astro_virtual_lab.store import MessageStore
+
+    store = MessageStore(Path("meeting_outputs/messages.sqlite"))
+    refs = store.put_messages(["A long message...", "Another one"])
+    assert store.get_messages(refs)[0] == "A long message..."
+"""
+
+import contextlib
+import hashlib
+import sqlite3
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List
+
+from astro_virtual_lab.constants import MESSAGE_CHUNK_MIN_CHARS
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS chunks (
+    hash TEXT PRIMARY KEY,
+    text TEXT NOT NULL
+) WITHOUT ROWID;
+"""
+
+# Chunks are joined back with the separator they were split on, which is lossless
+_CHUNK_SEPARATOR = "\n\n"
+
+# SQLite's default limit on the number of parameters of one statement is 999
+_QUERY_BATCH_SIZE = 900
+
+
+def split_message(text: str, min_chars: int = MESSAGE_CHUNK_MIN_CHARS) -> List[str]:
+    """
+    Split a message into chunks at paragraph breaks.
+
+    Paragraphs shorter than `min_chars` are merged with the following ones, so that
+    headings and short lines do not become chunks of their own.
+
+    :param text: Message text.
+    :param min_chars: Minimum number of characters of a chunk (except the last one).
+    :return: Chunks whose `"\\n\\n".join` is `text`.
+    """
+    chunks: List[str] = []
+    pending: List[str] = []
+    size = 0
+    for paragraph in text.split(_CHUNK_SEPARATOR):
+        pending.append(paragraph)
+        size += len(paragraph)
+        if size >= min_chars:
+            chunks.append(_CHUNK_SEPARATOR.join(pending))
+            pending, size = [], 0
+    if pending:
+        chunks.append(_CHUNK_SEPARATOR.join(pending))
+    return chunks
+
+
+def chunk_hash(chunk: str) -> str:
+    """Return the content address of a chunk."""
+    return hashlib.sha256(chunk.encode("utf-8")).hexdigest()
+
+
+class MessageStore:
+    """Deduplicated store of message chunks, keyed by the hash of their text."""
+
+    def __init__(self, db_path: Path) -> None:
+        """
+        :param db_path: SQLite file holding the chunks (created if missing).
+        """
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        with contextlib.closing(sqlite3.connect(self.db_path, timeout=30.0)) as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(_SCHEMA)
+
+    @contextlib.contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        """Open a connection in a write transaction, commit on success and close it."""
+        conn = sqlite3.connect(self.db_path, timeout=30.0, isolation_level=None)
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            yield conn
+            conn.execute("COMMIT")
+        except BaseException:
+            if conn.in_transaction:
+                conn.execute("ROLLBACK")
+            raise
+        finally:
+            conn.close()
+
+    def put_messages(self, messages: Iterable[str]) -> List[List[str]]:
+        """
+        Store messages, skipping the chunks that are already stored.
+
+        :param messages: Message texts.
+        :return: For each message, the hashes of its chunks in order.
+        """
+        refs: List[List[str]] = []
+        chunks: Dict[str, str] = {}
+        for message in messages:
+            hashes = []
+            for chunk in split_message(message):
+                key = chunk_hash(chunk)
+                chunks[key] = chunk
+                hashes.append(key)
+            refs.append(hashes)
+
+        with self._connect() as conn:
+            conn.executemany(
+                "INSERT OR IGNORE INTO chunks (hash, text) VALUES (?, ?)", chunks.items()
+            )
+        return refs
+
+    def get_messages(self, refs: List[List[str]]) -> List[str]:
+        """
+        Reassemble messages from their chunk hashes.
+
+        Each distinct chunk is read once, however many messages reference it.
+
+        :param refs: For each message, the hashes of its chunks, as returned by
+            `put_messages`.
+        :return: Message texts.
+        :raises KeyError: If a referenced chunk is missing from the store.
+        """
+        wanted = list({key for hashes in refs for key in hashes})
+        chunks: Dict[str, str] = {}
+        with contextlib.closing(sqlite3.connect(self.db_path, timeout=30.0)) as conn:
+            for start in range(0, len(wanted), _QUERY_BATCH_SIZE):
+                batch = wanted[start : start + _QUERY_BATCH_SIZE]
+                placeholders = ",".join("?" * len(batch))
+                chunks.update(
+                    conn.execute(
+                        f"SELECT hash, text FROM chunks WHERE hash IN ({placeholders})",
+                        batch,
+                    )
+                )
+
+        missing = set(wanted) - set(chunks)
+        if missing:
+            raise KeyError(
+                f"{len(missing)} chunk(s) missing from {self.db_path}, "
+                f"e.g. {sorted(missing)[0]}"
+            )
+        return [_CHUNK_SEPARATOR.join(chunks[key] for key in hashes) for hashes in refs]
+
+    def stats(self) -> Dict[str, int]:
+        """Return the number of stored chunks, their total size and the file size in bytes."""
+        with contextlib.closing(sqlite3.connect(self.db_path, timeout=30.0)) as conn:
+            count, text_bytes = conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(LENGTH(CAST(text AS BLOB))), 0) FROM chunks"
+            ).fetchone()
+        return {
+            "chunks": count,
+            "text_bytes": text_bytes,
+            "bytes": self.db_path.stat().st_size,
+        }
@@ -0,0 +1,158 @@
+"""
+Meetings as streams of typed events (see `astro_virtual_lab.events`).
+
+`iter_meeting` takes the arguments of `run_meeting` and yields the events of the
+meeting as they happen, and `aiter_meeting` is its asynchronous twin:
+
+    from astro_virtual_lab.events import TokenDelta, TurnCompleted
+    from astro_virtual_lab.streaming import iter_meeting
+
+    for event in iter_meeting(meeting_type="team", agenda=..., save_dir=..., ...):
+        if isinstance(event, TokenDelta):
+            print(event.text, end="", flush=True)
+        elif isinstance(event, TurnCompleted):
+            archive.write(event.to_dict())
+
+The meeting runs in a background thread and hands its events over through a bounded
+buffer. A consumer that falls behind makes the meeting wait (backpressure) instead of
+letting events pile up, so a consumer that writes each turn out as it arrives keeps
+only a few turns in memory. Leaving the loop early, or closing the generator, cancels
+the meeting. An error raised by the meeting is re-raised to the consumer after the
+events that preceded it.
+"""
+
+import asyncio
+import queue
+import threading
+from typing import Any, AsyncIterator, Iterator, Optional
+
+from astro_virtual_lab.concurrency import CancellationToken, OperationCancelledError
+from astro_virtual_lab.constants import MEETING_EVENT_BUFFER, MEETING_EVENT_POLL_INTERVAL
+from astro_virtual_lab.events import MeetingEvent
+from astro_virtual_lab.run_meeting import run_meeting
+
+
+class _End:
+    """Marks the end of a stream, with the error that ended the meeting if any."""
+
+    def __init__(self, error: Optional[BaseException] = None) -> None:
+        self.error = error
+
+
+class MeetingStream:
+    """A meeting running in a background thread, read one event at a time."""
+
+    def __init__(self, buffer: int = MEETING_EVENT_BUFFER, **kwargs: Any) -> None:
+        """
+        :param buffer: Number of events buffered before the meeting waits for the consumer.
+        :param kwargs: Arguments of `run_meeting` (except `on_event`).
+        """
+        if "on_event" in kwargs:
+            raise TypeError("A meeting stream delivers the events itself; drop on_event.")
+        parent = kwargs.pop("cancel_token", None)
+        self.token = (
+            parent.child(name="meeting stream")
+            if parent is not None
+            else CancellationToken(name="meeting stream")
+        )
+        self._events: "queue.Queue[Any]" = queue.Queue(maxsize=buffer)
+        self._done = False
+        self._thread = threading.Thread(
+            target=self._run,
+            kwargs={**kwargs, "cancel_token": self.token, "on_event": self._put},
+            name=f"meeting-{kwargs.get('save_name', 'discussion')}",
+            daemon=True,
+        )
+        self._thread.start()
+
+    def _put(self, item: Any) -> None:
+        """Hand an item to the consumer, waiting while the buffer is full."""
+        while True:
+            self.token.raise_if_cancelled()
+            try:
+                self._events.put(item, timeout=MEETING_EVENT_POLL_INTERVAL)
+                return
+            except queue.Full:
+                continue
+
+    def _run(self, **kwargs: Any) -> None:
+        try:
+            run_meeting(**kwargs)
+        except BaseException as e:
+            end = _End(e)
+        else:
+            end = _End()
+        try:
+            self._put(end)
+        except OperationCancelledError:
+            # Closed by the consumer, which no longer reads the stream
+            pass
+
+    def next_event(self) -> Optional[MeetingEvent]:
+        """
+        Wait for the next event of the meeting.
+
+        :return: The event, or None once the meeting has ended.
+        :raises Exception: The error that aborted the meeting, once its events are read.
+        """
+        if self._done:
+            return None
+        item = self._events.get()
+        if isinstance(item, _End):
+            self._done = True
+            if item.error is not None:
+                raise item.error
+            return None
+        return item
+
+    def close(self) -> None:
+        """Cancel the meeting if it is still running; its remaining events are dropped."""
+        if not self._done:
+            self._done = True
+            self.token.cancel("stopped by the consumer of the meeting stream")
+            # Release a reader still waiting in another thread (see `aiter_meeting`)
+            try:
+                self._events.put_nowait(_End())
+            except queue.Full:
+                pass
+
+
+def iter_meeting(**kwargs: Any) -> Iterator[MeetingEvent]:
+    """
+    Run a meeting and yield its events as they happen.
+
+    The meeting is cancelled if the generator is closed before the meeting ends.
+
+    :param kwargs: Arguments of `run_meeting` (except `on_event`), and optionally
+        `buffer`, the number of events buffered ahead of the consumer.
+    :return: Iterator over the events of the meeting, ending with `MeetingSummary`.
+    """
+    stream = MeetingStream(**kwargs)
+    try:
+        while True:
+            event = stream.next_event()
+            if event is None:
+                return
+            yield event
+    finally:
+        stream.close()
+
+
+async def aiter_meeting(**kwargs: Any) -> AsyncIterator[MeetingEvent]:
+    """
+    Asynchronous twin of `iter_meeting`, for consumers running in an event loop.
+
+    The meeting runs in its own thread; the loop only awaits the next event.
+
+    :param kwargs: Arguments of `run_meeting` (except `on_event`), and optionally `buffer`.
+    :return: Asynchronous iterator over the events of the meeting.
+    """
+    stream = MeetingStream(**kwargs)
+    try:
+        while True:
+            event = await asyncio.to_thread(stream.next_event)
+            if event is None:
+                return
+            yield event
+    finally:
+        stream.close()
@@ -0,0 +1,406 @@
+"""
+Registry of the tools that agents can call during a meeting.
+
+Tools are plain functions registered with the `@tool` decorator. The OpenAI function
+schema of each tool is generated once, at import time, from the function signature
+(type hints and defaults) and its reST-style `:param name:` docstring lines. Each tool
+also carries its own timeout, concurrency limit and result-size cap, which the
+dispatcher `run_tool` enforces. Tools marked `cpu_bound=True` run on the persistent
+process pool of `astro_virtual_lab.executors` instead of a worker thread.
+
+Example:
+    from astro_virtual_lab.tools import tool
+
+    @tool(timeout=30.0, max_concurrency=2, hidden=("verbose",))
+    def lookup_star(name: str, verbose: bool = True) -> str:
+        \"\"\"
+        Look up a star in a local table.
+
+        :param name: Name of the star.
+        :param verbose: Print debug info.
+        \"\"\"
+        ...
+"""
+
+import collections.abc
+import importlib
+import inspect
+import json
+import re
+import threading
+import time
+import types
+from concurrent.futures import Future, ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from dataclasses import dataclass, field
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    List,
+    Literal,
+    Optional,
+    Sequence,
+    Tuple,
+    Union,
+    get_args,
+    get_origin,
+    get_type_hints,
+)
+
+from astro_virtual_lab.concurrency import (
+    CancellationToken,
+    DeadlineExceededError,
+    OperationCancelledError,
+)
+from astro_virtual_lab.constants import (
+    TOOL_DEFAULT_TIMEOUT,
+    TOOL_MAX_RESULT_CHARS,
+    TOOL_MAX_WORKERS,
+)
+from astro_virtual_lab.executors import submit_cpu_bound
+
+# Modules whose functions register the built-in tools on import
+_BUILTIN_TOOL_MODULES = ("astro_virtual_lab.utils", "astro_virtual_lab.catalogs")
+
+_JSON_TYPES = {str: "string", int: "integer", float: "number", bool: "boolean"}
+_PARAM_PATTERN = re.compile(r"^:param (\w+):\s*(.*)$")
+
+
+@dataclass(frozen=True)
+class Tool:
+    """A registered tool: the function, its schema and its execution limits."""
+
+    name: str
+    func: Callable[..., Any]
+    schema: Dict[str, Any]
+    timeout: Optional[float] = TOOL_DEFAULT_TIMEOUT
+    max_concurrency: Optional[int] = None
+    max_result_chars: Optional[int] = TOOL_MAX_RESULT_CHARS
+    cpu_bound: bool = False
+    _slots: Optional[threading.BoundedSemaphore] = field(
+        default=None, repr=False, compare=False
+    )
+
+
+TOOL_REGISTRY: Dict[str, Tool] = {}
+_EXECUTOR: Optional[ThreadPoolExecutor] = None
+_EXECUTOR_LOCK = threading.Lock()
+
+
+###############################################################################
+# Schema generation
+###############################################################################
+
+
+def _type_schema(annotation: Any) -> Dict[str, Any]:
+    """Translate a type hint into a JSON schema fragment."""
+    origin, args = get_origin(annotation), get_args(annotation)
+
+    if origin in (Union, types.UnionType):
+        non_null = [arg for arg in args if arg is not type(None)]
+        return _type_schema(non_null[0]) if len(non_null) == 1 else {}
+    if origin is Literal:
+        return {"type": _JSON_TYPES.get(type(args[0]), "string"), "enum": list(args)}
+    if annotation in _JSON_TYPES:
+        return {"type": _JSON_TYPES[annotation]}
+    if origin in (list, tuple, collections.abc.Sequence) or annotation in (list, tuple):
+        item_args = [arg for arg in args if arg is not Ellipsis]
+        schema: Dict[str, Any] = {"type": "array"}
+        if item_args:
+            schema["items"] = _type_schema(item_args[0])
+        return schema
+    if origin in (dict, collections.abc.Mapping) or annotation is dict:
+        schema = {"type": "object"}
+        if len(args) == 2:
+            schema["additionalProperties"] = _type_schema(args[1])
+        return schema
+    return {}
+
+
+def _parse_docstring(func: Callable[..., Any]) -> Tuple[str, Dict[str, str]]:
+    """Return the summary paragraph and the `:param:` descriptions of a docstring."""
+    lines = [line.strip() for line in (inspect.getdoc(func) or "").splitlines()]
+
+    summary_lines: List[str] = []
+    for line in lines:
+        if not line or line.startswith(":"):
+            break
+        summary_lines.append(line)
+
+    params: Dict[str, str] = {}
+    current: Optional[str] = None
+    for line in lines:
+        if match := _PARAM_PATTERN.match(line):
+            current = match.group(1)
+            params[current] = match.group(2)
+        elif not line or line.startswith(":"):
+            current = None
+        elif current is not None:
+            # Indented continuation of the previous :param: line
+            params[current] = f"{params[current]} {line}"
+
+    return " ".join(summary_lines), params
+
+
+def build_tool_schema(
+    func: Callable[..., Any],
+    name: str,
+    description: Optional[str] = None,
+    hidden: Sequence[str] = (),
+    overrides: Optional[Dict[str, Dict[str, Any]]] = None,
+) -> Dict[str, Any]:
+    """
+    Generate the OpenAI function schema of a tool from its signature and docstring.
+
+    :param func: The tool function.
+    :param name: Function name shown to the model.
+    :param description: Description shown to the model (defaults to the docstring summary).
+    :param hidden: Parameters not exposed to the model (they keep their defaults).
+    :param overrides: Extra schema keys merged into individual parameter schemas.
+    :return: Dict with "name", "description" and "parameters".
+    """
+    summary, param_docs = _parse_docstring(func)
+    hints = get_type_hints(func)
+    overrides = overrides or {}
+
+    properties: Dict[str, Any] = {}
+    required: List[str] = []
+    for param in inspect.signature(func).parameters.values():
+        if param.name in hidden:
+            continue
+        schema = _type_schema(hints.get(param.name, Any))
+        if param.name in param_docs:
+            schema["description"] = param_docs[param.name]
+        if param.default is inspect.Parameter.empty:
+            required.append(param.name)
+        elif param.default is not None:
+            default = list(param.default) if isinstance(param.default, tuple) else param.default
+            schema["default"] = default
+        schema.update(overrides.get(param.name, {}))
+        properties[param.name] = schema
+
+    return {
+        "name": name,
+        "description": description or summary,
+        "parameters": {
+            "type": "object",
+            "properties": properties,
+            "required": required,
+        },
+    }
+
+
+###############################################################################
+# Registration
+###############################################################################
+
+
+def tool(
+    name: Optional[str] = None,
+    *,
+    description: Optional[str] = None,
+    timeout: Optional[float] = TOOL_DEFAULT_TIMEOUT,
+    max_concurrency: Optional[int] = None,
+    max_result_chars: Optional[int] = TOOL_MAX_RESULT_CHARS,
+    cpu_bound: bool = False,
+    hidden: Sequence[str] = (),
+    overrides: Optional[Dict[str, Dict[str, Any]]] = None,
+) -> Callable[[Callable[..., Any]], Callable[..., Any]]:
+    """
+    Register a function as a tool that agents can call.
+
+    The function itself is returned unchanged, so direct calls are unaffected.
+
+    :param name: Function name shown to the model (defaults to the Python name).
+    :param description: Description shown to the model (defaults to the docstring summary).
+    :param timeout: Seconds a call may run once it has a concurrency slot, after which
+        it is abandoned (None waits forever).
+    :param max_concurrency: Maximum number of simultaneous calls (None is unlimited).
+    :param max_result_chars: Results longer than this are truncated (None keeps all).
+    :param cpu_bound: If True, run calls on the process pool so they do not hold the GIL
+        of the orchestration process. The function must be defined at module level.
+    :param hidden: Parameters not exposed to the model.
+    :param overrides: Extra schema keys merged into individual parameter schemas.
+    :return: Decorator registering the function.
+    """
+
+    def decorator(func: Callable[..., Any]) -> Callable[..., Any]:
+        tool_name = name or func.__name__
+        if tool_name in TOOL_REGISTRY and TOOL_REGISTRY[tool_name].func is not func:
+            raise ValueError(f"A tool named '{tool_name}' is already registered.")
+
+        TOOL_REGISTRY[tool_name] = Tool(
+            name=tool_name,
+            func=func,
+            schema=build_tool_schema(func, tool_name, description, hidden, overrides),
+            timeout=timeout,
+            max_concurrency=max_concurrency,
+            max_result_chars=max_result_chars,
+            cpu_bound=cpu_bound,
+            _slots=threading.BoundedSemaphore(max_concurrency) if max_concurrency else None,
+        )
+        return func
+
+    return decorator
+
+
+def _load_builtin_tools() -> None:
+    """Import the modules that register the built-in tools."""
+    for module in _BUILTIN_TOOL_MODULES:
+        importlib.import_module(module)
+
+
+def get_tool(name: str) -> Tool:
+    """Return the registered tool called `name`."""
+    _load_builtin_tools()
+    if name not in TOOL_REGISTRY:
+        raise KeyError(f"Unknown tool: {name}")
+    return TOOL_REGISTRY[name]
+
+
+def get_tool_schemas(tool_names: Optional[Sequence[str]] = None) -> List[Dict[str, Any]]:
+    """
+    Return the function schemas offered to the model.
+
+    :param tool_names: Names of the allowed tools (None offers every registered tool).
+    :return: List of function schemas, in registration order.
+    """
+    _load_builtin_tools()
+    if tool_names is None:
+        return [registered.schema for registered in TOOL_REGISTRY.values()]
+    return [get_tool(tool_name).schema for tool_name in tool_names]
+
+
+###############################################################################
+# Dispatch
+###############################################################################
+
+
+def _executor() -> ThreadPoolExecutor:
+    """Shared worker threads that run tool calls, so timeouts can be enforced."""
+    global _EXECUTOR
+    with _EXECUTOR_LOCK:
+        if _EXECUTOR is None:
+            _EXECUTOR = ThreadPoolExecutor(
+                max_workers=TOOL_MAX_WORKERS, thread_name_prefix="astro-tool"
+            )
+    return _EXECUTOR
+
+
+class _ToolCall:
+    """A dispatched tool call, which `run_tool` can abandon while queued or running."""
+
+    def __init__(self, registered: Tool, kwargs: Dict[str, Any]) -> None:
+        self.registered = registered
+        self.kwargs = kwargs
+        self.started = threading.Event()
+        self.abandoned = threading.Event()
+
+    def run(self) -> Any:
+        """Call the tool while holding one of its concurrency slots."""
+        slots = self.registered._slots
+        if slots is not None:
+            # Poll, so that a call abandoned while queued gives up its place
+            while not slots.acquire(timeout=CancellationToken.POLL_INTERVAL):
+                if self.abandoned.is_set():
+                    return None
+        try:
+            if self.abandoned.is_set():
+                return None
+            self.started.set()
+            return self._invoke()
+        finally:
+            if slots is not None:
+                slots.release()
+
+    def _invoke(self) -> Any:
+        """Call the tool in this thread, or on the process pool if it is CPU-bound."""
+        if not self.registered.cpu_bound:
+            return self.registered.func(**self.kwargs)
+        # Only wait as long as `run_tool` does, so an abandoned call frees its slot
+        future = submit_cpu_bound(self.registered.func, **self.kwargs)
+        timeout = self.registered.timeout
+        end = time.monotonic() + timeout if timeout is not None else None
+        while True:
+            try:
+                return future.result(timeout=CancellationToken.POLL_INTERVAL)
+            except FutureTimeoutError:
+                if self.abandoned.is_set() or (end is not None and time.monotonic() >= end):
+                    # Drops the call if it is still queued; a running worker finishes it
+                    future.cancel()
+                    raise
+
+    def wait_started(self, future: Future, token: Optional[CancellationToken]) -> None:
+        """Wait until the call holds a slot (or ended), unless the token stops first."""
+        while not self.started.wait(CancellationToken.POLL_INTERVAL):
+            if future.done():
+                return
+            if token is not None:
+                token.raise_if_cancelled()
+
+    def abandon(self, future: Future) -> None:
+        """Give up on the call; a call that has not started yet never runs."""
+        self.abandoned.set()
+        future.cancel()
+
+
+def _format_result(result: Any, max_result_chars: Optional[int]) -> str:
+    """Serialize a tool result to text and cap its size."""
+    text = result if isinstance(result, str) else json.dumps(result)
+    if max_result_chars is not None and len(text) > max_result_chars:
+        omitted = len(text) - max_result_chars
+        text = f"{text[:max_result_chars]}\n... [truncated {omitted} characters]"
+    return text
+
+
+def run_tool(
+    name: str,
+    arguments: Union[str, Dict[str, Any], None],
+    allowed: Optional[Sequence[str]] = None,
+    token: Optional[CancellationToken] = None,
+) -> str:
+    """
+    Execute a tool requested by the model and return its text result.
+
+    Errors, timeouts and disallowed tools are returned as text so the model can
+    recover instead of the meeting failing. The tool's timeout counts from the moment
+    the call gets one of its concurrency slots. A call that times out or is cancelled
+    is abandoned: a call still waiting for a slot never runs, and a running one
+    finishes in the background.
+
+    :param name: Function name chosen by the model.
+    :param arguments: JSON-encoded (or already decoded) keyword arguments.
+    :param allowed: Names of the tools the calling agent may use (None allows all).
+    :param token: Cancellation token of the calling turn. Its cancellation or deadline
+        abandons the call and is raised rather than returned as text.
+    :return: Tool output to send back to the model.
+    """
+    if allowed is not None and name not in allowed:
+        return f"Tool {name} is not available to this agent."
+    try:
+        registered = get_tool(name)
+    except KeyError:
+        return f"Unknown tool: {name}"
+
+    call: Optional[_ToolCall] = None
+    try:
+        kwargs = json.loads(arguments or "{}") if not isinstance(arguments, dict) else arguments
+        call = _ToolCall(registered, kwargs)
+        future = _executor().submit(call.run)
+        call.wait_started(future, token)
+        if token is not None:
+            result = token.wait(future, timeout=registered.timeout)
+        else:
+            result = future.result(timeout=registered.timeout)
+    except (DeadlineExceededError, OperationCancelledError):
+        if call is not None:
+            call.abandon(future)
+        raise
+    except FutureTimeoutError:
+        call.abandon(future)
+        return f"Tool {name} timed out after {registered.timeout:g} seconds."
+    except Exception as e:
+        return f"Tool {name} failed: {str(e)}"
+
+    return _format_result(result, registered.max_result_chars)
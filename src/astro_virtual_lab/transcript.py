@@ -0,0 +1,367 @@
+"""
+Compact transcripts for analyses that hold many saved meetings in memory.
+
+`load_meeting` returns a list of dicts, one per turn, each with its own copy of the
+speaker's title and the decoded text of its message. A `Transcript` stores the same
+turns in a few flat arrays instead:
+
+- speakers are indices into one table of interned titles, shared by all transcripts
+- messages are the byte offsets of their JSON string literals in the saved file, and
+  are only read and decoded when accessed
+
+The file is read again for each message accessed (or memory-mapped with `mmap=True`),
+so holding a transcript costs a few bytes per turn whatever the length of its messages.
+If the meeting is saved again in the meantime (re-run, resumed or forked again), the
+offsets no longer match the file and reading a message raises `StaleTranscriptError`;
+load the transcript again. A memory-mapped transcript keeps reading the version it
+indexed.
+Compressed, deduplicated and forked transcripts have no plain JSON file to index;
+they are decoded once and their messages kept as one encoded buffer.
+
+A transcript is a sequence of `Turn` records, which can be read like the dicts
+`save_meeting` writes (`turn["message"]`), and `to_list` returns those dicts:
+
+    from astro_virtual_lab.transcript import iter_transcripts
+
+    transcripts = list(iter_transcripts(Path("meeting_outputs")))
+    replies = [turn for t in transcripts for turn in t if turn.agent != "User"]
+    print(replies[0]["message"])
+
+`examples/transcript_memory.py` compares the memory held by both representations.
+"""
+
+import json
+import mmap as mmap_module
+import os
+import sys
+import threading
+from array import array
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Mapping, Optional, Tuple, Union
+
+from astro_virtual_lab.utils import load_meeting, saved_meetings
+
+_BACKSLASH = ord("\\")
+_AGENT_KEY = b'"agent"'
+_MESSAGE_KEY = b'"message"'
+
+
+class _Labels:
+    """Process-wide table of interned speaker titles."""
+
+    def __init__(self) -> None:
+        self._titles: List[str] = []
+        self._ids: Dict[str, int] = {}
+        self._literal_ids: Dict[bytes, int] = {}
+        self._lock = threading.Lock()
+
+    def id(self, title: str) -> int:
+        """Return the index of `title`, adding it to the table if needed."""
+        label_id = self._ids.get(title)
+        if label_id is None:
+            with self._lock:
+                label_id = self._ids.get(title)
+                if label_id is None:
+                    label_id = len(self._titles)
+                    self._titles.append(sys.intern(title))
+                    self._ids[self._titles[-1]] = label_id
+        return label_id
+
+    def literal_id(self, literal: bytes) -> int:
+        """Return the index of the title encoded as the JSON string `literal`."""
+        label_id = self._literal_ids.get(literal)
+        if label_id is None:
+            label_id = self._literal_ids[literal] = self.id(json.loads(literal))
+        return label_id
+
+    def title(self, label_id: int) -> str:
+        """Return the title stored at `label_id`."""
+        return self._titles[label_id]
+
+
+_LABELS = _Labels()
+
+
+class StaleTranscriptError(RuntimeError):
+    """Raised when the file a `Transcript` indexed was replaced since it was loaded."""
+
+
+def _file_version(stat: os.stat_result) -> Tuple[int, int, int]:
+    return stat.st_ino, stat.st_mtime_ns, stat.st_size
+
+
+class _FileSource:
+    """Messages read from the saved file on each access; no file stays open."""
+
+    __slots__ = ("path", "version")
+
+    def __init__(self, path: str, version: Tuple[int, int, int]) -> None:
+        """
+        :param path: Saved JSON file.
+        :param version: Inode, modification time and size of the file when indexed.
+        """
+        self.path = path
+        self.version = version
+
+    def _open(self):
+        f = open(self.path, "rb")
+        # `save_meeting` replaces the file, after which the offsets point into the new one
+        if _file_version(os.fstat(f.fileno())) != self.version:
+            f.close()
+            raise StaleTranscriptError(
+                f"{self.path} was saved again after the transcript was loaded; "
+                "load it again."
+            )
+        return f
+
+    def read(self, start: int, end: int) -> bytes:
+        with self._open() as f:
+            f.seek(start)
+            return f.read(end - start)
+
+    def loaded(self) -> "_BufferSource":
+        """Return the whole file in memory, to read many messages at once."""
+        with self._open() as f:
+            return _BufferSource(f.read())
+
+
+class _BufferSource:
+    """Messages read from an in-memory or memory-mapped buffer."""
+
+    __slots__ = ("buffer",)
+
+    def __init__(self, buffer: Union[bytes, mmap_module.mmap]) -> None:
+        self.buffer = buffer
+
+    def read(self, start: int, end: int) -> bytes:
+        return self.buffer[start:end]
+
+    def loaded(self) -> "_BufferSource":
+        return self
+
+
+class Turn:
+    """One turn of a `Transcript`; the message is decoded when it is read."""
+
+    __slots__ = ("agent", "_transcript", "_index")
+
+    def __init__(self, agent: str, transcript: "Transcript", index: int) -> None:
+        self.agent = agent
+        self._transcript = transcript
+        self._index = index
+
+    @property
+    def message(self) -> str:
+        """Text of the turn."""
+        return self._transcript.message(self._index)
+
+    def __getitem__(self, key: str) -> str:
+        # Lets code written for the dicts of `load_meeting` read turns unchanged
+        if key == "agent":
+            return self.agent
+        if key == "message":
+            return self.message
+        raise KeyError(key)
+
+    def to_dict(self) -> Dict[str, str]:
+        """Return the turn as saved by `save_meeting`."""
+        return {"agent": self.agent, "message": self.message}
+
+    def __repr__(self) -> str:
+        return f"Turn(agent={self.agent!r}, index={self._index})"
+
+
+class Transcript:
+    """A saved meeting as columns of speaker indices and message offsets."""
+
+    __slots__ = ("name", "_agents", "_starts", "_ends", "_source")
+
+    def __init__(
+        self,
+        name: str,
+        agents: array,
+        starts: array,
+        ends: array,
+        source: Union[_FileSource, _BufferSource],
+    ) -> None:
+        """
+        :param name: Name of the meeting.
+        :param agents: Index of each turn's speaker in the shared title table.
+        :param starts: Offset of each turn's message literal in `source`.
+        :param ends: Offset of the end of each turn's message literal in `source`.
+        :param source: Buffer or file holding the JSON-encoded messages.
+        """
+        self.name = name
+        self._agents = agents
+        self._starts = starts
+        self._ends = ends
+        self._source = source
+
+    @classmethod
+    def from_turns(
+        cls, turns: Iterable[Mapping[str, str]], name: str = ""
+    ) -> "Transcript":
+        """
+        Pack turns ({"agent", "message"} dicts) into a transcript held in memory.
+
+        :param turns: Turns as returned by `load_meeting`.
+        :param name: Name of the meeting.
+        :return: The transcript, with its messages in one encoded buffer.
+        """
+        agents = array("I")
+        literals: List[bytes] = []
+        for turn in turns:
+            agents.append(_LABELS.id(turn["agent"]))
+            literal = json.dumps(turn["message"], ensure_ascii=False)
+            literals.append(literal.encode("utf-8"))
+        buffer = b"".join(literals)
+        starts = array("I" if len(buffer) < 2**32 else "Q")
+        ends = array(starts.typecode)
+        offset = 0
+        for literal in literals:
+            starts.append(offset)
+            offset += len(literal)
+            ends.append(offset)
+        return cls(name, agents, starts, ends, _BufferSource(buffer))
+
+    def __len__(self) -> int:
+        return len(self._agents)
+
+    def __getitem__(self, index: int) -> Turn:
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("turn index out of range")
+        return Turn(_LABELS.title(self._agents[index]), self, index)
+
+    def __iter__(self) -> Iterator[Turn]:
+        for index in range(len(self)):
+            yield self[index]
+
+    def agent(self, index: int) -> str:
+        """Return the speaker of turn `index`."""
+        return _LABELS.title(self._agents[index])
+
+    def message(self, index: int) -> str:
+        """Read and decode the message of turn `index`."""
+        return json.loads(self._source.read(self._starts[index], self._ends[index]))
+
+    def messages(self) -> Iterator[str]:
+        """Decode the messages in order, reading the saved file once."""
+        source = self._source.loaded()
+        for start, end in zip(self._starts, self._ends):
+            yield json.loads(source.read(start, end))
+
+    def to_list(self) -> List[Dict[str, str]]:
+        """Return the turns as the list of dicts written by `save_meeting`."""
+        return [
+            {"agent": _LABELS.title(agent), "message": message}
+            for agent, message in zip(self._agents, self.messages())
+        ]
+
+    def __repr__(self) -> str:
+        return f"Transcript(name={self.name!r}, turns={len(self)})"
+
+
+def _string_literals(
+    buffer: Union[bytes, mmap_module.mmap],
+) -> Iterator[Tuple[int, int]]:
+    """
+    Yield the start and end offsets of the JSON string literals of a document, in order.
+
+    Outside of string literals a JSON document has no quotes, so the literals are
+    found by searching for quotes that are not escaped, which is much faster than
+    decoding the document.
+    """
+    position = buffer.find(b'"')
+    while position != -1:
+        end = position + 1
+        while True:
+            end = buffer.find(b'"', end)
+            if end == -1:
+                raise ValueError("Unterminated string literal in JSON document.")
+            # A quote preceded by an odd number of backslashes is part of the text
+            escapes = 0
+            while buffer[end - 1 - escapes] == _BACKSLASH:
+                escapes += 1
+            end += 1
+            if escapes % 2 == 0:
+                break
+        yield position, end
+        position = buffer.find(b'"', end)
+
+
+def _index_file(path: Path, name: str, mmap: bool) -> Optional[Transcript]:
+    """Index the turns of a plain JSON transcript, or return None for other files."""
+    with path.open("rb") as f:
+        version = _file_version(os.fstat(f.fileno()))
+        if version[2] == 0:
+            return None
+        buffer = mmap_module.mmap(f.fileno(), 0, access=mmap_module.ACCESS_READ)
+    try:
+        if buffer[: buffer.find(b"[") + 1].strip() != b"[":
+            return None  # A manifest (deduplicated or forked transcript)
+
+        agents = array("I")
+        starts = array("I" if len(buffer) < 2**32 else "Q")
+        ends = array(starts.typecode)
+        pending: Dict[bytes, Any] = {}
+        literals = _string_literals(buffer)
+        for key_start, key_end in literals:
+            value = next(literals, None)
+            if value is None:
+                return None
+            key = buffer[key_start:key_end]
+            if key == _AGENT_KEY:
+                pending[_AGENT_KEY] = _LABELS.literal_id(buffer[value[0] : value[1]])
+            elif key == _MESSAGE_KEY:
+                pending[_MESSAGE_KEY] = value
+            else:
+                return None
+            if len(pending) == 2:
+                agents.append(pending[_AGENT_KEY])
+                start, end = pending[_MESSAGE_KEY]
+                starts.append(start)
+                ends.append(end)
+                pending.clear()
+        if pending:
+            return None
+    except BaseException:
+        buffer.close()
+        raise
+
+    if mmap:
+        return Transcript(name, agents, starts, ends, _BufferSource(buffer))
+    buffer.close()
+    return Transcript(name, agents, starts, ends, _FileSource(str(path), version))
+
+
+def load_transcript(save_dir: Path, save_name: str, mmap: bool = False) -> Transcript:
+    """
+    Load a meeting saved by `save_meeting` as a compact `Transcript`.
+
+    :param save_dir: Directory containing the saved files.
+    :param save_name: Base filename used when saving.
+    :param mmap: If True, keep the saved file memory-mapped rather than reopening it
+        for each message read. This keeps one file descriptor open per transcript, so
+        it suits the transcripts being analyzed, not a whole archive.
+    :return: The transcript.
+    """
+    path = save_dir / f"{save_name}.json"
+    if path.exists():
+        transcript = _index_file(path, save_name, mmap=mmap)
+        if transcript is not None:
+            return transcript
+    return Transcript.from_turns(load_meeting(save_dir, save_name), name=save_name)
+
+
+def iter_transcripts(save_dir: Path, mmap: bool = False) -> Iterator[Transcript]:
+    """
+    Load every meeting saved in `save_dir` as a compact `Transcript`.
+
+    :param save_dir: Directory written by `save_meeting`.
+    :param mmap: If True, memory-map the saved files (see `load_transcript`).
+    :return: Iterator over the transcripts, in the order of their names.
+    """
+    for name in saved_meetings(save_dir):
+        yield load_transcript(save_dir, name, mmap=mmap)
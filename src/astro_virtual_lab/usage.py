@@ -0,0 +1,246 @@
+"""
+Token usage accounting and spending limits for astro_virtual_lab.
+
+A `UsageTracker` is shared by every LLM call of a meeting, or of a whole batch of
+meetings, and records the prompt and completion tokens reported by the API and the
+latency of each call, per model and per meeting phase (see `routing`), and the length
+of each agent's replies, with the turns cut off by their output budget, to tune the
+budgets of `routing.OutputBudget`. When the
+tracker has a budget (in USD), an agent turn that would start after the budget is
+spent raises `BudgetExceededError` instead of contacting the API.
+
+Example:
+    from astro_virtual_lab.usage import UsageTracker
+
+    usage = UsageTracker(budget=2.0)
+    run_meeting(..., usage=usage)
+    print(usage.report())
+"""
+
+import math
+import threading
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional
+
+from astro_virtual_lab.constants import (
+    MODEL_TO_INPUT_PRICE_PER_TOKEN,
+    MODEL_TO_OUTPUT_PRICE_PER_TOKEN,
+)
+
+
+class BudgetExceededError(RuntimeError):
+    """Raised when an LLM call is attempted after the spending budget is used up."""
+
+
+@dataclass
+class ModelUsage:
+    """Accumulated usage of one model (or one meeting phase)."""
+
+    calls: int = 0
+    cached_calls: int = 0
+    failed_calls: int = 0
+    input_tokens: int = 0
+    output_tokens: int = 0
+    cost: float = 0.0
+    latency: float = 0.0
+
+    def add(self, input_tokens: int, output_tokens: int, cost: float, latency: float) -> None:
+        """Add one API call."""
+        self.calls += 1
+        self.input_tokens += input_tokens
+        self.output_tokens += output_tokens
+        self.cost += cost
+        self.latency += latency
+
+
+class UsageTracker:
+    """Thread-safe accumulator of token usage and cost, with an optional budget."""
+
+    def __init__(self, budget: Optional[float] = None) -> None:
+        """
+        :param budget: Maximum spend in USD (None is unlimited). Models without a price
+            in constants.py are counted but cost nothing.
+        """
+        self.budget = budget
+        self._models: Dict[str, ModelUsage] = {}
+        self._phases: Dict[str, ModelUsage] = {}
+        self._turn_tokens: Dict[str, List[int]] = {}
+        self._truncated: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    @property
+    def total_cost(self) -> float:
+        """Dollar cost of all recorded calls."""
+        with self._lock:
+            return sum(usage.cost for usage in self._models.values())
+
+    def check_budget(self) -> None:
+        """Raise `BudgetExceededError` if the budget is already spent."""
+        if self.budget is not None and self.total_cost >= self.budget:
+            raise BudgetExceededError(
+                f"Budget of ${self.budget:g} exhausted (spent ${self.total_cost:.4f})."
+            )
+
+    def record(
+        self,
+        model: str,
+        input_tokens: int,
+        output_tokens: int,
+        latency: float = 0.0,
+        phase: Optional[str] = None,
+    ) -> float:
+        """
+        Record one API call.
+
+        :param model: Model that served the call.
+        :param input_tokens: Prompt tokens reported by the API.
+        :param output_tokens: Completion tokens reported by the API.
+        :param latency: Seconds the call took.
+        :param phase: Meeting phase of the call (e.g. "member" or "summary").
+        :return: Dollar cost of the call.
+        """
+        cost = (
+            MODEL_TO_INPUT_PRICE_PER_TOKEN.get(model, 0.0) * input_tokens
+            + MODEL_TO_OUTPUT_PRICE_PER_TOKEN.get(model, 0.0) * output_tokens
+        )
+        with self._lock:
+            self._models.setdefault(model, ModelUsage()).add(
+                input_tokens, output_tokens, cost, latency
+            )
+            if phase is not None:
+                self._phases.setdefault(phase, ModelUsage()).add(
+                    input_tokens, output_tokens, cost, latency
+                )
+        return cost
+
+    def record_response(
+        self,
+        model: str,
+        response: Any,
+        latency: float = 0.0,
+        phase: Optional[str] = None,
+    ) -> float:
+        """Record a chat completion response using its `usage` field, if present."""
+        usage = getattr(response, "usage", None)
+        if usage is None:
+            return self.record(model, 0, 0, latency=latency, phase=phase)
+        return self.record(
+            model,
+            usage.prompt_tokens or 0,
+            usage.completion_tokens or 0,
+            latency=latency,
+            phase=phase,
+        )
+
+    def record_cache_hit(self, model: str, phase: Optional[str] = None) -> None:
+        """Record a completion served from the completion cache (no tokens spent)."""
+        with self._lock:
+            self._models.setdefault(model, ModelUsage()).cached_calls += 1
+            if phase is not None:
+                self._phases.setdefault(phase, ModelUsage()).cached_calls += 1
+
+    def record_failure(self, model: str, phase: Optional[str] = None) -> None:
+        """Record a call that failed (e.g. an overloaded model that was skipped)."""
+        with self._lock:
+            self._models.setdefault(model, ModelUsage()).failed_calls += 1
+            if phase is not None:
+                self._phases.setdefault(phase, ModelUsage()).failed_calls += 1
+
+    def record_turn(self, role: str, output_tokens: int, truncated: bool = False) -> None:
+        """
+        Record the length of one agent reply (all API calls of the turn).
+
+        :param role: Title of the agent that replied.
+        :param output_tokens: Completion tokens of the turn.
+        :param truncated: True if the reply was cut off by its output budget.
+        """
+        with self._lock:
+            self._turn_tokens.setdefault(role, []).append(output_tokens)
+            if truncated:
+                self._truncated[role] = self._truncated.get(role, 0) + 1
+
+    def output_distribution(self) -> Dict[str, Dict[str, float]]:
+        """
+        Return the distribution of reply lengths (completion tokens) per agent role.
+
+        :return: For each role, the number of turns, the mean, median, 90th percentile
+            and maximum tokens per turn, and the number of truncated turns.
+        """
+        with self._lock:
+            samples = {role: sorted(tokens) for role, tokens in self._turn_tokens.items()}
+            truncated = dict(self._truncated)
+
+        def percentile(values: List[int], q: float) -> int:
+            # Nearest-rank percentile
+            return values[max(0, math.ceil(q * len(values)) - 1)]
+
+        return {
+            role: {
+                "turns": len(values),
+                "mean": sum(values) / len(values),
+                "p50": percentile(values, 0.5),
+                "p90": percentile(values, 0.9),
+                "max": values[-1],
+                "truncated": truncated.get(role, 0),
+            }
+            for role, values in sorted(samples.items())
+        }
+
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        Return the usage per model and per phase, the reply lengths per role, and
+        totals, for JSON serialization.
+        """
+        with self._lock:
+            models = {
+                model: vars(usage).copy() for model, usage in sorted(self._models.items())
+            }
+            phases = {
+                phase: vars(usage).copy() for phase, usage in self._phases.items()
+            }
+        return {
+            "models": models,
+            "phases": phases,
+            "roles": self.output_distribution(),
+            "total_cost": sum(usage["cost"] for usage in models.values()),
+            "budget": self.budget,
+        }
+
+    def report(self) -> str:
+        """
+        Format the usage per model and per phase, and the reply lengths per role, as
+        short human-readable tables.
+        """
+        summary = self.to_dict()
+        lines = []
+        for title, rows in (("model", summary["models"]), ("phase", summary["phases"])):
+            if title == "phase" and not rows:
+                continue
+            lines.append(
+                f"{title:<24}{'calls':>7}{'cached':>8}{'failed':>8}{'input':>11}"
+                f"{'output':>11}{'cost':>11}{'avg s':>8}"
+            )
+            for name, usage in rows.items():
+                avg_latency = usage["latency"] / usage["calls"] if usage["calls"] else 0.0
+                lines.append(
+                    f"{name:<24}{usage['calls']:>7}{usage['cached_calls']:>8}"
+                    f"{usage['failed_calls']:>8}{usage['input_tokens']:>11}"
+                    f"{usage['output_tokens']:>11}"
+                    f"{'$' + format(usage['cost'], '.4f'):>11}{avg_latency:>8.2f}"
+                )
+        if summary["roles"]:
+            lines.append(
+                f"{'role':<24}{'turns':>7}{'mean':>8}{'p50':>8}{'p90':>8}"
+                f"{'max':>8}{'truncated':>11}"
+            )
+            for role, dist in summary["roles"].items():
+                lines.append(
+                    f"{role:<24}{dist['turns']:>7}{dist['mean']:>8.0f}"
+                    f"{dist['p50']:>8}{dist['p90']:>8}{dist['max']:>8}"
+                    f"{dist['truncated']:>11}"
+                )
+        total = f"Total cost: ${summary['total_cost']:.4f}"
+        if self.budget is not None:
+            total += f" of ${self.budget:g} budget"
+        lines.append(total)
+        return "\n".join(lines)
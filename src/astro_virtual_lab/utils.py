@@ -1,7 +1,7 @@
 """
 Utilities for the astro_virtual_lab, including:
- - NASA ADS queries
- - SIMBAD queries
+ - NASA ADS queries (blocking and asyncio-native)
+ - SIMBAD queries (blocking and asyncio-native)
  - Token counting and cost estimation
  - Saving/loading discussion logs
 
@@ -10,71 +10,386 @@ Ensure your environment has the optional dependencies installed if you plan
 to use ADS or SIMBAD queries (e.g., astroquery).
 """
 
+import contextlib
+import copy
+import gzip
+import hashlib
+import io
 import json
+import os
+import stat
+import tempfile
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
 from pathlib import Path
-from typing import Dict, List
+from typing import IO, Any, Dict, FrozenSet, Iterator, List, Optional, Tuple
 
 import astropy.units as u
 import tiktoken
 from astropy.coordinates import SkyCoord
-from astroquery.nasa_ads import ADS
 from astroquery.simbad import Simbad
 
-from astro_virtual_lab.config import load_config
+from astro_virtual_lab.ads import get_ads_client
+from astro_virtual_lab.cassette import through_cassette, through_cassette_async
+from astro_virtual_lab.clients import get_async_http_client
+from astro_virtual_lab.concurrency import (
+    ServiceLimiter,
+    SingleFlight,
+    throttle,
+    throttle_async,
+)
+from astro_virtual_lab.config import get_setting
 from astro_virtual_lab.constants import (
+    ADS_MAX_ABSTRACT_CHARS,
+    ADS_MAX_AUTHORS,
+    ADS_RESULT_CACHE_SIZE,
+    ADS_RESULT_FIELDS,
+    ADS_TOOL_TOKEN_BUDGET,
+    DEFAULT_SERVICE_CONCURRENCY,
+    MESSAGE_STORE_FILENAME,
     MODEL_TO_INPUT_PRICE_PER_TOKEN,
     MODEL_TO_OUTPUT_PRICE_PER_TOKEN,
+    SIMBAD_TAP_URL,
 )
+from astro_virtual_lab.store import MessageStore
+from astro_virtual_lab.tools import tool
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - Windows has no advisory flock
+    fcntl = None
+
+# Size of the in-memory buffer between the serializer and the temp file.
+WRITE_BUFFER_SIZE = 1 << 16
+
+# Process umask, read once at import: reading it means setting it, which is not
+# thread-safe
+_UMASK = os.umask(0)
+os.umask(_UMASK)
+
+# Coalesces identical in-flight ADS/SIMBAD requests issued by concurrent agents
+_SINGLE_FLIGHT = SingleFlight()
+_SERVICE_LIMITER: Optional[ServiceLimiter] = None
+
+
+def _service_limiter() -> ServiceLimiter:
+    """Build the per-service concurrency limiter from the config on first use."""
+    global _SERVICE_LIMITER
+    if _SERVICE_LIMITER is None:
+        limits = dict(DEFAULT_SERVICE_CONCURRENCY)
+        limits.update(get_setting("concurrency", default={}) or {})
+        _SERVICE_LIMITER = ServiceLimiter(limits)
+    return _SERVICE_LIMITER
+
+
+###############################################################################
+# NASA ADS
+###############################################################################
+
+# ADSPaper field names mapped to the corresponding ADS API field names
+_ADS_API_FIELDS = {
+    "title": "title",
+    "authors": "author",
+    "year": "year",
+    "bibcode": "bibcode",
+    "abstract": "abstract",
+}
+
+
+@dataclass(frozen=True, slots=True)
+class ADSPaper:
+    """
+    One NASA ADS search result.
+
+    Only the fields requested from ADS are populated. Use `format` to render a
+    compact text block with truncated author lists and abstracts for an LLM context.
+    """
+
+    bibcode: Optional[str] = None
+    title: Optional[str] = None
+    authors: tuple[str, ...] = ()
+    year: Optional[str] = None
+    abstract: Optional[str] = None
+
+    @classmethod
+    def from_doc(cls, doc: Dict[str, Any]) -> "ADSPaper":
+        """Build a paper from one document of an ADS API search response."""
+        return cls(
+            bibcode=doc.get("bibcode"),
+            title=doc["title"][0] if doc.get("title") else None,
+            authors=tuple(doc.get("author") or ()),
+            year=str(doc["year"]) if doc.get("year") else None,
+            abstract=doc.get("abstract"),
+        )
+
+    def format(
+        self,
+        fields: Tuple[str, ...] = ADS_RESULT_FIELDS,
+        max_authors: Optional[int] = ADS_MAX_AUTHORS,
+        max_abstract_chars: Optional[int] = ADS_MAX_ABSTRACT_CHARS,
+    ) -> str:
+        """
+        Format the paper as the text block returned to the agents.
+
+        :param fields: Fields to include, in the canonical TITLE/AUTHORS/YEAR/BIBCODE/ABSTRACT order.
+        :param max_authors: Keep only the first N authors (None keeps all).
+        :param max_abstract_chars: Truncate the abstract to N characters (None keeps all).
+        :return: Formatted text block terminated by a separator line.
+        """
+        lines = []
+        if "title" in fields:
+            lines.append(f"TITLE: {self.title or 'No title'}")
+        if "authors" in fields:
+            lines.append(f"AUTHORS: {_format_authors(self.authors, max_authors)}")
+        if "year" in fields:
+            lines.append(f"YEAR: {self.year or 'Unknown year'}")
+        if "bibcode" in fields:
+            lines.append(f"BIBCODE: {self.bibcode or 'No bibcode'}")
+        if "abstract" in fields:
+            abstract = _truncate_text(self.abstract, max_abstract_chars)
+            lines.append(f"ABSTRACT: {abstract or 'No abstract available'}")
+        lines.append("-" * 80)
+        return "\n".join(lines)
+
+
+def _format_authors(authors: tuple[str, ...], max_authors: Optional[int]) -> str:
+    """Join an author list, collapsing long lists to 'A, B, C, et al. (N authors)'."""
+    if not authors:
+        return "No authors"
+    if max_authors is None or len(authors) <= max_authors:
+        return ", ".join(authors)
+    return f"{', '.join(authors[:max_authors])}, et al. ({len(authors)} authors)"
+
+
+def _truncate_text(text: Optional[str], max_chars: Optional[int]) -> Optional[str]:
+    """Cut `text` at a word boundary so it fits in `max_chars` characters."""
+    if not text or max_chars is None or len(text) <= max_chars:
+        return text
+    return text[:max_chars].rsplit(" ", 1)[0].rstrip(" ,;:.") + " ..."
+
+
+def format_ads_papers(
+    papers: List[ADSPaper],
+    fields: Tuple[str, ...] = ADS_RESULT_FIELDS,
+    max_authors: Optional[int] = ADS_MAX_AUTHORS,
+    max_abstract_chars: Optional[int] = ADS_MAX_ABSTRACT_CHARS,
+    token_budget: Optional[int] = ADS_TOOL_TOKEN_BUDGET,
+) -> str:
+    """
+    Format ADS papers so that the result fits in a token budget.
+
+    While the text is over budget, abstracts are shortened first (halving the limit
+    down to a floor) and then the lowest-ranked papers are dropped.
+
+    :param papers: Papers in ranking order.
+    :param fields: Fields to include for each paper.
+    :param max_authors: Keep only the first N authors of each paper.
+    :param max_abstract_chars: Initial abstract length limit.
+    :param token_budget: Maximum number of tokens of the result (None disables the check).
+    :return: Formatted text for all papers that fit.
+    """
+    min_abstract_chars = 200
+    while True:
+        text = "\n\n".join(
+            paper.format(fields, max_authors, max_abstract_chars) for paper in papers
+        )
+        if token_budget is None or len(papers) <= 1 or count_tokens(text) <= token_budget:
+            return text
+
+        if "abstract" in fields and (
+            max_abstract_chars is None or max_abstract_chars > min_abstract_chars
+        ):
+            longest = max(len(paper.abstract or "") for paper in papers)
+            max_abstract_chars = max(
+                min_abstract_chars, min(longest, max_abstract_chars or longest) // 2
+            )
+        else:
+            papers = papers[:-1]
+
+
+# ADS papers keyed by normalized query, as (rows requested, fields fetched, papers).
+# Filled by every successful search and by the pre-meeting literature prefetch, so
+# repeated lookups inside a meeting resolve locally instead of hitting the network.
+# Bounded (least recently used first out), since long-running services search forever.
+_ADS_RESULT_CACHE: "OrderedDict[str, Tuple[int, FrozenSet[str], List[ADSPaper]]]" = (
+    OrderedDict()
+)
+_ADS_CACHE_LOCK = threading.Lock()
+
+
+def _ads_cache_key(query: str) -> str:
+    """Normalize a query so trivially different spellings share a cache entry."""
+    return " ".join(query.lower().split())
+
+
+def _cached_ads_papers(
+    query: str, num_articles: int, fields: Tuple[str, ...]
+) -> Optional[List[ADSPaper]]:
+    """Return cached papers for `query`, if the entry can serve this request."""
+    key = _ads_cache_key(query)
+    with _ADS_CACHE_LOCK:
+        entry = _ADS_RESULT_CACHE.get(key)
+        if entry is not None:
+            _ADS_RESULT_CACHE.move_to_end(key)
+    if entry is None:
+        return None
+
+    rows_requested, cached_fields, papers = entry
+    if not cached_fields.issuperset(fields):
+        return None
+    # A full page may hide further results, so only serve larger requests when the
+    # earlier search already came back short (i.e. returned everything ADS had)
+    if num_articles > rows_requested and len(papers) == rows_requested:
+        return None
+    return papers[:num_articles]
+
+
+def _store_ads_papers(
+    query: str, num_articles: int, fields: Tuple[str, ...], papers: List[ADSPaper]
+) -> None:
+    """Remember the papers returned by a successful search."""
+    key = _ads_cache_key(query)
+    with _ADS_CACHE_LOCK:
+        previous = _ADS_RESULT_CACHE.get(key)
+        if (
+            previous is None
+            or previous[0] < num_articles
+            or not previous[1].issuperset(fields)
+        ):
+            _ADS_RESULT_CACHE[key] = (num_articles, frozenset(fields), list(papers))
+        _ADS_RESULT_CACHE.move_to_end(key)
+        while len(_ADS_RESULT_CACHE) > ADS_RESULT_CACHE_SIZE:
+            _ADS_RESULT_CACHE.popitem(last=False)
+
+
+def clear_ads_cache() -> None:
+    """Drop all cached ADS search results."""
+    with _ADS_CACHE_LOCK:
+        _ADS_RESULT_CACHE.clear()
+
+
+def _validate_ads_fields(fields: Tuple[str, ...]) -> Tuple[str, ...]:
+    """Check requested fields against the supported ADSPaper fields."""
+    unknown = set(fields) - set(_ADS_API_FIELDS)
+    if unknown:
+        raise ValueError(
+            f"Unknown ADS fields {sorted(unknown)}; choose from {list(_ADS_API_FIELDS)}."
+        )
+    return tuple(fields)
+
+
+def search_ads(
+    query: str,
+    num_articles: int = 3,
+    fields: Tuple[str, ...] = ADS_RESULT_FIELDS,
+    use_cache: bool = True,
+) -> List[ADSPaper]:
+    """
+    Search NASA ADS and return structured results, fetching only the requested fields.
+
+    :param query: The search query for NASA ADS.
+    :param num_articles: The maximum number of articles to retrieve.
+    :param fields: ADSPaper fields to request from ADS.
+    :param use_cache: If True, serve repeated queries from the local result cache.
+    :return: Papers in ADS ranking order (empty if nothing matched).
+    """
+    fields = _validate_ads_fields(fields)
+    if use_cache and (cached := _cached_ads_papers(query, num_articles, fields)) is not None:
+        return cached
+
+    docs = through_cassette(
+        "ads",
+        _ads_request(query, num_articles, fields),
+        lambda: _ads_search_docs(query, num_articles, fields),
+    )
+    papers = [ADSPaper.from_doc(doc) for doc in docs]
+
+    _store_ads_papers(query, num_articles, fields, papers)
+    return papers
+
+
+def _ads_request(query: str, num_articles: int, fields: Tuple[str, ...]) -> Dict[str, Any]:
+    """Describe an ADS search for cassettes (shared by the blocking and async clients)."""
+    return {"query": query, "num_articles": num_articles, "fields": list(fields)}
+
+
+def _ads_search_docs(
+    query: str, num_articles: int, fields: Tuple[str, ...]
+) -> List[Dict[str, Any]]:
+    """Perform one blocking ADS API search and return the raw result documents."""
+    # The token travels with the request, so concurrent searches share no client state
+    return get_ads_client().search(
+        query, num_articles, tuple(_ADS_API_FIELDS[field] for field in fields)
+    )
 
 
-def run_ads_search(query: str, num_articles: int = 3, verbose: bool = True) -> str:
+@tool(
+    timeout=30.0,
+    max_concurrency=DEFAULT_SERVICE_CONCURRENCY["ads"],
+    hidden=(
+        "verbose",
+        "use_cache",
+        "fields",
+        "max_authors",
+        "max_abstract_chars",
+        "token_budget",
+    ),
+    overrides={"num_articles": {"minimum": 1, "maximum": 5}},
+)
+def run_ads_search(
+    query: str,
+    num_articles: int = 3,
+    verbose: bool = True,
+    use_cache: bool = True,
+    fields: Tuple[str, ...] = ADS_RESULT_FIELDS,
+    max_authors: Optional[int] = ADS_MAX_AUTHORS,
+    max_abstract_chars: Optional[int] = ADS_MAX_ABSTRACT_CHARS,
+    token_budget: Optional[int] = ADS_TOOL_TOKEN_BUDGET,
+) -> str:
     """
-    Runs a NASA ADS search using astroquery.nasa_ads, returning abstracts and
-    bibliographic info of the top matching articles.
+    Runs a NASA ADS search, returning abstracts and bibliographic info of the top
+    matching articles, trimmed to fit a per-tool-call token budget.
 
     :param query: The search query for NASA ADS.
     :param num_articles: The maximum number of articles to retrieve.
     :param verbose: Print search details for debugging or clarity.
+    :param use_cache: If True, serve repeated queries from the local result cache.
+    :param fields: Fields to fetch and include for each paper.
+    :param max_authors: Keep only the first N authors of each paper.
+    :param max_abstract_chars: Truncate abstracts to N characters.
+    :param token_budget: Maximum number of tokens of the returned text.
     :return: Formatted string containing relevant article details.
     """
-    # Load config and set ADS token
-    config = load_config()
-    ADS.TOKEN = config["api_keys"]["nasa_ads"]
-    
     if verbose:
         print(f"[ADS Search] Searching for up to {num_articles} articles with query: '{query}'")
 
-    # Query ADS using astroquery
     try:
-        papers = ADS.query_simple(query, max_pages=1, rows=num_articles)
+        papers = search_ads(query, num_articles, fields=fields, use_cache=use_cache)
         if not papers:
             return f"No ADS results found for query: {query}"
     except Exception as e:
         return f"ADS search failed: {str(e)}"
 
-    # Build a readable output
-    output_lines = []
-    for paper in papers:
-        # Some fields may be missing or None, so we handle that gracefully
-        title = paper.title[0] if paper.title else "No title"
-        authors = ", ".join(paper.author) if paper.author else "No authors"
-        year = paper.year if paper.year else "Unknown year"
-        abstract = paper.abstract if paper.abstract else "No abstract available"
-        bibcode = paper.bibcode if paper.bibcode else "No bibcode"
-        
-        line = (
-            f"TITLE: {title}\n"
-            f"AUTHORS: {authors}\n"
-            f"YEAR: {year}\n"
-            f"BIBCODE: {bibcode}\n"
-            f"ABSTRACT: {abstract}\n"
-            f"{'-'*80}"
-        )
-        output_lines.append(line)
+    return format_ads_papers(
+        papers,
+        fields=fields,
+        max_authors=max_authors,
+        max_abstract_chars=max_abstract_chars,
+        token_budget=token_budget,
+    )
 
-    return "\n\n".join(output_lines)
 
+###############################################################################
+# SIMBAD
+###############################################################################
 
+
+@tool(
+    timeout=30.0,
+    max_concurrency=DEFAULT_SERVICE_CONCURRENCY["simbad"],
+    hidden=("verbose",),
+)
 def query_simbad(object_name: str, verbose: bool = True) -> dict:
     """
     Query the SIMBAD database for information about an astronomical object.
@@ -86,6 +401,16 @@ def query_simbad(object_name: str, verbose: bool = True) -> dict:
     if verbose:
         print(f"[SIMBAD Query] Looking up object '{object_name}'")
 
+    return through_cassette(
+        "simbad",
+        {"object_name": object_name},
+        lambda: _simbad_query_object(object_name),
+    )
+
+
+def _simbad_query_object(object_name: str) -> dict:
+    """Resolve one object with astroquery's blocking SIMBAD client."""
+    throttle("simbad")
     custom_simbad = Simbad()
     custom_simbad.add_votable_fields(
         "flux(V)", "flux(B)", "flux(R)", "distance", "rv_value", "sp_type", "parallax"
@@ -99,28 +424,235 @@ def query_simbad(object_name: str, verbose: bool = True) -> dict:
         ra=row["RA"], dec=row["DEC"], unit=(u.hourangle, u.deg), frame="icrs"
     )
 
-    output = {
-        "name": str(row["MAIN_ID"]).strip(),
+    return _simbad_record(
+        name=str(row["MAIN_ID"]).strip(),
+        coords=coords,
+        object_type=str(row["OTYPE"]) if row["OTYPE"] else None,
+        spectral_type=str(row["SP_TYPE"]) if row["SP_TYPE"] else None,
+        magnitudes={
+            "V": float(row["FLUX_V"]) if row["FLUX_V"] else None,
+            "B": float(row["FLUX_B"]) if row["FLUX_B"] else None,
+            "R": float(row["FLUX_R"]) if row["FLUX_R"] else None,
+        },
+        distance_pc=(
+            float(row["Distance_distance"]) if row["Distance_distance"] else None
+        ),
+        radial_velocity_km_s=float(row["RV_VALUE"]) if row["RV_VALUE"] else None,
+        parallax_mas=float(row["PLX_VALUE"]) if row["PLX_VALUE"] else None,
+    )
+
+
+def _simbad_record(
+    name: str,
+    coords: SkyCoord,
+    object_type: Optional[str],
+    spectral_type: Optional[str],
+    magnitudes: Dict[str, Optional[float]],
+    distance_pc: Optional[float],
+    radial_velocity_km_s: Optional[float],
+    parallax_mas: Optional[float],
+) -> dict:
+    """Build the SIMBAD result dictionary shared by the blocking and async queries."""
+    return {
+        "name": name,
         "coordinates": {
             "ra_deg": coords.ra.deg,
             "dec_deg": coords.dec.deg,
             "ra_hms": coords.ra.to_string(unit=u.hour, sep=":"),
             "dec_dms": coords.dec.to_string(unit=u.deg, sep=":"),
         },
-        "object_type": str(row["OTYPE"]) if row["OTYPE"] else None,
-        "spectral_type": str(row["SP_TYPE"]) if row["SP_TYPE"] else None,
-        "magnitudes": {
-            "V": float(row["FLUX_V"]) if row["FLUX_V"] else None,
-            "B": float(row["FLUX_B"]) if row["FLUX_B"] else None,
-            "R": float(row["FLUX_R"]) if row["FLUX_R"] else None,
+        "object_type": object_type,
+        "spectral_type": spectral_type,
+        "magnitudes": magnitudes,
+        "distance_pc": distance_pc,
+        "radial_velocity_km_s": radial_velocity_km_s,
+        "parallax_mas": parallax_mas,
+    }
+
+
+###############################################################################
+# Asyncio-native ADS and SIMBAD clients
+###############################################################################
+
+# Distance units reported by SIMBAD's mesDistance table, converted to parsecs
+_SIMBAD_DISTANCE_TO_PC = {"pc": 1.0, "kpc": 1e3, "Mpc": 1e6}
+
+
+async def search_ads_async(
+    query: str,
+    num_articles: int = 3,
+    fields: Tuple[str, ...] = ADS_RESULT_FIELDS,
+    use_cache: bool = True,
+) -> List[ADSPaper]:
+    """
+    Asyncio-native version of `search_ads` that talks to the ADS API directly.
+
+    Requests go through the pooled HTTP client, are limited by the configured "ads"
+    concurrency, and identical concurrent searches share a single network call.
+
+    :param query: The search query for NASA ADS.
+    :param num_articles: The maximum number of articles to retrieve.
+    :param fields: ADSPaper fields to request from ADS.
+    :param use_cache: If True, serve repeated queries from the local result cache.
+    :return: Papers in ADS ranking order (empty if nothing matched).
+    """
+    fields = _validate_ads_fields(fields)
+    if use_cache and (cached := _cached_ads_papers(query, num_articles, fields)) is not None:
+        return cached
+
+    papers = await _SINGLE_FLIGHT.do(
+        ("ads", query, num_articles, fields),
+        lambda: _service_limiter().run(
+            "ads", lambda: _ads_search_request(query, num_articles, fields)
+        ),
+    )
+    return list(papers)
+
+
+async def _ads_search_request(
+    query: str, num_articles: int, fields: Tuple[str, ...]
+) -> List[ADSPaper]:
+    """Perform one ADS API search and parse the results."""
+
+    async def fetch_docs() -> List[Dict[str, Any]]:
+        return await get_ads_client().asearch(
+            query, num_articles, tuple(_ADS_API_FIELDS[field] for field in fields)
+        )
+
+    docs = await through_cassette_async(
+        "ads", _ads_request(query, num_articles, fields), fetch_docs
+    )
+    papers = [ADSPaper.from_doc(doc) for doc in docs]
+
+    _store_ads_papers(query, num_articles, fields, papers)
+    return papers
+
+
+async def run_ads_search_async(
+    query: str,
+    num_articles: int = 3,
+    verbose: bool = True,
+    use_cache: bool = True,
+    fields: Tuple[str, ...] = ADS_RESULT_FIELDS,
+    max_authors: Optional[int] = ADS_MAX_AUTHORS,
+    max_abstract_chars: Optional[int] = ADS_MAX_ABSTRACT_CHARS,
+    token_budget: Optional[int] = ADS_TOOL_TOKEN_BUDGET,
+) -> str:
+    """
+    Asyncio-native version of `run_ads_search`, built on `search_ads_async`.
+
+    :param query: The search query for NASA ADS.
+    :param num_articles: The maximum number of articles to retrieve.
+    :param verbose: Print search details for debugging or clarity.
+    :param use_cache: If True, serve repeated queries from the local result cache.
+    :param fields: Fields to fetch and include for each paper.
+    :param max_authors: Keep only the first N authors of each paper.
+    :param max_abstract_chars: Truncate abstracts to N characters.
+    :param token_budget: Maximum number of tokens of the returned text.
+    :return: Formatted string containing relevant article details.
+    """
+    if verbose:
+        print(f"[ADS Search] Searching for up to {num_articles} articles with query: '{query}'")
+
+    try:
+        papers = await search_ads_async(
+            query, num_articles, fields=fields, use_cache=use_cache
+        )
+        if not papers:
+            return f"No ADS results found for query: {query}"
+    except Exception as e:
+        return f"ADS search failed: {str(e)}"
+
+    return format_ads_papers(
+        papers,
+        fields=fields,
+        max_authors=max_authors,
+        max_abstract_chars=max_abstract_chars,
+        token_budget=token_budget,
+    )
+
+
+async def query_simbad_async(object_name: str, verbose: bool = True) -> dict:
+    """
+    Asyncio-native version of `query_simbad` using the SIMBAD TAP service.
+
+    Requests go through the pooled HTTP client, are limited by the configured "simbad"
+    concurrency, and identical concurrent lookups share a single network call.
+
+    :param object_name: The name or identifier of the object.
+    :param verbose: Print debug info.
+    :return: Dictionary with keys like 'name', 'coordinates', 'spectral_type', etc.
+    """
+    if verbose:
+        print(f"[SIMBAD Query] Looking up object '{object_name}'")
+
+    result = await _SINGLE_FLIGHT.do(
+        ("simbad", object_name),
+        lambda: _service_limiter().run(
+            "simbad",
+            lambda: through_cassette_async(
+                "simbad",
+                {"object_name": object_name},
+                lambda: _simbad_tap_request(object_name),
+            ),
+        ),
+    )
+    # Coalesced callers share one result object, so hand each a private copy
+    return copy.deepcopy(result)
+
+
+async def _simbad_tap_request(object_name: str) -> dict:
+    """Resolve one object through an ADQL query against SIMBAD's TAP service."""
+    escaped_name = object_name.replace("'", "''")
+    adql = (
+        "SELECT TOP 1 basic.main_id, basic.ra, basic.dec, basic.otype, basic.sp_type, "
+        'basic.plx_value, basic.rvz_radvel, allfluxes."V", allfluxes."B", allfluxes."R", '
+        "mesDistance.dist, mesDistance.unit "
+        "FROM ident JOIN basic ON basic.oid = ident.oidref "
+        "LEFT JOIN allfluxes ON allfluxes.oidref = basic.oid "
+        "LEFT JOIN mesDistance ON mesDistance.oidref = basic.oid "
+        f"WHERE ident.id = '{escaped_name}'"
+    )
+
+    await throttle_async("simbad")
+    client = get_async_http_client()
+    response = await client.post(
+        SIMBAD_TAP_URL,
+        data={"request": "doQuery", "lang": "ADQL", "format": "json", "query": adql},
+    )
+    response.raise_for_status()
+    payload = response.json()
+    if not payload.get("data"):
+        return {"error": f"Object '{object_name}' not found in SIMBAD."}
+
+    columns = [column["name"].lower() for column in payload["metadata"]]
+    row = dict(zip(columns, payload["data"][0]))
+
+    def optional_float(value: Any) -> Optional[float]:
+        return float(value) if value else None
+
+    distance = optional_float(row.get("dist"))
+    distance_scale = _SIMBAD_DISTANCE_TO_PC.get((row.get("unit") or "").strip())
+    coords = SkyCoord(ra=row["ra"], dec=row["dec"], unit=(u.deg, u.deg), frame="icrs")
+
+    return _simbad_record(
+        name=str(row["main_id"]).strip(),
+        coords=coords,
+        object_type=str(row["otype"]) if row.get("otype") else None,
+        spectral_type=str(row["sp_type"]) if row.get("sp_type") else None,
+        magnitudes={
+            "V": optional_float(row.get("v")),
+            "B": optional_float(row.get("b")),
+            "R": optional_float(row.get("r")),
         },
-        "distance_pc": (
-            float(row["Distance_distance"]) if row["Distance_distance"] else None
+        distance_pc=(
+            distance * distance_scale
+            if distance is not None and distance_scale is not None
+            else None
         ),
-        "radial_velocity_km_s": float(row["RV_VALUE"]) if row["RV_VALUE"] else None,
-        "parallax_mas": float(row["PLX_VALUE"]) if row["PLX_VALUE"] else None,
-    }
-    return output
+        radial_velocity_km_s=optional_float(row.get("rvz_radvel")),
+        parallax_mas=optional_float(row.get("plx_value")),
+    )
 
 
 ###############################################################################
@@ -166,30 +698,258 @@ def compute_token_cost(model: str, input_tokens: int, output_tokens: int) -> flo
 ###############################################################################
 
 
+@contextlib.contextmanager
+def _file_lock(lock_path: Path) -> Iterator[None]:
+    """
+    Hold an exclusive advisory lock on `lock_path` for the duration of the block.
+
+    The lock serializes concurrent writers of the same meeting (e.g. batch workers
+    that were given the same `save_name`). On platforms without `fcntl` this is a no-op
+    and only the atomic replace protects the files.
+
+    :param lock_path: Path of the lock file (created if missing).
+    """
+    with lock_path.open("a") as lock_file:
+        if fcntl is not None:
+            fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+
+
+@contextlib.contextmanager
+def atomic_writer(path: Path, compress: bool = False) -> Iterator[IO[str]]:
+    """
+    Open a text stream whose contents atomically replace `path` on success.
+
+    Data is written in buffered chunks to a temporary file in the same directory,
+    which is fsync'ed and then moved over `path` with `os.replace`. Readers therefore
+    see either the previous file or the complete new one, never a truncated file.
+    If the block raises, the temporary file is removed and `path` is left untouched.
+
+    :param path: Final destination of the file.
+    :param compress: If True, gzip the output stream.
+    :return: A writable UTF-8 text stream.
+    """
+    fd, tmp_name = tempfile.mkstemp(
+        dir=path.parent, prefix=f".{path.name}.", suffix=".tmp"
+    )
+    try:
+        with os.fdopen(fd, "wb", buffering=WRITE_BUFFER_SIZE) as raw:
+            binary = (
+                gzip.GzipFile(filename=path.stem, fileobj=raw, mode="wb", mtime=0)
+                if compress
+                else raw
+            )
+            text = io.TextIOWrapper(binary, encoding="utf-8")
+            yield text
+            text.flush()
+            text.detach()
+            if compress:
+                binary.close()
+            raw.flush()
+            os.fsync(raw.fileno())
+        # mkstemp creates the file as 0o600; keep the mode of the file it replaces,
+        # or use the one `open` would have given a new file
+        try:
+            mode = stat.S_IMODE(path.stat().st_mode)
+        except FileNotFoundError:
+            mode = 0o666 & ~_UMASK
+        os.chmod(tmp_name, mode)
+        os.replace(tmp_name, path)
+    except BaseException:
+        with contextlib.suppress(FileNotFoundError):
+            os.unlink(tmp_name)
+        raise
+
+
 def save_meeting(
-    save_dir: Path, save_name: str, discussion: List[Dict[str, str]]
+    save_dir: Path,
+    save_name: str,
+    discussion: List[Dict[str, str]],
+    compress: bool = False,
+    dedup: bool = False,
+    fork_of: Optional[str] = None,
+    fork_turn: int = 0,
 ) -> None:
     """
     Save the entire discussion to two files: JSON and Markdown.
 
+    Both files are streamed to temporary files and atomically moved into place while
+    holding a per-meeting lock, so a crash or a concurrent writer never leaves a
+    truncated or interleaved transcript behind. Files left by an earlier save in
+    another format (compressed or not, with or without Markdown) are then removed, so
+    loading the meeting never finds a stale transcript.
+
+    With `dedup`, the message texts go to the content-addressed store shared by all
+    meetings of `save_dir` (see `astro_virtual_lab.store`), the JSON file only holds
+    references to them, and no Markdown is written (see `save_markdown`).
+
+    With `fork_of`, the discussion continues the first `fork_turn` turns of another
+    meeting of `save_dir` (see `astro_virtual_lab.fork`). Only the turns after the
+    fork point are saved, with a reference to that meeting, and no Markdown is written.
+
     :param save_dir: Directory to save the files.
     :param save_name: Base filename for saving.
     :param discussion: List of message dicts with "agent" and "message".
+    :param compress: If True, write gzip-compressed `.json.gz` and `.md.gz` files.
+    :param dedup: If True, save the discussion as references into the message store.
+    :param fork_of: Name of the saved meeting the discussion was forked from.
+    :param fork_turn: Number of leading turns shared with `fork_of`.
     """
     save_dir.mkdir(parents=True, exist_ok=True)
+    suffix = ".gz" if compress else ""
+
+    with _file_lock(save_dir / f".{save_name}.lock"):
+        # Save JSON (json.dump serializes incrementally into the buffered stream)
+        json_path = save_dir / f"{save_name}.json{suffix}"
+        if dedup or fork_of is not None:
+            manifest: Dict[str, Any] = {}
+            turns = discussion
+            if fork_of is not None:
+                manifest.update(
+                    parent=fork_of,
+                    fork_turn=fork_turn,
+                    prefix_sha256=turns_digest(discussion[:fork_turn]),
+                )
+                turns = discussion[fork_turn:]
+            if dedup:
+                # The chunks are stored before the manifest that references them
+                store = MessageStore(save_dir / MESSAGE_STORE_FILENAME)
+                refs = store.put_messages(turn["message"] for turn in turns)
+                manifest["store"] = MESSAGE_STORE_FILENAME
+                turns = [
+                    {"agent": turn["agent"], "chunks": hashes}
+                    for turn, hashes in zip(turns, refs)
+                ]
+            manifest["turns"] = turns
+            with atomic_writer(json_path, compress=compress) as f:
+                json.dump(manifest, f, separators=(",", ":"))
+            _remove_other_formats(save_dir, save_name, keep=(json_path,))
+            return
+
+        with atomic_writer(json_path, compress=compress) as f:
+            json.dump(discussion, f, indent=4)
+
+        # Save Markdown
+        md_path = save_markdown(save_dir, save_name, discussion, compress=compress)
+        _remove_other_formats(save_dir, save_name, keep=(json_path, md_path))
+
+
+def _remove_other_formats(save_dir: Path, save_name: str, keep: Tuple[Path, ...]) -> None:
+    """Delete the files of a meeting that the latest save did not write."""
+    for suffix in (".json", ".json.gz", ".md", ".md.gz"):
+        path = save_dir / f"{save_name}{suffix}"
+        if path not in keep:
+            with contextlib.suppress(FileNotFoundError):
+                path.unlink()
+
+
+def save_markdown(
+    save_dir: Path,
+    save_name: str,
+    discussion: List[Dict[str, str]],
+    compress: bool = False,
+) -> Path:
+    """
+    Write a discussion as Markdown, one section per turn.
 
-    # Save JSON
-    json_path = save_dir / f"{save_name}.json"
-    with json_path.open("w", encoding="utf-8") as f:
-        json.dump(discussion, f, indent=4)
-
-    # Save Markdown
-    md_path = save_dir / f"{save_name}.md"
-    with md_path.open("w", encoding="utf-8") as f:
+    :param save_dir: Directory to save the file.
+    :param save_name: Base filename for saving.
+    :param discussion: List of message dicts with "agent" and "message".
+    :param compress: If True, write a gzip-compressed `.md.gz` file.
+    :return: Path of the Markdown file.
+    """
+    md_path = save_dir / f"{save_name}.md{'.gz' if compress else ''}"
+    with atomic_writer(md_path, compress=compress) as f:
         for turn in discussion:
             agent = turn["agent"]
             text = turn["message"]
             f.write(f"## {agent}\n\n{text}\n\n")
+    return md_path
+
+
+def saved_meetings(save_dir: Path) -> List[str]:
+    """Return the names of the meetings saved in `save_dir`."""
+    return sorted({path.name.split(".json")[0] for path in save_dir.glob("*.json*")})
+
+
+def _read_saved_meeting(save_dir: Path, save_name: str) -> Any:
+    """Read the JSON file of a saved meeting, compressed or not."""
+    json_path = save_dir / f"{save_name}.json"
+    gz_path = save_dir / f"{save_name}.json.gz"
+    if json_path.exists():
+        with json_path.open("r", encoding="utf-8") as f:
+            return json.load(f)
+    if gz_path.exists():
+        with gzip.open(gz_path, "rt", encoding="utf-8") as f:
+            return json.load(f)
+    raise FileNotFoundError(f"No saved meeting named '{save_name}' in {save_dir}.")
+
+
+def load_meeting(save_dir: Path, save_name: str) -> List[Dict[str, str]]:
+    """
+    Load a discussion saved by `save_meeting`, compressed, deduplicated, forked or not.
+
+    :param save_dir: Directory containing the saved files.
+    :param save_name: Base filename used when saving.
+    :return: List of message dicts with "agent" and "message".
+    """
+    saved = _read_saved_meeting(save_dir, save_name)
+    if isinstance(saved, list):
+        return saved
+
+    turns = saved["turns"]
+    if "store" in saved:
+        # Deduplicated manifest: reassemble the messages from the store
+        store = MessageStore(save_dir / saved["store"])
+        messages = store.get_messages([turn["chunks"] for turn in turns])
+        turns = [
+            {"agent": turn["agent"], "message": message}
+            for turn, message in zip(turns, messages)
+        ]
+    if "parent" in saved:
+        # Forked meeting: the leading turns are those of the meeting it was forked from
+        prefix = load_meeting(save_dir, saved["parent"])[: saved["fork_turn"]]
+        if len(prefix) != saved["fork_turn"]:
+            raise ValueError(
+                f"Meeting '{save_name}' was forked after turn {saved['fork_turn']}, but "
+                f"'{saved['parent']}' only has {len(prefix)} turns."
+            )
+        # The parent may have been re-run under the same name since the fork
+        if "prefix_sha256" in saved and turns_digest(prefix) != saved["prefix_sha256"]:
+            raise ValueError(
+                f"The first {saved['fork_turn']} turns of '{saved['parent']}' changed "
+                f"since meeting '{save_name}' was forked from it."
+            )
+        turns = prefix + turns
+    return turns
+
+
+def turns_digest(turns: List[Dict[str, str]]) -> str:
+    """Return the SHA-256 of a list of turns, used to check the prefix of a fork."""
+    encoded = json.dumps(
+        [[turn["agent"], turn["message"]] for turn in turns],
+        ensure_ascii=False,
+        separators=(",", ":"),
+    )
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+
+def meeting_parent(save_dir: Path, save_name: str) -> Optional[Tuple[str, int]]:
+    """
+    Return the meeting a saved meeting was forked from, if any.
+
+    :param save_dir: Directory containing the saved files.
+    :param save_name: Base filename used when saving.
+    :return: Name of the parent meeting and number of turns shared with it, or None.
+    """
+    saved = _read_saved_meeting(save_dir, save_name)
+    if isinstance(saved, dict) and "parent" in saved:
+        return saved["parent"], saved["fork_turn"]
+    return None
 
 
 def get_summary(discussion: List[Dict[str, str]]) -> str:
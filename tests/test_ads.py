@@ -0,0 +1,98 @@
+import time
+
+import pytest
+
+from astro_virtual_lab.ads import ADSClient, ADSQuotaExceededError, ADSTokenPool
+
+DOCS = [{"bibcode": "2020A&A...1S", "title": ["Thick disk"]}]
+
+
+class FakeResponse:
+    def __init__(self, status_code, headers, docs=()):
+        self.status_code = status_code
+        self.headers = headers
+        self._docs = list(docs)
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise RuntimeError(f"HTTP {self.status_code}")
+
+    def json(self):
+        return {"response": {"docs": self._docs}}
+
+
+class FakeSession:
+    """Answers with the quota left for each token, refusing exhausted tokens."""
+
+    def __init__(self, remaining):
+        self.remaining = dict(remaining)
+        self.tokens_used = []
+
+    def get(self, url, params, headers, timeout):
+        token = headers["Authorization"].removeprefix("Bearer ")
+        self.tokens_used.append(token)
+        reset = str(int(time.time()) + 3600)
+        if self.remaining[token] <= 0:
+            return FakeResponse(429, {"X-RateLimit-Reset": reset})
+        self.remaining[token] -= 1
+        quota_headers = {
+            "X-RateLimit-Limit": "5000",
+            "X-RateLimit-Remaining": str(self.remaining[token]),
+            "X-RateLimit-Reset": reset,
+        }
+        return FakeResponse(200, quota_headers, DOCS)
+
+
+def client_with(remaining):
+    client = ADSClient(ADSTokenPool(list(remaining)))
+    session = FakeSession(remaining)
+    client._local.session = session
+    return client, session
+
+
+def search(client):
+    return client.search("thick disk", rows=1, fields=("bibcode", "title"))
+
+
+def test_token_with_the_most_quota_is_used():
+    client, session = client_with({"token-a": 10, "token-b": 500})
+    client.pool.update(client.pool.quotas()[0], {"X-RateLimit-Remaining": "10"})
+    client.pool.update(client.pool.quotas()[1], {"X-RateLimit-Remaining": "500"})
+    assert search(client) == DOCS
+    assert session.tokens_used == ["token-b"]
+    report = {entry["token"]: entry for entry in client.pool.report()}
+    assert report["...en-b"]["remaining"] == 499
+    assert report["...en-b"]["limit"] == 5000
+    assert report["...en-b"]["resets_in"] > 3000
+
+
+def test_refused_token_is_set_aside_and_the_request_retried():
+    client, session = client_with({"token-a": 0, "token-b": 3})
+    # Both tokens start with the assumed daily quota; token-a is tried first
+    assert search(client) == DOCS
+    assert session.tokens_used == ["token-a", "token-b"]
+    assert search(client) == DOCS
+    assert session.tokens_used[-1] == "token-b"
+    quotas = {quota.token: quota for quota in client.pool.quotas()}
+    assert quotas["token-a"].remaining == 0
+    assert quotas["token-a"].rate_limited == 1
+    assert quotas["token-a"].reset is not None
+
+
+def test_quota_error_once_every_token_is_exhausted():
+    client, session = client_with({"token-a": 0, "token-b": 0})
+    with pytest.raises(ADSQuotaExceededError):
+        search(client)
+    assert sorted(session.tokens_used) == ["token-a", "token-b"]
+    # The pool now knows, so no request is sent at all
+    with pytest.raises(ADSQuotaExceededError, match="out of quota"):
+        search(client)
+    assert len(session.tokens_used) == 2
+
+
+def test_malformed_quota_headers_are_ignored():
+    pool = ADSTokenPool(["token-a"])
+    quota = pool.quotas()[0]
+    pool.update(quota, {"X-RateLimit-Remaining": "many", "X-RateLimit-Limit": "100"})
+    assert quota.limit == 100
+    assert quota.remaining == 5000
@@ -0,0 +1,116 @@
+import threading
+from collections import Counter
+
+import pytest
+
+from astro_virtual_lab.batch import BatchBroker, BatchRequestError, LocalBatchClient
+
+
+def completion(body):
+    request = body["messages"][-1]["content"]
+    if "fail" in request:
+        raise RuntimeError(f"cannot answer {request}")
+    return {
+        "id": "chatcmpl-local",
+        "object": "chat.completion",
+        "created": 0,
+        "model": body["model"],
+        "choices": [
+            {
+                "index": 0,
+                "finish_reason": "stop",
+                "message": {"role": "assistant", "content": f"reply to {request}"},
+            }
+        ],
+    }
+
+
+def run_meetings(broker, requests_by_meeting):
+    """Run each meeting in its own thread, sending its requests in order."""
+    outcomes = {name: [] for name in requests_by_meeting}
+
+    def meeting(name, requests):
+        try:
+            for request in requests:
+                body = {"model": "gpt-4o", "messages": [{"role": "user", "content": request}]}
+                try:
+                    reply = broker.complete(body)
+                    outcomes[name].append(reply.choices[0].message.content)
+                except BatchRequestError as e:
+                    outcomes[name].append(e)
+        finally:
+            broker.leave()
+
+    threads = [
+        threading.Thread(target=meeting, args=item, daemon=True)
+        for item in requests_by_meeting.items()
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(10.0)
+        assert not thread.is_alive(), "a meeting is still waiting on the broker"
+    return outcomes
+
+
+@pytest.fixture
+def answered():
+    return []
+
+
+@pytest.fixture
+def broker_for(answered):
+    def make(participants):
+        def responder(body):
+            answered.append(body["messages"][-1]["content"])
+            return completion(body)
+
+        client = LocalBatchClient(responder=responder)
+        return BatchBroker(participants, clients={"openai": client}, poll_interval=0.01)
+
+    return make
+
+
+def test_meetings_advance_one_request_each_per_job(broker_for, answered):
+    broker = broker_for(3)
+    requests = {
+        name: [f"{name} turn {turn}" for turn in range(3)] for name in ("a", "b", "c")
+    }
+    outcomes = run_meetings(broker, requests)
+
+    assert broker.jobs_submitted == 3
+    assert outcomes == {
+        name: [f"reply to {request}" for request in sent] for name, sent in requests.items()
+    }
+    # Each job holds the n-th request of every meeting, never two of the same meeting
+    for turn in range(3):
+        step = answered[3 * turn : 3 * turn + 3]
+        assert Counter(request.split()[0] for request in step) == Counter("abc")
+        assert all(request.endswith(f"turn {turn}") for request in step)
+
+
+def test_failed_requests_only_fail_their_meeting(broker_for):
+    broker = broker_for(2)
+    outcomes = run_meetings(broker, {"a": ["a fail"], "b": ["b works"]})
+
+    assert broker.jobs_submitted == 1
+    assert isinstance(outcomes["a"][0], BatchRequestError)
+    assert "cannot answer a fail" in str(outcomes["a"][0])
+    assert outcomes["b"] == ["reply to b works"]
+
+
+def test_leaving_releases_the_meetings_still_waiting(broker_for):
+    broker = broker_for(4)
+    outcomes = run_meetings(
+        broker,
+        {
+            "failed before its first turn": [],
+            "short": ["short turn 0"],
+            "medium": ["medium turn 0", "medium turn 1"],
+            "long": ["long turn 0", "long turn 1", "long turn 2"],
+        },
+    )
+
+    assert broker.jobs_submitted == 3
+    assert outcomes["long"] == [f"reply to long turn {turn}" for turn in range(3)]
+    assert outcomes["medium"] == [f"reply to medium turn {turn}" for turn in range(2)]
@@ -0,0 +1,64 @@
+import importlib
+
+from openai.types.chat import ChatCompletion
+
+from astro_virtual_lab.cassette import Cassette
+from astro_virtual_lab.events import TokenDelta
+
+# The package re-exports the run_meeting function under the module's name
+run_meeting_module = importlib.import_module("astro_virtual_lab.run_meeting")
+
+REPLY = "The thick disk formed early."
+
+
+class FakeClient:
+    """Answers every completion with the same reply, without streaming."""
+
+    def __init__(self):
+        self.chat = self
+        self.completions = self
+
+    def create(self, **kwargs):
+        return ChatCompletion.model_validate(
+            {
+                "id": "chatcmpl-test",
+                "object": "chat.completion",
+                "created": 0,
+                "model": kwargs["model"],
+                "choices": [
+                    {
+                        "index": 0,
+                        "finish_reason": "stop",
+                        "message": {"role": "assistant", "content": REPLY},
+                    }
+                ],
+            }
+        )
+
+
+def complete(on_event=None):
+    return run_meeting_module._request_completion(
+        system_prompt="You are an astronomer.",
+        conversation=[{"agent": "User", "message": "How old is the thick disk?"}],
+        temperature=0.2,
+        model="gpt-4o",
+        use_astronomy_tools=False,
+        tool_names=None,
+        usage=None,
+        phase="member",
+        on_event=on_event,
+    )
+
+
+def test_replayed_completion_is_streamed_as_a_delta(tmp_path, monkeypatch):
+    monkeypatch.setattr(
+        run_meeting_module, "init_openai_client", lambda *args, **kwargs: FakeClient()
+    )
+    path = tmp_path / "meeting.cassette.gz"
+    with Cassette(path, mode="record"):
+        assert complete() == REPLY
+
+    events = []
+    with Cassette(path, mode="replay"):
+        assert complete(on_event=events.append) == REPLY
+    assert events == [TokenDelta("gpt-4o", REPLY)]
@@ -0,0 +1,38 @@
+import pytest
+
+from astro_virtual_lab import catalogs
+
+
+def use_data_dir(monkeypatch, data_dir):
+    monkeypatch.setattr(
+        catalogs, "get_setting", lambda *keys, default=None: data_dir or default
+    )
+
+
+def test_paths_resolve_inside_the_data_dir(tmp_path, monkeypatch):
+    (tmp_path / "apogee.csv").write_text("ra,dec\n1,2\n")
+    use_data_dir(monkeypatch, str(tmp_path))
+    path = tmp_path / "apogee.csv"
+    assert catalogs.resolve_data_path("apogee.csv") == path
+    assert catalogs.resolve_data_path(str(path)) == path
+
+
+@pytest.mark.parametrize("path", ["/etc/passwd", "../secret.csv"])
+def test_paths_outside_the_data_dir_are_refused(tmp_path, monkeypatch, path):
+    data_dir = tmp_path / "data"
+    data_dir.mkdir()
+    (tmp_path / "secret.csv").write_text("ra,dec\n")
+    use_data_dir(monkeypatch, str(data_dir))
+    with pytest.raises(PermissionError):
+        catalogs.resolve_data_path(path)
+
+
+def test_without_data_dir_reads_are_confined_to_the_default(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "data").mkdir()
+    (tmp_path / "data" / "gaia.csv").write_text("ra,dec\n")
+    use_data_dir(monkeypatch, None)
+    expected = (tmp_path / "data" / "gaia.csv").resolve()
+    assert catalogs.resolve_data_path("gaia.csv") == expected
+    with pytest.raises(PermissionError):
+        catalogs.resolve_data_path("/etc/passwd")
@@ -0,0 +1,27 @@
+import time
+
+import pytest
+
+from astro_virtual_lab.concurrency import (
+    CancellationToken,
+    DeadlineExceededError,
+    OperationCancelledError,
+)
+
+
+def test_run_outlasts_poll_interval():
+    token = CancellationToken()
+    assert token.run(lambda: time.sleep(3 * token.POLL_INTERVAL) or "done") == "done"
+
+
+def test_run_stops_at_deadline():
+    token = CancellationToken(timeout=2 * CancellationToken.POLL_INTERVAL)
+    with pytest.raises(DeadlineExceededError):
+        token.run(time.sleep, 10)
+
+
+def test_run_stops_when_cancelled():
+    token = CancellationToken()
+    token.cancel("stop")
+    with pytest.raises(OperationCancelledError):
+        token.run(time.sleep, 10)
@@ -0,0 +1,29 @@
+import pytest
+
+from astro_virtual_lab.utils import load_meeting, save_meeting
+
+
+def turns(*messages):
+    return [
+        {"agent": "User" if i % 2 == 0 else "PI", "message": message}
+        for i, message in enumerate(messages)
+    ]
+
+
+def test_fork_stores_only_its_own_turns(tmp_path):
+    save_meeting(tmp_path, "base", turns("start", "opening", "round"))
+    variant = turns("start", "opening", "other round", "summary")
+    save_meeting(tmp_path, "variant", variant, fork_of="base", fork_turn=2)
+
+    assert load_meeting(tmp_path, "variant") == variant
+    assert "opening" not in (tmp_path / "variant.json").read_text()
+
+
+def test_fork_rejects_a_rerun_parent(tmp_path):
+    save_meeting(tmp_path, "base", turns("start", "opening", "round"))
+    forked = turns("start", "opening", "x")
+    save_meeting(tmp_path, "variant", forked, fork_of="base", fork_turn=2)
+    save_meeting(tmp_path, "base", turns("start", "another opening", "round"))
+
+    with pytest.raises(ValueError, match="changed"):
+        load_meeting(tmp_path, "variant")
@@ -0,0 +1,119 @@
+import time
+
+import pytest
+
+from astro_virtual_lab.jobs import JobCancelledError, JobQueue, LeaseLostError
+
+SPEC = {"meeting_type": "individual", "agenda": "Date the thick disk."}
+TURN = {"agent": "Principal Investigator", "message": "Let us begin."}
+
+
+@pytest.fixture
+def queue(tmp_path):
+    return JobQueue(tmp_path / "jobs.sqlite")
+
+
+def test_claim_takes_the_oldest_queued_job(queue):
+    first = queue.submit({**SPEC, "save_name": "first"})
+    second = queue.submit({**SPEC, "save_name": "second"})
+    job_id, spec = queue.claim(worker="node-1")
+    assert job_id == first
+    assert spec["save_name"] == "first"
+    assert queue.get(first)["status"] == "running"
+    assert queue.get(first)["worker"] == "node-1"
+    assert queue.claim()[0] == second
+    assert queue.claim() is None
+
+
+def test_turns_are_kept_in_order(queue):
+    job_id = queue.submit(SPEC)
+    queue.claim()
+    queue.add_turn(job_id, TURN)
+    queue.add_turn(job_id, {"agent": "Stellar Evolution Expert", "message": "Agreed."})
+    assert [turn["index"] for turn in queue.turns(job_id)] == [0, 1]
+    assert queue.turns(job_id, after=1)[0]["agent"] == "Stellar Evolution Expert"
+    assert queue.finish(job_id, "done", summary="Done.")
+    assert queue.get(job_id)["status"] == "done"
+    assert queue.get(job_id)["turns"] == 2
+
+
+def test_cancel(queue):
+    queued = queue.submit(SPEC)
+    running = queue.submit(SPEC)
+    assert queue.cancel(queued) == "cancelled"
+    assert queue.claim()[0] == running
+    # A running job stops at its next turn
+    assert queue.cancel(running) == "running"
+    assert queue.get(running)["cancel_requested"]
+    with pytest.raises(JobCancelledError):
+        queue.add_turn(running, TURN)
+    assert queue.cancel("unknown") is None
+
+
+def test_requeue_interrupted(tmp_path):
+    queue = JobQueue(tmp_path / "jobs.sqlite")
+    interrupted = queue.submit(SPEC)
+    cancelled = queue.submit(SPEC)
+    queue.claim()
+    queue.claim()
+    queue.add_turn(interrupted, TURN)
+    queue.cancel(cancelled)
+
+    # The server restarts on the same file
+    queue = JobQueue(tmp_path / "jobs.sqlite")
+    assert queue.requeue_interrupted() == 1
+    assert queue.get(interrupted)["status"] == "queued"
+    assert queue.get(cancelled)["status"] == "cancelled"
+    # The re-run starts from the first turn
+    assert queue.claim()[0] == interrupted
+    assert queue.turns(interrupted) == []
+
+
+def test_expired_lease_is_taken_over(queue):
+    job_id = queue.submit(SPEC)
+    queue.claim(worker="node-1", lease=0.05)
+    assert queue.heartbeat(job_id, "node-1", lease=0.05) == "ok"
+    time.sleep(0.1)
+
+    assert queue.claim(worker="node-2", lease=30.0)[0] == job_id
+    assert queue.get(job_id)["attempts"] == 2
+    # The first worker can no longer write to the job
+    assert queue.heartbeat(job_id, "node-1", lease=30.0) == "lost"
+    with pytest.raises(LeaseLostError):
+        queue.add_turn(job_id, TURN, worker="node-1")
+    assert not queue.finish(job_id, "done", worker="node-1")
+    assert queue.release(job_id, "node-1", error="stale") is None
+
+    queue.add_turn(job_id, TURN, worker="node-2")
+    assert queue.finish(job_id, "done", worker="node-2")
+    assert queue.get(job_id)["status"] == "done"
+
+
+def test_expired_lease_fails_the_job_after_its_last_attempt(queue):
+    job_id = queue.submit(SPEC)
+    queue.claim(worker="node-1", lease=0.05)
+    time.sleep(0.1)
+    assert queue.requeue_expired(max_attempts=1) == 0
+    job = queue.get(job_id)
+    assert job["status"] == "failed"
+    assert job["error"] == "lease expired on worker node-1"
+
+
+def test_expired_lease_of_a_cancelled_job(queue):
+    job_id = queue.submit(SPEC)
+    queue.claim(worker="node-1", lease=0.05)
+    assert queue.cancel(job_id) == "running"
+    assert queue.heartbeat(job_id, "node-1", lease=0.05) == "cancel"
+    time.sleep(0.1)
+    assert queue.requeue_expired() == 0
+    assert queue.get(job_id)["status"] == "cancelled"
+
+
+def test_release_requeues_until_the_last_attempt(queue):
+    job_id = queue.submit(SPEC)
+    queue.claim(worker="node-1", lease=30.0)
+    assert queue.release(job_id, "node-1", error="overloaded", max_attempts=2) == "queued"
+    assert queue.get(job_id)["error"] == "overloaded"
+    queue.claim(worker="node-2", lease=30.0)
+    assert queue.release(job_id, "node-2", error="overloaded", max_attempts=2) == "failed"
+    assert queue.get(job_id)["status"] == "failed"
@@ -0,0 +1,84 @@
+import threading
+import time
+
+import pytest
+
+from astro_virtual_lab import prefetch
+from astro_virtual_lab.agent import Agent
+from astro_virtual_lab.concurrency import CancellationToken, OperationCancelledError
+from astro_virtual_lab.utils import ADSPaper
+
+EXPERT = Agent(
+    title="Stellar Evolution Expert",
+    expertise="stellar ages and asteroseismology",
+    goal="date the stars of the thick disk",
+    role="estimate stellar ages",
+)
+LEAD = Agent(
+    title="Principal Investigator",
+    expertise="Galactic archaeology",
+    goal="lead the project",
+    role="run the meeting",
+)
+
+
+@pytest.fixture(autouse=True)
+def count_words(monkeypatch):
+    # The tiktoken encoding is downloaded on first use; words are enough here
+    monkeypatch.setattr(prefetch, "count_tokens", lambda text: len(text.split()))
+
+
+def fake_search(query, num_articles):
+    return [
+        ADSPaper(bibcode="2020A&A...1S", title="Shared paper", abstract="Seen once."),
+        ADSPaper(bibcode=f"2021{query[:8]}", title=query, abstract=f"About {query}."),
+    ]
+
+
+def test_collect_returns_papers_once_per_meeting(monkeypatch):
+    monkeypatch.setattr(prefetch, "search_ads", fake_search)
+    with prefetch.TurnPrefetcher(max_workers=2) as prefetcher:
+        assert prefetcher.start(EXPERT, hint="thick disk alpha abundances")
+        context = prefetcher.collect(EXPERT)
+        assert context.startswith(f"Literature retrieved from NASA ADS for {EXPERT.title}")
+        assert context.count("Shared paper") == 1
+
+        prefetcher.start(EXPERT, hint="radial migration in the Galactic disk")
+        assert "Shared paper" not in prefetcher.collect(EXPERT)
+
+
+def test_collect_ignores_searches_for_another_speaker(monkeypatch):
+    monkeypatch.setattr(prefetch, "search_ads", fake_search)
+    with prefetch.TurnPrefetcher(max_workers=2) as prefetcher:
+        prefetcher.start(EXPERT, hint="thick disk alpha abundances")
+        assert prefetcher.collect(LEAD) == ""
+
+
+def test_collect_drops_searches_past_the_timeout(monkeypatch):
+    release = threading.Event()
+
+    def stalled_search(query, num_articles):
+        release.wait(5.0)
+        return fake_search(query, num_articles)
+
+    monkeypatch.setattr(prefetch, "search_ads", stalled_search)
+    with prefetch.TurnPrefetcher(max_workers=1) as prefetcher:
+        prefetcher.start(EXPERT, hint="thick disk alpha abundances")
+        start = time.monotonic()
+        assert prefetcher.collect(EXPERT, timeout=0.2) == ""
+        assert time.monotonic() - start < 2.0
+        release.set()
+
+
+def test_collect_stops_when_the_meeting_is_cancelled(monkeypatch):
+    release = threading.Event()
+    monkeypatch.setattr(
+        prefetch, "search_ads", lambda query, num_articles: release.wait(5.0) and []
+    )
+    token = CancellationToken(name="meeting")
+    token.cancel()
+    with prefetch.TurnPrefetcher(max_workers=1) as prefetcher:
+        prefetcher.start(EXPERT, hint="thick disk alpha abundances")
+        with pytest.raises(OperationCancelledError):
+            prefetcher.collect(EXPERT, token=token)
+        release.set()
@@ -0,0 +1,22 @@
+from astro_virtual_lab.agent import Agent
+from astro_virtual_lab.routing import OutputBudget
+
+CRITIC = Agent("Scientific Critic", "critique", "find flaws", "review")
+
+
+def test_output_budget_is_opt_in():
+    budget = OutputBudget.from_dict(None)
+    assert all(
+        budget.max_tokens_for(phase, CRITIC) is None
+        for phase in ("opening", "member", "synthesis", "summary")
+    )
+
+
+def test_recommended_budget_leaves_summary_uncapped():
+    budget = OutputBudget.from_dict(
+        {"recommended": True, "roles": {"Scientific Critic": 300}}
+    )
+    other = Agent("Theorist", "theory", "model", "explain")
+    assert budget.max_tokens_for("member", other) == 600
+    assert budget.max_tokens_for("summary", other) is None
+    assert budget.max_tokens_for("member", CRITIC) == 300
@@ -0,0 +1,136 @@
+import json
+import threading
+import time
+import urllib.error
+import urllib.request
+
+import pytest
+
+from astro_virtual_lab import server
+from astro_virtual_lab.concurrency import CancellationToken
+from astro_virtual_lab.jobs import JobQueue
+from astro_virtual_lab.server import MeetingService, check_spec_paths, make_server
+from astro_virtual_lab.usage import BudgetExceededError
+
+
+class FlakyQueue:
+    """Queue whose first heartbeat fails, as a locked shared database would."""
+
+    def __init__(self):
+        self.beats = 0
+
+    def heartbeat(self, job_id, worker, lease):
+        self.beats += 1
+        if self.beats == 1:
+            raise OSError("database is locked")
+        return "cancel"
+
+
+def test_heartbeat_survives_a_failed_renewal():
+    queue = FlakyQueue()
+    service = MeetingService(queue, workers=0, lease=0.03, worker_id="test")
+    token = CancellationToken(name="job")
+    service._tokens["job-1"] = token
+    thread = threading.Thread(target=service._heartbeat, daemon=True)
+    thread.start()
+    try:
+        deadline = time.monotonic() + 2.0
+        while not token.cancelled and time.monotonic() < deadline:
+            time.sleep(0.01)
+    finally:
+        service.stop()
+        thread.join(1.0)
+    assert queue.beats >= 2
+    assert token.cancelled
+
+
+@pytest.mark.parametrize(
+    "spec",
+    [
+        {"save_dir": "/etc"},
+        {"save_dir": "outputs/../../home"},
+        {"save_name": "../escape"},
+        {"fork_from": "/tmp/other"},
+    ],
+)
+def test_http_specs_cannot_leave_the_save_root(spec):
+    with pytest.raises(ValueError):
+        check_spec_paths(spec)
+
+
+def test_http_specs_may_use_relative_paths():
+    check_spec_paths({"save_dir": "projects/thick_disk", "save_name": "run_1"})
+
+
+@pytest.fixture
+def http_service(tmp_path):
+    service = MeetingService(JobQueue(tmp_path / "jobs.sqlite"), workers=0)
+    server = make_server(service, port=0)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    host, port = server.server_address[:2]
+    yield f"http://{host}:{port}"
+    server.shutdown()
+    server.server_close()
+
+
+def request(url, method="GET", body=None):
+    data = json.dumps(body).encode("utf-8") if body is not None else None
+    req = urllib.request.Request(url, data=data, method=method)
+    try:
+        with urllib.request.urlopen(req, timeout=5) as response:
+            return response.status, json.loads(response.read())
+    except urllib.error.HTTPError as e:
+        return e.code, json.loads(e.read())
+
+
+SPEC = {
+    "meeting_type": "individual",
+    "team_member": "PRINCIPAL_INVESTIGATOR",
+    "agenda": "Study the chemical evolution of the Galactic thick disk.",
+}
+
+
+@pytest.mark.parametrize(
+    "spec",
+    [
+        {},
+        {"meeting_type": "team", "agenda": "Thick disk."},
+        {**SPEC, "agenda": ["not", "text"]},
+        {**SPEC, "save_dir": "/tmp"},
+    ],
+)
+def test_invalid_specs_are_refused_on_submission(http_service, spec):
+    status, payload = request(f"{http_service}/jobs", "POST", spec)
+    assert status == 400
+    assert payload["error"]
+
+
+def test_bad_turn_offsets_are_refused(http_service):
+    status, payload = request(f"{http_service}/jobs", "POST", SPEC)
+    assert status == 201
+    job_id = payload["id"]
+    assert request(f"{http_service}/jobs/{job_id}/turns?after=2")[0] == 200
+    assert request(f"{http_service}/jobs/{job_id}/turns?after=two")[0] == 400
+    assert request(f"{http_service}/jobs/{job_id}/stream?after=two")[0] == 400
+
+
+@pytest.mark.parametrize(
+    "error, status",
+    [
+        (BudgetExceededError("budget of $1.00 used up"), "failed"),
+        (ValueError("invalid spec"), "failed"),
+        (ConnectionError("connection reset"), "queued"),
+    ],
+)
+def test_only_transient_failures_are_retried(tmp_path, monkeypatch, error, status):
+    def failing_meeting(**kwargs):
+        raise error
+
+    monkeypatch.setattr(server, "run_meeting", failing_meeting)
+    queue = JobQueue(tmp_path / "jobs.sqlite", shared=True)
+    service = MeetingService(queue, workers=0, lease=30.0, worker_id="node-1")
+    queue.submit(SPEC)
+    job_id, spec = queue.claim(worker="node-1", lease=30.0)
+    service.run_job(job_id, spec)
+    assert queue.get(job_id)["status"] == status
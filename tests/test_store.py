@@ -0,0 +1,63 @@
+import json
+
+import pytest
+
+from astro_virtual_lab.constants import MESSAGE_STORE_FILENAME
+from astro_virtual_lab.store import MessageStore, chunk_hash, split_message
+from astro_virtual_lab.utils import load_meeting, save_meeting
+
+PREAMBLE = "This is a meeting of the thick disk project. " * 15
+SUMMARY = "Summary of the previous meeting: alpha abundances trace the age. " * 15
+
+
+@pytest.mark.parametrize(
+    "text",
+    [
+        "",
+        "\n\n",
+        "\n\nLeading break.",
+        "Trailing break.\n\n",
+        "\n\n\n\nOnly\n\n\n\nbreaks\n\n\n",
+        "Short.\n\nLines.\n\n" + PREAMBLE + "\n\n" + SUMMARY,
+    ],
+)
+@pytest.mark.parametrize("min_chars", [0, 10, 200])
+def test_split_message_is_lossless(text, min_chars):
+    chunks = split_message(text, min_chars=min_chars)
+    assert "\n\n".join(chunks) == text
+
+
+def test_shared_chunks_are_stored_once(tmp_path):
+    store = MessageStore(tmp_path / "messages.sqlite")
+    first = f"{PREAMBLE}\n\nAgenda: date the stars.\n\n{SUMMARY}"
+    second = f"{PREAMBLE}\n\nAgenda: measure their orbits.\n\n{SUMMARY}"
+    refs = store.put_messages([first, second, first])
+
+    assert refs[0] == refs[2]
+    assert refs[0][0] == refs[1][0] == chunk_hash(PREAMBLE)
+    # The short agenda line is merged into the summary's chunk, which differs
+    assert store.stats()["chunks"] == len(set(refs[0]) | set(refs[1])) == 3
+    assert store.get_messages(refs) == [first, second, first]
+
+
+def test_dedup_manifest_round_trips(tmp_path):
+    discussion = [
+        {"agent": "User", "message": f"{PREAMBLE}\n\n{SUMMARY}"},
+        {"agent": "Principal Investigator", "message": ""},
+        {"agent": "User", "message": "\n\nLeading and trailing breaks.\n\n"},
+        {"agent": "Stellar Evolution Expert", "message": f"{SUMMARY}\n\nÉtoiles « âgées »."},
+    ]
+    save_meeting(tmp_path, "first", discussion, dedup=True)
+    save_meeting(tmp_path, "second", discussion[:1], dedup=True)
+
+    manifest = json.loads((tmp_path / "first.json").read_text(encoding="utf-8"))
+    assert manifest["store"] == MESSAGE_STORE_FILENAME
+    assert all("message" not in turn for turn in manifest["turns"])
+    assert not (tmp_path / "first.md").exists()
+    assert load_meeting(tmp_path, "first") == discussion
+    assert load_meeting(tmp_path, "second") == discussion[:1]
+    # The second meeting only repeats text of the first
+    store = MessageStore(tmp_path / MESSAGE_STORE_FILENAME)
+    assert store.stats()["chunks"] == len(
+        {key for turn in manifest["turns"] for key in turn["chunks"]}
+    )
@@ -0,0 +1,113 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from astro_virtual_lab import tools
+from astro_virtual_lab.concurrency import (
+    CancellationToken,
+    DeadlineExceededError,
+    OperationCancelledError,
+)
+from astro_virtual_lab.tools import TOOL_REGISTRY, run_tool, tool
+
+CALLS = []
+RELEASE = threading.Event()
+
+
+@pytest.fixture
+def slow_tool():
+    CALLS.clear()
+    RELEASE.clear()
+
+    @tool(name="slow_lookup", timeout=0.3, max_concurrency=1)
+    def slow_lookup(label: str, seconds: float = 0.0) -> str:
+        """
+        Look something up slowly.
+
+        :param label: Name of the call.
+        :param seconds: Seconds to take, or -1 to wait for the test to release it.
+        """
+        CALLS.append(label)
+        if seconds < 0:
+            RELEASE.wait(5.0)
+        else:
+            time.sleep(seconds)
+        return label
+
+    yield "slow_lookup"
+    RELEASE.set()
+    del TOOL_REGISTRY["slow_lookup"]
+
+
+def run_in_thread(*args, **kwargs):
+    results = {}
+
+    def target():
+        try:
+            results["result"] = run_tool(*args, **kwargs)
+        except Exception as e:
+            results["error"] = e
+
+    thread = threading.Thread(target=target)
+    thread.start()
+    return thread, results
+
+
+def test_timeout_starts_once_the_call_has_a_slot(slow_tool):
+    first, first_result = run_in_thread(slow_tool, {"label": "first", "seconds": 0.2})
+    time.sleep(0.05)
+    second, second_result = run_in_thread(slow_tool, {"label": "second", "seconds": 0.2})
+    first.join(2.0)
+    second.join(2.0)
+    assert first_result["result"] == "first"
+    assert second_result["result"] == "second"
+
+
+def test_abandoned_queued_call_never_runs(slow_tool):
+    assert "timed out" in run_tool(slow_tool, {"label": "stuck", "seconds": -1})
+
+    token = CancellationToken(timeout=0.2, name="turn")
+    queued, queued_result = run_in_thread(slow_tool, {"label": "queued"}, token=token)
+    queued.join(2.0)
+    assert isinstance(queued_result["error"], DeadlineExceededError)
+    token = CancellationToken(name="turn")
+    token.cancel()
+    with pytest.raises(OperationCancelledError):
+        run_tool(slow_tool, {"label": "cancelled"}, token=token)
+
+    RELEASE.set()
+    time.sleep(0.3)
+    assert CALLS == ["stuck"]
+
+
+def test_timed_out_cpu_bound_calls_release_their_slot(monkeypatch):
+    # Stand in for the process pool, whose spawned workers are slow to start
+    pool = ThreadPoolExecutor(max_workers=4)
+    monkeypatch.setattr(
+        tools, "submit_cpu_bound", lambda func, **kwargs: pool.submit(func, **kwargs)
+    )
+    RELEASE.clear()
+
+    @tool(name="heavy_statistics", timeout=0.2, max_concurrency=1, cpu_bound=True)
+    def heavy_statistics(stall: bool) -> str:
+        """
+        Compute statistics, or stall until the test releases the worker.
+
+        :param stall: If True, stall.
+        """
+        if stall:
+            RELEASE.wait(5.0)
+        return "done"
+
+    try:
+        assert "timed out" in run_tool("heavy_statistics", {"stall": True})
+        assert "timed out" in run_tool("heavy_statistics", {"stall": True})
+        start = time.monotonic()
+        assert run_tool("heavy_statistics", {"stall": False}) == "done"
+        assert time.monotonic() - start < 1.0
+    finally:
+        RELEASE.set()
+        pool.shutdown(wait=True)
+        del TOOL_REGISTRY["heavy_statistics"]
@@ -0,0 +1,84 @@
+import json
+
+import pytest
+
+from astro_virtual_lab.transcript import (
+    StaleTranscriptError,
+    _FileSource,
+    load_transcript,
+)
+from astro_virtual_lab.utils import load_meeting, save_meeting
+
+
+def turns(*messages):
+    return [
+        {"agent": "User" if idx % 2 == 0 else "Principal Investigator", "message": text}
+        for idx, text in enumerate(messages)
+    ]
+
+
+def test_reading_a_replaced_file_raises(tmp_path):
+    save_meeting(tmp_path, "meeting", turns("Start.", "A short reply."))
+    transcript = load_transcript(tmp_path, "meeting")
+    save_meeting(tmp_path, "meeting", turns("Start again.", "A much longer reply."))
+    with pytest.raises(StaleTranscriptError):
+        transcript[1].message
+    with pytest.raises(StaleTranscriptError):
+        transcript.to_list()
+    assert load_transcript(tmp_path, "meeting")[1].message == "A much longer reply."
+
+
+def test_memory_mapped_transcript_keeps_the_indexed_version(tmp_path):
+    save_meeting(tmp_path, "meeting", turns("Start.", "A short reply."))
+    transcript = load_transcript(tmp_path, "meeting", mmap=True)
+    save_meeting(tmp_path, "meeting", turns("Start again.", "A much longer reply."))
+    assert transcript[1].message == "A short reply."
+
+
+TRICKY = turns(
+    'She said "the thick disk is old" \\"twice\\"',
+    "Backslashes: C:\\\\data\\\\ and a trailing one \\",
+    "Unicode: Étoiles âgées, 銀河, emoji 🌌, and a \\u escape",
+    '"',
+    "",
+    'Keys inside text: "agent": "User", "message": "fake"',
+    "Line\nbreaks\tand\ttabs\r\n",
+)
+
+
+def test_scanned_transcript_matches_load_meeting(tmp_path):
+    save_meeting(tmp_path, "meeting", TRICKY)
+    for mmap in (False, True):
+        transcript = load_transcript(tmp_path, "meeting", mmap=mmap)
+        assert mmap or isinstance(transcript._source, _FileSource)
+        assert transcript.to_list() == load_meeting(tmp_path, "meeting") == TRICKY
+        assert [turn.message for turn in transcript] == [t["message"] for t in TRICKY]
+        assert [turn["agent"] for turn in transcript] == [t["agent"] for t in TRICKY]
+
+
+@pytest.mark.parametrize(
+    "save",
+    [
+        lambda save_dir: save_meeting(save_dir, "meeting", TRICKY, compress=True),
+        lambda save_dir: save_meeting(save_dir, "meeting", TRICKY, dedup=True),
+        lambda save_dir: (
+            save_meeting(save_dir, "parent", TRICKY[:3] + turns("Parent ending.")),
+            save_meeting(save_dir, "meeting", TRICKY, fork_of="parent", fork_turn=3),
+        ),
+    ],
+    ids=["gzip", "dedup", "fork"],
+)
+def test_other_formats_fall_back_to_load_meeting(tmp_path, save):
+    save(tmp_path)
+    transcript = load_transcript(tmp_path, "meeting")
+    assert transcript.to_list() == load_meeting(tmp_path, "meeting") == TRICKY
+    assert transcript[-1].message == TRICKY[-1]["message"]
+
+
+def test_scanner_reads_raw_utf8_and_compact_json(tmp_path):
+    # save_meeting escapes non-ASCII text; files written by other tools may not
+    text = json.dumps(TRICKY, ensure_ascii=False, separators=(",", ":"))
+    (tmp_path / "meeting.json").write_text(text, encoding="utf-8")
+    transcript = load_transcript(tmp_path, "meeting")
+    assert isinstance(transcript._source, _FileSource)  # indexed, not decoded
+    assert transcript.to_list() == TRICKY
@@ -0,0 +1,50 @@
+from astro_virtual_lab import utils
+from astro_virtual_lab.utils import load_meeting, save_meeting
+
+
+def turns(*messages):
+    return [
+        {"agent": "User" if idx % 2 == 0 else "Principal Investigator", "message": text}
+        for idx, text in enumerate(messages)
+    ]
+
+
+def test_resaving_in_another_format_removes_the_stale_files(tmp_path):
+    save_meeting(tmp_path, "meeting", turns("Start.", "First run."))
+    save_meeting(tmp_path, "meeting", turns("Start.", "Second run."), compress=True)
+    assert sorted(path.name for path in tmp_path.glob("meeting*")) == [
+        "meeting.json.gz",
+        "meeting.md.gz",
+    ]
+    assert load_meeting(tmp_path, "meeting")[1]["message"] == "Second run."
+
+    save_meeting(tmp_path, "meeting", turns("Start.", "Third run."), dedup=True)
+    assert sorted(path.name for path in tmp_path.glob("meeting*")) == ["meeting.json"]
+    assert load_meeting(tmp_path, "meeting")[1]["message"] == "Third run."
+
+
+def test_saved_files_follow_the_umask_and_keep_their_mode(tmp_path):
+    save_meeting(tmp_path, "meeting", turns("Start.", "First run."))
+    mode = (tmp_path / "meeting.json").stat().st_mode & 0o777
+    assert mode == 0o666 & ~utils._UMASK
+
+    (tmp_path / "meeting.json").chmod(0o600)
+    save_meeting(tmp_path, "meeting", turns("Start.", "Second run."))
+    assert (tmp_path / "meeting.json").stat().st_mode & 0o777 == 0o600
+
+
+def test_ads_cache_evicts_the_least_recently_used_query(monkeypatch):
+    monkeypatch.setattr(utils, "ADS_RESULT_CACHE_SIZE", 2)
+    utils.clear_ads_cache()
+    fields = ("title", "bibcode")
+    papers = [utils.ADSPaper(bibcode="2020A&A...1S", title="Thick disk")]
+    try:
+        utils._store_ads_papers("thick disk", 3, fields, papers)
+        utils._store_ads_papers("thin disk", 3, fields, papers)
+        assert utils._cached_ads_papers("Thick  Disk", 3, fields) == papers
+        utils._store_ads_papers("halo", 3, fields, papers)
+        assert utils._cached_ads_papers("thin disk", 3, fields) is None
+        assert utils._cached_ads_papers("thick disk", 3, fields) == papers
+        assert utils._cached_ads_papers("halo", 3, fields) == papers
+    finally:
+        utils.clear_ads_cache()